@@ -0,0 +1,250 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Camera benchmark, measures the preview throughput, the capture latency and the
+long running stability with the simulated camera backend, no camera needed.
+
+Usage (from the repository root):
+    python3 -m galitime.benchmarks.camerabench --duration 30 --captures 20
+"""
+
+import argparse
+import atexit
+import json
+import logging
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+
+from PyQt5.QtCore import QEventLoop, QSize, Qt, QTimer
+from PyQt5.QtWidgets import QApplication
+
+from ..src.peripherals.camera import CameraWrapper
+from ..src.peripherals.camerabackend import CameraError
+from ..src.peripherals.previewwatchdog import PreviewWatchdog
+from ..src.peripherals.simulatedbackend import SimulatedBackend
+from ..src.rendering.previewdecoder import PreviewDecoder
+from ..src.utilities import logger as loggerSetup
+from ..src.utilities.constants import FPS, SIMULATED_CAPTURE_LATENCY
+from ..src.utilities.constants import SIMULATED_DOWNLOAD_LATENCY
+from ..src.utilities.constants import SIMULATED_FPS, SIMULATED_RESOLUTION
+
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+PREVIEW_MODES = ("stream", "file", "gphoto")
+DISPLAY_SIZE = QSize(1280, 720)  # pixels, decoding target size
+
+
+def summarize(durations: list[float]) -> dict:
+    """
+    summarize : Summarizes a list of durations
+
+    Args:
+        durations (list[float]): Durations in seconds
+
+    Returns:
+        dict: Count, mean, min, p95 and max in milliseconds
+    """
+    if not durations:
+        return {"count": 0}
+    durations = sorted(duration * 1000 for duration in durations)
+    return {
+        "count": len(durations),
+        "mean": round(statistics.mean(durations), 3),
+        "min": round(durations[0], 3),
+        "p95": round(durations[min(len(durations) - 1, int(0.95 * len(durations)))], 3),
+        "max": round(durations[-1], 3),
+    }
+
+
+def getMaxRss() -> int:
+    """
+    getMaxRss : Returns the peak resident memory of the process
+
+    Returns:
+        int: Peak memory in kilobytes
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def createCamera(backend: SimulatedBackend, previewMode: str) -> CameraWrapper:
+    """
+    createCamera : Creates a connected camera wrapper, retrying the connection if
+    errors are injected
+
+    Args:
+        backend (SimulatedBackend): Simulated backend
+        previewMode (str): Preview mode
+
+    Returns:
+        CameraWrapper: Connected camera
+    """
+    camera = CameraWrapper(previewMode=previewMode, backend=backend)
+    while True:
+        try:
+            with camera.camLock:
+                camera.cam.init()
+            camera.connected = True
+            return camera
+        except CameraError as err:
+            logger.warning("Connection failed, retrying: %s", err)
+
+
+def releaseCamera(camera: CameraWrapper) -> None:
+    atexit.unregister(camera._cleanUp)
+    camera._cleanUp()
+
+
+def benchPreview(backend: SimulatedBackend, previewMode: str, duration: float) -> dict:
+    """
+    benchPreview : Runs the preview pipeline of the application (camera, decoder,
+    watchdog) for the given duration, every decoded frame counting as displayed.
+
+    Args:
+        backend (SimulatedBackend): Simulated backend
+        previewMode (str): Preview mode
+        duration (float): Preview duration in seconds
+
+    Returns:
+        dict: Preview metrics, see PreviewMetrics.getSnapshot
+    """
+    camera = createCamera(backend, previewMode)
+
+    decoder = PreviewDecoder(camera.metrics)
+    decoder.setTargetSize(DISPLAY_SIZE)
+    decoder.frameDecoded.connect(
+        lambda image, seq, timestamp: camera.metrics.addDisplay(0.0, timestamp),
+        Qt.QueuedConnection
+    )
+    decoder.start()
+    camera.setFrameCallback(decoder.submit)
+
+    watchdog = PreviewWatchdog(camera)
+    pollTimer = QTimer()
+    pollTimer.setTimerType(Qt.PreciseTimer)
+    pollTimer.timeout.connect(camera.pollPreview)
+
+    rssBefore = getMaxRss()
+    camera.startPreview()
+    watchdog.start()
+    if camera.needsPolling():
+        pollTimer.start(round(1000 / FPS))
+
+    loop = QEventLoop()
+    QTimer.singleShot(round(duration * 1000), loop.quit)
+    loop.exec_()
+
+    pollTimer.stop()
+    watchdog.stop()
+    snapshot = camera.getPreviewMetrics()
+    camera.stopPreview()
+    decoder.stop()
+    releaseCamera(camera)
+
+    snapshot["maxRssGrowth"] = getMaxRss() - rssBefore
+    return snapshot
+
+
+def benchCapture(backend: SimulatedBackend, captures: int) -> dict:
+    """
+    benchCapture : Takes and downloads photos one after the other
+
+    Args:
+        backend (SimulatedBackend): Simulated backend
+        captures (int): Number of photos
+
+    Returns:
+        dict: Capture and download durations summaries and error count
+    """
+    camera = createCamera(backend, "stream")
+    captureTimes = []
+    downloadTimes = []
+    errors = 0
+
+    with tempfile.TemporaryDirectory() as saveFolder:
+        for _ in range(captures):
+            try:
+                start = time.monotonic()
+                photoPath = camera._capturePhoto()
+                captured = time.monotonic()
+                camera._downloadPhoto(photoPath, saveFolder)
+                downloaded = time.monotonic()
+            except CameraError as err:
+                logger.warning("Capture failed: %s", err)
+                errors += 1
+                continue
+            captureTimes.append(captured - start)
+            downloadTimes.append(downloaded - captured)
+
+    releaseCamera(camera)
+    return {
+        "capture": summarize(captureTimes),
+        "download": summarize(downloadTimes),
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    """
+    main : Parses the arguments, runs the benchmarks and prints the results as
+    json
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--modes", nargs="+", choices=PREVIEW_MODES,
+                        default=PREVIEW_MODES, help="preview modes to benchmark")
+    parser.add_argument("--duration", type=float, default=10,
+                        help="preview duration for each mode, in seconds")
+    parser.add_argument("--captures", type=int, default=10)
+    parser.add_argument("--fps", type=float, default=SIMULATED_FPS)
+    parser.add_argument("--resolution", type=int, nargs=2,
+                        default=SIMULATED_RESOLUTION, metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--source", help="recorded MJPEG file to stream")
+    parser.add_argument("--photos", help="folder of the jpeg files captured")
+    parser.add_argument("--capture-latency", type=float,
+                        default=SIMULATED_CAPTURE_LATENCY)
+    parser.add_argument("--download-latency", type=float,
+                        default=SIMULATED_DOWNLOAD_LATENCY)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--stall-after", type=float,
+                        help="liveview stall time, in seconds, to test recoveries")
+    parser.add_argument("--output", help="json file receiving the results")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    loggerSetup.setup()
+    logging.getLogger().setLevel(logging.WARNING)
+    app = QApplication(sys.argv)  # noqa: F841, needed by the Qt classes
+
+    backend = SimulatedBackend(
+        fps=args.fps,
+        resolution=tuple(args.resolution),
+        source=args.source,
+        photoFolder=args.photos,
+        captureLatency=args.capture_latency,
+        downloadLatency=args.download_latency,
+        errorRate=args.error_rate,
+        stallAfter=args.stall_after,
+    )
+
+    results = {"parameters": vars(args), "preview": {}}
+    for previewMode in args.modes:
+        results["preview"][previewMode] = benchPreview(
+            backend, previewMode, args.duration
+        )
+    results["capture"] = benchCapture(backend, args.captures)
+
+    text = json.dumps(results, indent=4)
+    print(text)
+    if args.output:
+        with open(args.output, "wt", encoding="utf-8") as file:
+            file.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Compositing benchmark, measures the decor overlay of full resolution photos with
+QPainter, as done by the exports, and with the NumPy compositor.
+
+Usage (from the repository root):
+    python3 -m galitime.benchmarks.compositebench --resolution 6000 4000 --runs 10
+"""
+
+import argparse
+import concurrent.futures
+import json
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+from PyQt5.QtCore import QPoint
+from PyQt5.QtGui import QImage
+from PyQt5.QtWidgets import QApplication
+
+from .camerabench import summarize
+from ..src.rendering.compositor import ALPHA, compositeImage, imageToArray
+from ..src.rendering.decorcache import DecorCache
+from ..src.rendering.photo import renderPhoto
+from ..src.utilities import logger as loggerSetup
+from ..src.utilities.constants import COMPOSITE_TILE_SIZE, DEFAULT_DECOR
+
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+ENGINES = ("qpainter", "numpy")
+
+
+def createFrame(width: int, height: int) -> QImage:
+    """
+    createFrame : Creates an opaque frame of random pixels
+
+    Args:
+        width (int): Width in pixels
+        height (int): Height in pixels
+
+    Returns:
+        QImage: RGB32 frame
+    """
+    frame = QImage(width, height, QImage.Format_RGB32)
+    pixels = imageToArray(frame)
+    pixels[:] = np.random.default_rng(0).integers(0, 256, pixels.shape, np.uint8)
+    pixels[..., ALPHA] = 255
+    return frame
+
+
+def benchEngine(
+    engine: str, frame: QImage, decor: DecorCache, runs: int, workers: int,
+    tileSize: int
+) -> tuple[dict, QImage]:
+    """
+    benchEngine : Composites the decor over the frame several times with the
+    given engine, from a pool of worker threads like the export worker
+
+    Args:
+        engine (str): "qpainter" or "numpy"
+        frame (QImage): Full resolution frame
+        decor (DecorCache): Decor, already scaled to the frame size
+        runs (int): Number of composites
+        workers (int): Number of worker threads
+        tileSize (int): NumPy tile side in pixels
+
+    Returns:
+        tuple[dict, QImage]: Durations summary and throughput, last composite
+    """
+    if engine == "qpainter":
+        def render() -> QImage:
+            return renderPhoto(frame, decor)
+    else:
+        decorImage = decor.get(frame.width(), frame.height())
+
+        def render() -> QImage:
+            return compositeImage(frame, [(decorImage, QPoint(0, 0))], tileSize)
+
+    def timedRender() -> tuple[float, QImage]:
+        start = time.perf_counter()
+        image = render()
+        return time.perf_counter() - start, image
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        results = list(executor.map(lambda _: timedRender(), range(runs)))
+    elapsed = time.perf_counter() - start
+
+    summary = summarize([duration for duration, _ in results])
+    summary["imagesPerSecond"] = round(runs / elapsed, 2)
+    return summary, results[-1][1]
+
+
+def main() -> None:
+    """
+    main : Parses the arguments, runs the benchmarks and prints the results as
+    json
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=ENGINES)
+    parser.add_argument("--resolution", type=int, nargs=2, default=(6000, 4000),
+                        metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--decor", default=DEFAULT_DECOR, help="decor image file")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="composites run in parallel")
+    parser.add_argument("--tile-size", type=int, default=COMPOSITE_TILE_SIZE,
+                        help="numpy tile side, in pixels")
+    parser.add_argument("--output", help="json file receiving the results")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    loggerSetup.setup()
+    logging.getLogger().setLevel(logging.WARNING)
+    app = QApplication(sys.argv)  # noqa: F841, needed by the Qt classes
+
+    width, height = args.resolution
+    frame = createFrame(width, height)
+    decor = DecorCache(args.decor)
+    decor.get(width, height)  # scaled once, as with the export cache
+
+    results = {"parameters": vars(args), "engines": {}}
+    images = {}
+    for engine in args.engines:
+        results["engines"][engine], images[engine] = benchEngine(
+            engine, frame, decor, args.runs, args.workers, args.tile_size
+        )
+
+    if len(images) == len(ENGINES):
+        difference = np.abs(
+            imageToArray(images["qpainter"], readOnly=True).astype(np.int16)
+            - imageToArray(images["numpy"], readOnly=True)
+        )
+        results["maxPixelDifference"] = int(difference.max())
+
+    text = json.dumps(results, indent=4)
+    print(text)
+    if args.output:
+        with open(args.output, "wt", encoding="utf-8") as file:
+            file.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -37,3 +37,9 @@ class AbstractPage(abc.ABC):
                 PyQt5.QtWidget: Camera page loaded layout
         """
         ...
+
+    def unload(self) -> None:
+        """
+            unload : Called before the page is replaced by another one, to
+            disconnect it from long-lived objects
+        """
@@ -17,6 +17,8 @@ from ..abstractcontrolwindow import AbstractControlWindow
 from ..controlpages.abstractpage import AbstractPage
 from ..controlpages.pagesenum import PageEnum
 from ..peripherals.camera import CameraWrapper
+from ..peripherals.cameraconnector import STATE_CONNECTED, STATE_CONNECTING
+from ..peripherals.cameraconnector import STATE_FAILED
 from ..utilities.stylesheet import cssify
 
 # ---------- LOGGER SETUP ----------
@@ -25,6 +27,13 @@ logger.propagate = True
 # ----------------------------------
 
 CHOSEN_STRING = " sélectionnée"
+# Cached camera information entries displayed in the properties table
+PROPERTIES_NAMES = {
+    "abilities": "Capacités",
+    "config": "Configration",
+    "about": "À propos",
+    "summary": "Sommaire",
+}
 
 
 class CameraPage(AbstractPage):
@@ -39,6 +48,7 @@ class CameraPage(AbstractPage):
 
         self.ReconnectButton = None
 
+        self.CameraChoiceBox = None
         self.CamsChoiceBox = None
         self.AbilitiesText = None
         self.AbilitiesText = None
@@ -89,6 +99,20 @@ class CameraPage(AbstractPage):
         CamsVLayout.setAlignment(Qt.AlignTop)
         RightVLayout.addLayout(CamsVLayout)
 
+        # 1.2.1.0 Configured camera choice, the page displays the chosen one
+        CameraLabel = QLabel("Appareil")
+        CameraLabel.setAlignment(Qt.AlignHCenter)
+        CamsVLayout.addWidget(CameraLabel)
+
+        self.CameraChoiceBox = QComboBox()
+        for camera in CameraWrapper.getCameras():
+            self.CameraChoiceBox.addItem(camera.getName(), camera)
+        self.CameraChoiceBox.setCurrentIndex(
+            max(0, self.CameraChoiceBox.findData(self.camera))
+        )
+        self.CameraChoiceBox.currentIndexChanged.connect(self.selectCamera)
+        CamsVLayout.addWidget(self.CameraChoiceBox)
+
         # 1.2.1.1 Camera listing label
         CamListLabel = QLabel("Caméras disponibles")
         CamListLabel.setAlignment(Qt.AlignHCenter)
@@ -106,9 +130,15 @@ class CameraPage(AbstractPage):
         # 1.2.1.2.2 Update button
         CamsUpdateButton = QPushButton("Rafraichir")
         CamsUpdateButton.setStyleSheet("Thin")
-        CamsUpdateButton.clicked.connect(self.updateCamList)
+        CamsUpdateButton.clicked.connect(self.refreshCamList)
         CamsListHLayout.addWidget(CamsUpdateButton)
 
+        # 1.2.1.2.3 Bind button, binds the chosen camera to the detected one
+        CamsBindButton = QPushButton("Associer")
+        CamsBindButton.setStyleSheet("Thin")
+        CamsBindButton.clicked.connect(self.bindCamera)
+        CamsListHLayout.addWidget(CamsBindButton)
+
         # 1.2.2 Control buttons Layout
         ControlButtonsVLayout = QVBoxLayout()
         ControlButtonsVLayout.setAlignment(Qt.AlignBottom)
@@ -117,7 +147,7 @@ class CameraPage(AbstractPage):
         # 1.2.2.1 Abilities list button
         AbilitiesUpdateButton = QPushButton("Rafraichir")
         AbilitiesUpdateButton.setStyleSheet("Thin")
-        AbilitiesUpdateButton.clicked.connect(self.updateAll)
+        AbilitiesUpdateButton.clicked.connect(self.refreshAll)
         ControlButtonsVLayout.addWidget(AbilitiesUpdateButton)
 
         # 1.2.2.2 Reconnect camera button
@@ -133,50 +163,177 @@ class CameraPage(AbstractPage):
         ReturnButton.clicked.connect(lambda: self.mainWindow.loadPage(PageEnum.CONTROL))
         ControlButtonsVLayout.addWidget(ReturnButton)
 
+        self.updateAll()
+        self._connectCamera()
+
         logger.debug("Camera options page loaded")
         return MainContainer
 
+    def unload(self) -> None:
+        """
+        unload : Disconnects the page from the camera information cache and
+        connector
+        """
+        self._disconnectCamera()
+
+    def _connectCamera(self) -> None:
+        self.camera.infoCache.updated.connect(self._onInfoUpdated)
+        self.camera.connector.stateChanged.connect(self._onStateChanged)
+        self.camera.connector.failed.connect(self._onConnectionFailed)
+
+    def _disconnectCamera(self) -> None:
+        self.camera.infoCache.updated.disconnect(self._onInfoUpdated)
+        self.camera.connector.stateChanged.disconnect(self._onStateChanged)
+        self.camera.connector.failed.disconnect(self._onConnectionFailed)
+
+    def selectCamera(self) -> None:
+        """
+        selectCamera : Displays the camera chosen in the camera choice box
+        """
+        camera = self.CameraChoiceBox.currentData()
+        if camera is None or camera is self.camera:
+            return
+
+        self._disconnectCamera()
+        self.camera = camera
+        self._connectCamera()
+        logger.debug("%s displayed", camera.getName())
+
+        self.updateCamList()
+        self.updateReconnectButton()
+        self.updateAll()
+
+    def bindCamera(self) -> None:
+        """
+        bindCamera : Binds the displayed camera to the port of the camera chosen
+        in the available cameras choice box
+        """
+        port = self.CamsChoiceBox.currentData()
+        if port is None or port == self.camera.port:
+            return
+
+        self.camera.setPort(port)
+        self.CameraChoiceBox.setItemText(
+            self.CameraChoiceBox.currentIndex(), self.camera.getName()
+        )
+
+    def _onInfoUpdated(self, name: str) -> None:
+        """
+        _onInfoUpdated : Camera information cache callback, displays the updated
+        entry
+
+        Args:
+            name (str): Updated entry name
+        """
+        if name == "cameras":
+            self.updateCamList()
+        elif name in PROPERTIES_NAMES:
+            self.updateAll()
+
+    def _onStateChanged(self, state: str) -> None:
+        """
+        _onStateChanged : Camera connector callback, updates the reconnect button
+        and reads the camera information again once connected, the information
+        is only fetched when read
+
+        Args:
+            state (str): Connection state, see CameraConnector
+        """
+        self.updateReconnectButton(state)
+        if state == STATE_CONNECTED:
+            self.updateCamList()
+            self.updateAll()
+
+    def refreshCamList(self) -> None:
+        """
+        refreshCamList : Detects the available cameras again, the choice box is
+        updated once done
+        """
+        self.camera.infoCache.invalidate("cameras")
+        self.updateCamList()
+
+    def refreshAll(self) -> None:
+        """
+        refreshAll : Fetches the camera properties again, the table is updated
+        once done
+        """
+        self.camera.infoCache.invalidate(*PROPERTIES_NAMES)
+        self.updateAll()
+
     def reconnectCamera(self) -> None:
         """
-        reconnectCamera : Tries to reconnect gphoto2.Camera to the camera
-        peripheral and updates the camera status.
+        reconnectCamera : Asks the camera connector to reconnect the camera
+        peripheral in the background, the button is updated along with the
+        connection state. The cached camera information is fetched again.
         """
         logger.info("Reconnecting camera")
         # self.cam.__init__()
-        self.camera.connect()
-        self.updateReconnectButton()
+        self.camera.connectInBackground()
+        self.camera.infoCache.invalidate()
+
+    def _onConnectionFailed(self, error: str, retryDelay: float) -> None:
+        """
+        _onConnectionFailed : Camera connector callback, displays the delay before
+        the next connection attempt on the reconnect button
+
+        Args:
+            error (str): Connection error
+            retryDelay (float): Delay before the next attempt in seconds
+        """
+        self.ReconnectButton.setText(
+            f"Reconnexion caméra (nouvel essai dans {retryDelay:.0f} s)"
+        )
+        self.ReconnectButton.setToolTip(error)
 
-    def updateReconnectButton(self) -> None:
+    def updateReconnectButton(self, state: str = None) -> None:
         """
         updateReconnectButton : Updates the camera reconnect button style
-        according to the camera state. If camera is already connected,
-        displays disable button.
+        according to the camera connection state. If camera is already connected
+        or connecting, displays disable button.
+
+        Args:
+            state (str, optional): Connection state, see CameraConnector. Defaults
+            to the current connector state.
         """
-        if not self.camera.isConnected():
-            self.ReconnectButton.setStyleSheet(cssify("Tall Blue"))
-            self.ReconnectButton.setEnabled(True)
-        else:
+        if state is None:
+            state = self.camera.connector.getState()
+
+        if state == STATE_CONNECTING:
+            self.ReconnectButton.setText("Connexion en cours...")
+        elif state != STATE_FAILED:
+            self.ReconnectButton.setText("Reconnexion caméra")
+            self.ReconnectButton.setToolTip("")
+
+        if state in (STATE_CONNECTED, STATE_CONNECTING):
             self.ReconnectButton.setStyleSheet(cssify("Tall Disabled"))
             self.ReconnectButton.setEnabled(False)
+        else:
+            self.ReconnectButton.setStyleSheet(cssify("Tall Blue"))
+            self.ReconnectButton.setEnabled(True)
 
     def updateCamList(self) -> None:
         """
         updateCamList : Updates the camera list choice box with all
-        available cameras, puts None if no camera is available
+        available cameras from the camera information cache, puts None if no
+        camera is available. The camera bound to the displayed one is selected.
         """
         self.CamsChoiceBox.clear()
-        camList = self.camera.listCams()
+        camList = self.camera.infoCache.get("cameras")
 
-        if len(camList) == 0 or camList is None:
+        if not camList:
             self.CamsChoiceBox.addItem("None")
             logger.warning("No camera detected")
             return
 
         logger.debug("Updating camera list with %d entries", len(camList))
 
-        for cam in camList:
-            for i in cam:
-                self.CamsChoiceBox.addItem(i)
+        for name, port in camList:
+            self.CamsChoiceBox.addItem(f"{name} ({port})", port)
+            if port == self.camera.port:
+                self.CamsChoiceBox.setItemText(
+                    self.CamsChoiceBox.count() - 1, f"{name} ({port}){CHOSEN_STRING}"
+                )
+                self.CamsChoiceBox.setCurrentIndex(self.CamsChoiceBox.count() - 1)
 
     @staticmethod
     def filteredDir(obj) -> dict:
@@ -259,17 +416,16 @@ class CameraPage(AbstractPage):
 
     def updateAll(self) -> None:
         """
-        updateAll : Updates the camera properties table
+        updateAll : Updates the camera properties table from the camera
+        information cache, without querying the camera
         """
-        propertiesDict = {
-            "Capacités": self.camera.getAbilities(),
-            "Configration": self.camera.getConfig(),
-            "À propos": self.camera.getAbout(),
-            "Sommaire": self.camera.getSummary(),
-        }
         displayStr = ""
-        for name, obj in propertiesDict.items():
+        for entry, name in PROPERTIES_NAMES.items():
             displayStr += f"\n<h3>{name}</h3>\n"
+            obj = self.camera.infoCache.get(entry)
+            if obj is None:
+                displayStr += "<i>Indisponible</i><br>"
+                continue
             displayStr += self.htmlTablize(self.filteredDir(obj))
 
         self.PropertiesText.setText(displayStr)
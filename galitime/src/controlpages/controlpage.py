@@ -11,6 +11,7 @@ import os
 
 import cups
 from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QImage
 from PyQt5.QtWidgets import QGridLayout, QHBoxLayout, QVBoxLayout, QWidget
 from PyQt5.QtWidgets import QLabel, QMessageBox, QProgressDialog, QPushButton
 
@@ -18,11 +19,15 @@ from ..abstractcontrolwindow import AbstractControlWindow
 from ..controlpages.abstractpage import AbstractPage
 from ..controlpages.pagesenum import PageEnum
 from ..managers.emailmanager import EmailManager
+from ..managers.eventindex import EventIndex, PHOTO_EXPORT, PHOTO_SHEET
 from ..managers.eventmanager import EventManager
 from ..managers.photomanager import PhotoManager
 from ..peripherals.camera import CameraWrapper
+from ..peripherals.cameraconnector import STATE_CONNECTING, STATE_FAILED
+from ..peripherals.cameragroup import CameraGroup
 from ..peripherals.printer import ImagePrinter
 from ..screenwindow import ScreenWindow
+from ..utilities.constants import BURST_INTERVAL
 from ..utilities.constants import DEFAULT_PHOTO
 from ..utilities.constants import PRINT_TIME
 from ..utilities.stylesheet import cssify
@@ -34,6 +39,12 @@ logger.propagate = True
 
 # ----------------------------------
 
+# Camera status label text for each connection state
+CAMERA_STATE_TEXTS = {
+    STATE_CONNECTING: "Connexion à la caméra...",
+    STATE_FAILED: "Caméra injoignable",
+}
+
 
 class ControlPage(AbstractPage):
     """
@@ -44,8 +55,11 @@ class ControlPage(AbstractPage):
         self.mainWindow = mainWindow
 
         self.PhotoButton = None
+        self.StripButton = None
         self.PrintButton = None
+        self.EmailButton = None
         self.PauseButton = None
+        self.CameraStatusLabel = None
         self.currentPhotoFullFilePath = os.path.abspath(DEFAULT_PHOTO)
 
         self.tempEventInfo = {
@@ -54,6 +68,18 @@ class ControlPage(AbstractPage):
 
         self.screenWindow = ScreenWindow.getScreen()
         self.camera = CameraWrapper.getCamera()
+        self.cameraGroup = CameraGroup(CameraWrapper.getCameras())
+        self.downloadJobId = None
+        self.exportJobId = None
+
+        self.cardShotsPending = 0
+
+        self.isStrip = False
+        self.burstShots = 1
+        self.burstTaken = 0
+        self.burstJobIds = []
+        self.burstPhotos = []
+        self.stripJobId = None
 
         self.timer = QTimer()
         self.timer.timeout.connect(self.tickTimer)
@@ -109,12 +135,12 @@ class ControlPage(AbstractPage):
         ButtonGridLayout.addWidget(self.PauseButton, 0, 1)
 
         # 3.3 Email button
-        EmailButton = QPushButton("Envoyer par mail")
-        EmailButton.clicked.connect(
+        self.EmailButton = QPushButton("Envoyer par mail")
+        self.EmailButton.clicked.connect(
             lambda: EmailManager.addPhotoToMailFolder(self.currentPhotoFullFilePath)
         )
-        EmailButton.setStyleSheet(cssify("Big Blue"))
-        ButtonGridLayout.addWidget(EmailButton, 1, 0)
+        self.EmailButton.setStyleSheet(cssify("Big Blue"))
+        ButtonGridLayout.addWidget(self.EmailButton, 1, 0)
 
         # 3.4 Print button
         self.PrintButton = QPushButton("Imprimer la photo")
@@ -122,6 +148,19 @@ class ControlPage(AbstractPage):
         self.PrintButton.setStyleSheet(cssify("Big Blue"))
         ButtonGridLayout.addWidget(self.PrintButton, 1, 1)
 
+        # 3.5 Strip button
+        self.StripButton = QPushButton(self.screenWindow.getSheetLayout().name)
+        self.StripButton.clicked.connect(self.stripButtonCallback)
+        self.StripButton.setStyleSheet(cssify("Big Blue"))
+        ButtonGridLayout.addWidget(self.StripButton, 2, 0, 1, 2)
+
+        # 4 Camera status label, empty while the camera works
+        self.CameraStatusLabel = QLabel()
+        self.CameraStatusLabel.setAlignment(Qt.AlignCenter)
+        self.CameraStatusLabel.setWordWrap(True)
+        MainVLayout.addWidget(self.CameraStatusLabel)
+        self._onCameraStateChanged(self.camera.connector.getState())
+
         # 6 Option Layout
         OptionHLayout = QHBoxLayout()
         MainVLayout.addLayout(OptionHLayout)
@@ -156,9 +195,68 @@ class ControlPage(AbstractPage):
         EmailSenderButton.setStyleSheet(cssify("Tall"))
         OptionHLayout.addWidget(EmailSenderButton)
 
+        self.camera.downloader.photoDownloaded.connect(self._onPhotoDownloaded)
+        self.camera.downloader.downloadFailed.connect(self._onDownloadFailed)
+        self.camera.ingester.photoIngested.connect(self._onPhotoIngested)
+        self.camera.ingester.ingestFailed.connect(self._onIngestFailed)
+        self.screenWindow.exporter.exported.connect(self._onExported)
+        self.screenWindow.exporter.exportFailed.connect(self._onExportFailed)
+        self.camera.connector.stateChanged.connect(self._onCameraStateChanged)
+        self.camera.connector.failed.connect(self._onCameraConnectionFailed)
+        self.camera.connector.errorOccurred.connect(self._onCameraError)
+
         logger.debug("Control page loaded")
         return MainContainer
 
+    def unload(self) -> None:
+        """
+        unload : Disconnects the page from the camera photo downloader, ingester
+        and connector
+        """
+        self.camera.downloader.photoDownloaded.disconnect(self._onPhotoDownloaded)
+        self.camera.downloader.downloadFailed.disconnect(self._onDownloadFailed)
+        self.camera.ingester.photoIngested.disconnect(self._onPhotoIngested)
+        self.camera.ingester.ingestFailed.disconnect(self._onIngestFailed)
+        self.screenWindow.exporter.exported.disconnect(self._onExported)
+        self.screenWindow.exporter.exportFailed.disconnect(self._onExportFailed)
+        self.camera.connector.stateChanged.disconnect(self._onCameraStateChanged)
+        self.camera.connector.failed.disconnect(self._onCameraConnectionFailed)
+        self.camera.connector.errorOccurred.disconnect(self._onCameraError)
+
+    def _onCameraStateChanged(self, state: str) -> None:
+        """
+        _onCameraStateChanged : Camera connector callback, displays the connection
+        state while the camera isn't usable
+
+        Args:
+            state (str): Connection state, see CameraConnector
+        """
+        self.CameraStatusLabel.setText(CAMERA_STATE_TEXTS.get(state, ""))
+
+    def _onCameraConnectionFailed(self, error: str, retryDelay: float) -> None:
+        """
+        _onCameraConnectionFailed : Camera connector callback, displays the delay
+        before the next connection attempt
+
+        Args:
+            error (str): Connection error
+            retryDelay (float): Delay before the next attempt in seconds
+        """
+        self.CameraStatusLabel.setText(
+            f"Caméra injoignable, nouvel essai dans {retryDelay:.0f} s"
+        )
+        self.CameraStatusLabel.setToolTip(error)
+
+    def _onCameraError(self, error: str) -> None:
+        """
+        _onCameraError : Camera connector callback, displays a camera error without
+        interrupting the booth
+
+        Args:
+            error (str): Error description
+        """
+        self.CameraStatusLabel.setText(f"Erreur caméra : {error}")
+
     def togglePause(self) -> None:
         """
         togglePause : Pauses/Resumes the preview process
@@ -188,30 +286,59 @@ class ControlPage(AbstractPage):
         the timer countdown or returns to previewing
         """
         if self.screenWindow.isPreviewing():
-            self.PhotoButton.setEnabled(False)
-            self.PhotoButton.setStyleSheet(cssify("Big Disabled"))
-
-            self.PauseButton.setEnabled(False)
-            self.PauseButton.setStyleSheet(cssify("Big Disabled"))
-
+            self._disableCaptureButtons()
             self.startCountdown()
         else:
             self.PauseButton.setEnabled(True)
             self.PauseButton.setStyleSheet(cssify("Big Green"))
 
+            self.StripButton.setEnabled(True)
+            self.StripButton.setStyleSheet(cssify("Big Blue"))
+
             self.PhotoButton.setText("Prendre la photo")
             self.screenWindow.startPreview()
 
-    def startCountdown(self) -> None:
+    def stripButtonCallback(self) -> None:
+        """
+        stripButtonCallback : Function linked to the strip button, starts a
+        countdown for as many photos as the current layout holds
+        """
+        if not self.screenWindow.isPreviewing():
+            return
+
+        self._disableCaptureButtons()
+        self.startCountdown(self.screenWindow.getSheetLayout().getSlotCount(), isStrip=True)
+
+    def _disableCaptureButtons(self) -> None:
+        for button in (self.PhotoButton, self.PauseButton, self.StripButton):
+            button.setEnabled(False)
+            button.setStyleSheet(cssify("Big Disabled"))
+
+    def startCountdown(self, shots: int = 1, isStrip: bool = False) -> None:
         """
         startCountdown : Starts the photo countdown
+
+        Args:
+            shots (int, optional): Number of photos taken one after the other.
+            Defaults to 1.
+            isStrip (bool, optional): Composes the photos in a sheet of the current
+            layout, such as a photo strip. Defaults to False.
         """
         if self.timer.isActive():
             return
 
+        self.isStrip = isStrip
+        self.burstShots = shots
+        self.burstTaken = 0
+        self.burstJobIds = []
+        self.burstPhotos = []
+
         self.timer.countdown = 3
+        self.screenWindow.prerenderTexts(
+            [*range(max(self.timer.countdown, BURST_INTERVAL), 0, -1), "SOURIEZ"]
+        )
         self.timer.start(1000)
-        logger.info("Photo countdown started")
+        logger.info("Photo countdown started for %u shot(s)", shots)
 
     def tickTimer(self) -> None:
         """
@@ -221,13 +348,13 @@ class ControlPage(AbstractPage):
             self.timer.stop()
             # Timer end
             self.screenWindow.showText("")
-            self.takePhoto()
-
-            self.PhotoButton.setEnabled(True)
-            self.PhotoButton.setStyleSheet(cssify("Big Blue"))
-            self.PhotoButton.setText("Revenir à l'aperçu")
+            if self.isStrip:
+                self.takeBurstShot()
+            else:
+                self.takePhoto()
 
             logger.info("Photo countdown ended")
+            return
         elif self.timer.countdown == 0:
             self.screenWindow.showText("SOURIEZ")
         else:
@@ -235,36 +362,342 @@ class ControlPage(AbstractPage):
 
         self.timer.countdown -= 1
 
-    def takePhoto(self) -> str:
+    def takePhoto(self) -> None:
         """
-        takePhoto : Takes a photo using the camera library and return the
-
-        Returns:
-            str: Full photo file path with name
+        takePhoto : Takes a photo using the camera library and displays its
+        thumbnail right away. The full resolution photo is downloaded in the
+        background and replaces the thumbnail once ready, see _onPhotoDownloaded.
+        In card capture mode, the photo is displayed once ingested from the
+        memory card instead, see _onPhotoIngested.
         """
         logger.info("Taking photo...")
-        photoFolder = PhotoManager().getPhotoFolder()
-
         self.screenWindow.stopPreview()
 
-        rawPhotoFullPath = self.camera.takePhoto(photoFolder)
+        result = self._captureAll()
+        if self.camera.capturesToCard():
+            if result:
+                self.cardShotsPending += 1
+                return
+            cameraFilePath = None
+        else:
+            cameraFilePath = result
 
-        if rawPhotoFullPath is None:
+        if cameraFilePath is None:
             rawPhotoFullPath = os.path.abspath(DEFAULT_PHOTO)
             logger.warning(
                 "No photo path was supplied, defaulting to default image%s",
                 rawPhotoFullPath
                 )
+            self.screenWindow.displayImage(rawPhotoFullPath)
+            self._exportPhoto(rawPhotoFullPath)
+            return
+
+        self.downloadJobId = self._queueDownload(cameraFilePath)
+
+    def _captureAll(self) -> object:
+        """
+        _captureAll : Captures a photo with every camera at the same time, see
+        CameraGroup. The photos of the other cameras are downloaded, or ingested,
+        in the background by their own worker without being displayed.
+
+        Returns:
+            object: Main camera result, see CameraWrapper.capturePhoto and
+            triggerPhoto
+        """
+        mainResult, *otherResults = self.cameraGroup.capture()
+        for camera, result in zip(self.cameraGroup.cameras[1:], otherResults):
+            if result is not None and not camera.capturesToCard():
+                camera.downloader.download(result, PhotoManager().getPhotoFolder())
+        return mainResult
+
+    def _queueDownload(self, cameraFilePath: object) -> int:
+        """
+        _queueDownload : Displays the thumbnail of a captured photo and queues its
+        download
+
+        Args:
+            cameraFilePath (object): Captured photo path on the camera
+
+        Returns:
+            int: Download job id
+        """
+        thumbnail = QImage.fromData(self.camera.getThumbnail(cameraFilePath))
+        if not thumbnail.isNull():
+            self.screenWindow.setScreenImage(thumbnail)
+
+        return self.camera.downloader.download(
+            cameraFilePath, PhotoManager().getPhotoFolder()
+        )
+
+    def takeBurstShot(self) -> None:
+        """
+        takeBurstShot : Takes one photo of a strip and queues its download, then
+        starts the countdown of the next one. The next photo is taken while the
+        previous ones are still downloading or being ingested. The preview is
+        resumed during the countdown, see _resumeBurstPreview.
+        """
+        logger.info(
+            "Taking strip photo %u/%u...", self.burstTaken + 1, self.burstShots
+        )
+        self.screenWindow.stopPreview()
+
+        result = self._captureAll()
+        captured = bool(result)
+        if captured:
+            if self.camera.capturesToCard():
+                self.cardShotsPending += 1
+            else:
+                self.burstJobIds.append(self._queueDownload(result))
+
+        if not captured:
+            logger.warning("Strip photo capture failed, ending strip")
+            self.burstShots = self.burstTaken
+            self._checkStripComplete()
+            return
+
+        self.burstTaken += 1
+        if self.burstTaken < self.burstShots:
+            self.timer.countdown = BURST_INTERVAL
+            self.timer.start(1000)
+            self._resumeBurstPreview()
+
+    def _resumeBurstPreview(self) -> None:
+        """
+        _resumeBurstPreview : Resumes the preview during the countdown between two
+        strip photos. When the preview process takes the camera over (stream and
+        file modes), the preview is only resumed once the previous photos are
+        downloaded, as the downloads need the camera session. Card ingestion
+        simply waits for the end of the strip.
+        """
+        if (
+            not self.isStrip or self.burstTaken >= self.burstShots
+            or not self.timer.isActive() or self.screenWindow.isPreviewing()
+        ):
+            return
+        if self.camera.releasesCamera() and \
+                len(self.burstPhotos) < len(self.burstJobIds):
+            return
+        self.screenWindow.startPreview()
 
+    def _checkStripComplete(self) -> None:
+        """
+        _checkStripComplete : Exports the strip in the background once every strip
+        photo is downloaded, see _onExported. Photos are retrieved in the
+        order they were taken.
+        """
+        if len(self.burstPhotos) < self.burstShots:
+            return
+
+        photoPaths = [path for path in self.burstPhotos if path is not None]
+        self.burstJobIds = []
+        self.burstPhotos = []
+
+        if not photoPaths:
+            logger.error("No strip photo could be taken")
+            self._enableReturnButton()
+            return
+
+        layout = self.screenWindow.getSheetLayout()
+        stripPath = (
+            EventManager.getEventFolder() + layout.id + "_"
+            + os.path.basename(photoPaths[0])
+        )
+        self.stripJobId = self.screenWindow.exportLayout(photoPaths, stripPath)
+        self._setSharingEnabled(False)
+        logger.info("Exporting %s sheet of %u photos", layout.id, len(photoPaths))
+
+    def _onExported(self, jobId: int, filepath: str) -> None:
+        """
+        _onExported : Export worker callback, makes the exported photo or strip
+        the current photo, ready to be printed or emailed. Returning to the
+        preview is allowed once the strip is exported.
+
+        Args:
+            jobId (int): Export job id
+            filepath (str): Exported file path
+        """
+        if jobId == self.exportJobId:
+            self.exportJobId = None
+            PhotoManager.addPhoto(filepath, PHOTO_EXPORT)
+            logger.debug("Stacked photo exported at %s", filepath)
+        elif jobId == self.stripJobId:
+            self.stripJobId = None
+            PhotoManager.addPhoto(filepath, PHOTO_SHEET)
+            logger.debug("Strip exported at %s", filepath)
+            self._enableReturnButton()
+        else:
+            return
+
+        self.currentPhotoFullFilePath = filepath
+        self._setSharingEnabled(True)
+
+    def _onExportFailed(self, jobId: int, error: str) -> None:
+        """
+        _onExportFailed : Export worker callback, displays the error. The previous
+        photo stays the current one.
+
+        Args:
+            jobId (int): Export job id
+            error (str): Error message
+        """
+        if jobId == self.exportJobId:
+            self.exportJobId = None
+            exported = "photo"
+        elif jobId == self.stripJobId:
+            self.stripJobId = None
+            exported = "strip"
+            self._enableReturnButton()
+        else:
+            return
+
+        self._setSharingEnabled(True)
+        QMessageBox.critical(
+            self.mainWindow,
+            "Export error",
+            f"An error occurred while exporting the {exported}:\n\nError:\n{error}"
+        )
+
+    def _onPhotoDownloaded(self, jobId: int, rawPhotoFullPath: str, image: QImage):
+        """
+        _onPhotoDownloaded : Photo downloader callback, displays the full resolution
+        photo in place of its thumbnail and exports it.
+
+        Args:
+            jobId (int): Download job id
+            rawPhotoFullPath (str): Downloaded photo file path
+            image (QImage): Decoded photo
+        """
+        if jobId in self.burstJobIds:
+            self._addStripPhoto(rawPhotoFullPath)
+            self._resumeBurstPreview()
+            return
+
+        if jobId != self.downloadJobId:
+            return
+        self.downloadJobId = None
+
+        self.screenWindow.setScreenImage(image)
+        self._exportPhoto(rawPhotoFullPath)
+
+    def _onDownloadFailed(self, jobId: int, error: str) -> None:
+        """
+        _onDownloadFailed : Photo downloader callback, displays the error in the
+        camera status and falls back on the default image.
+
+        Args:
+            jobId (int): Download job id
+            error (str): Error message
+        """
+        if jobId in self.burstJobIds:
+            self._addStripPhoto(None)
+            self._resumeBurstPreview()
+            return
+
+        if jobId != self.downloadJobId:
+            return
+        self.downloadJobId = None
+
+        # Not modal, the booth goes on with the default image
+        logger.error("Photo download failed: %s", error)
+        self.CameraStatusLabel.setText(f"Erreur caméra : {error}")
+
+        rawPhotoFullPath = os.path.abspath(DEFAULT_PHOTO)
         self.screenWindow.displayImage(rawPhotoFullPath)
+        self._exportPhoto(rawPhotoFullPath)
+
+    def _onPhotoIngested(self, rawPhotoFullPath: str, image: QImage) -> None:
+        """
+        _onPhotoIngested : Card ingester callback, handles the ingested photos of
+        the triggered captures like downloaded ones. Photos left on the card by a
+        previous session are only saved.
+
+        Args:
+            rawPhotoFullPath (str): Ingested photo file path
+            image (QImage): Decoded photo
+        """
+        if self.cardShotsPending == 0:
+            logger.info("Recovered photo %s from the memory card", rawPhotoFullPath)
+            return
+        self.cardShotsPending -= 1
 
-        PhotoManager.incrementPhotoNumber()
-        self.currentPhotoFullFilePath = self.screenWindow.exportImage(
+        self.screenWindow.setScreenImage(image)
+        if self.isStrip:
+            self._addStripPhoto(rawPhotoFullPath)
+        else:
+            self._exportPhoto(rawPhotoFullPath)
+
+    def _onIngestFailed(self, error: str) -> None:
+        """
+        _onIngestFailed : Card ingester callback, a card file was skipped after
+        failing repeatedly. Falls back on the default image, or ends the strip
+        photo, like a failed download.
+
+        Args:
+            error (str): Error message
+        """
+        if self.cardShotsPending == 0:
+            return
+        self.cardShotsPending -= 1
+
+        logger.error("Photo ingestion failed: %s", error)
+        self.CameraStatusLabel.setText(f"Erreur caméra : {error}")
+
+        if self.isStrip:
+            self._addStripPhoto(None)
+            return
+
+        rawPhotoFullPath = os.path.abspath(DEFAULT_PHOTO)
+        self.screenWindow.displayImage(rawPhotoFullPath)
+        self._exportPhoto(rawPhotoFullPath)
+
+    def _addStripPhoto(self, rawPhotoFullPath: str) -> None:
+        """
+        _addStripPhoto : Adds a retrieved strip photo and exports the strip if it
+        was the last one
+
+        Args:
+            rawPhotoFullPath (str): Photo file path, None if it couldn't be
+            retrieved
+        """
+        self.burstPhotos.append(rawPhotoFullPath)
+        self._checkStripComplete()
+
+    def _exportPhoto(self, rawPhotoFullPath: str) -> None:
+        """
+        _exportPhoto : Exports the displayed photo stacked with the decor in the
+        event folder, in the background, and allows returning to the preview right
+        away. The photo can be printed or emailed once exported, see _onExported.
+
+        Args:
+            rawPhotoFullPath (str): Raw photo file path
+        """
+        self.exportJobId = self.screenWindow.exportImage(
             EventManager.getEventFolder() + os.path.basename(rawPhotoFullPath)
         )
-        logger.debug("Stacked photo exported at %s", self.currentPhotoFullFilePath)
+        self._setSharingEnabled(False)
+
+        self._enableReturnButton()
+
+    def _setSharingEnabled(self, enabled: bool) -> None:
+        """
+        _setSharingEnabled : Enables the print and email buttons, disabled while
+        the current photo is being exported. The print button stays disabled while
+        printing.
 
-        return self.currentPhotoFullFilePath
+        Args:
+            enabled (bool): Buttons enabled
+        """
+        buttons = [self.EmailButton]
+        if not self.printerTimer.isActive():
+            buttons.append(self.PrintButton)
+        for button in buttons:
+            button.setEnabled(enabled)
+            button.setStyleSheet(cssify("Big Blue" if enabled else "Big Disabled"))
+
+    def _enableReturnButton(self) -> None:
+        self.PhotoButton.setEnabled(True)
+        self.PhotoButton.setStyleSheet(cssify("Big Blue"))
+        self.PhotoButton.setText("Revenir à l'aperçu")
 
     def printImage(self) -> None:
         """
@@ -293,6 +726,10 @@ class ControlPage(AbstractPage):
                 )
             return
 
+        index = EventIndex.getIndex()
+        if index is not None:
+            index.addPrintJob(self.currentPhotoFullFilePath, ImagePrinter.printerName)
+
         self.progressDialog = QProgressDialog("Printing photo...", "Close", 0, 100)
         self.progressDialog.canceled.connect(self.stopPrinterTimer)
         # self.progressDialog.setAutoClose(True)
@@ -324,10 +761,12 @@ class ControlPage(AbstractPage):
 
     def stopPrinterTimer(self) -> None:
         """
-        stopPrinterTimer : Stops timer button and renenables the print button
+        stopPrinterTimer : Stops timer button and renenables the print button,
+        unless the next photo is still being exported
         """
         self.printerTimer.stop()
         logger.info("Printer timer stopped")
 
-        self.PrintButton.setEnabled(True)
-        self.PrintButton.setStyleSheet(cssify("Big Blue"))
+        if self.exportJobId is None and self.stripJobId is None:
+            self.PrintButton.setEnabled(True)
+            self.PrintButton.setStyleSheet(cssify("Big Blue"))
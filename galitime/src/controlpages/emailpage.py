@@ -155,7 +155,7 @@ class MailPage(AbstractPage):
     def updateMailCount(self) -> None:
         """Update the number of emails to be sent"""
         self.MailCountEdit.setText(
-            str(EmailManager.getEmailNumber()) + " dossiers email trouvés"
+            str(EmailManager.getEmailNumber()) + " adresses email trouvées"
         )
 
     def updateMailList(self) -> None:
@@ -173,12 +173,12 @@ class MailPage(AbstractPage):
         """
         Sends emails to selected persons
         """
-        selectedEmailFolders: list[str] = [self.EmailList.item(i).text() for i in
+        selectedEmails: list[str] = [self.EmailList.item(i).text() for i in
             range(self.EmailList.count()) if
             self.EmailList.item(i).checkState() == Qt.Checked]
-        logger.info("Sending %d with corresponding photos", len(selectedEmailFolders))
+        logger.info("Sending %d with corresponding photos", len(selectedEmails))
         try:
-            EmailManager.sendPhotosToMails(selectedEmailFolders)
+            EmailManager.sendPhotosToMails(selectedEmails)
         except (socket.gaierror, smtplib.SMTPException) as err:
             logger.error(
                 "A mail sending error occurred : %s\n", str(err)
@@ -187,7 +187,7 @@ class MailPage(AbstractPage):
                 None,
                 "Sending error",
                 "An mail sending error occurred while trying to send "
-                f"{len(selectedEmailFolders)} mails:\n\nError:\n{err}"
+                f"{len(selectedEmails)} mails:\n\nError:\n{err}"
             )
 
     def readConfig(self):
@@ -10,7 +10,7 @@ import logging
 import os.path
 
 from PyQt5.QtCore import QDate, Qt
-from PyQt5.QtWidgets import QAbstractSpinBox
+from PyQt5.QtWidgets import QAbstractSpinBox, QComboBox
 from PyQt5.QtWidgets import QDateEdit, QLabel, QLineEdit, QPushButton
 from PyQt5.QtWidgets import QFileDialog
 from PyQt5.QtWidgets import QGridLayout, QHBoxLayout, QVBoxLayout, QWidget
@@ -19,6 +19,7 @@ from ..abstractcontrolwindow import AbstractControlWindow
 from ..controlpages.abstractpage import AbstractPage
 from ..controlpages.pagesenum import PageEnum
 from ..managers.eventmanager import EventManager
+from ..rendering.layout import listLayouts
 from ..screenwindow import ScreenWindow
 from ..utilities.constants import DATE_FORMAT
 from ..utilities.stylesheet import cssify
@@ -48,6 +49,8 @@ class OptionsPage(AbstractPage):
         self.EventDateInput = None
         self.SaveFolderPathInput = None
         self.DecorFileInput = None
+        self.LayoutChoiceBox = None
+        self.layouts = []
         self.errorLabel = None
         self.ExitButton = None
 
@@ -157,6 +160,15 @@ class OptionsPage(AbstractPage):
         # BrowseButton2.setStyleSheet(cssify("Big Flat"))
         OptionsGridLayout.addWidget(BrowseButton2, 4, 3)
 
+        # 5.3 Layout Label
+        LayoutLabel = QLabel("Mise en page")
+        OptionsGridLayout.addWidget(LayoutLabel, 5, 1)
+
+        # 5.4 Layout choice, the templates of LAYOUT_FOLDER
+        self.LayoutChoiceBox = QComboBox()
+        self.updateLayoutList()
+        OptionsGridLayout.addWidget(self.LayoutChoiceBox, 5, 2)
+
         # 6 Error Label
         self.errorLabel = QLabel()
         self.errorLabel.setAlignment(Qt.AlignCenter)
@@ -197,6 +209,36 @@ class OptionsPage(AbstractPage):
         logger.debug("Options page loaded")
         return MainContainer
 
+    def updateLayoutList(self) -> None:
+        """
+        updateLayoutList : Lists the layout templates, selecting the one saved with
+        the event if any, the current one otherwise
+        """
+        currentLayout = self.screenWindow.getSheetLayout()
+        # The current layout is kept as is, along with its rendered static parts
+        self.layouts = [
+            currentLayout if layout.filepath == currentLayout.filepath else layout
+            for layout in listLayouts()
+        ]
+        if currentLayout not in self.layouts:
+            self.layouts.insert(0, currentLayout)
+
+        selectedLayout = currentLayout
+        layoutId = EventManager.getLayoutId()
+        if layoutId and layoutId != currentLayout.id:
+            savedLayouts = [layout for layout in self.layouts if layout.id == layoutId]
+            if savedLayouts:
+                selectedLayout = savedLayouts[0]
+            else:
+                logger.warning("Layout %s of the event not found", layoutId)
+
+        self.LayoutChoiceBox.clear()
+        for layout in self.layouts:
+            self.LayoutChoiceBox.addItem(
+                f"{layout.name} ({layout.getSlotCount()} photos)"
+            )
+        self.LayoutChoiceBox.setCurrentIndex(self.layouts.index(selectedLayout))
+
     def chooseSaveFolderButtonCall(self) -> None:
         """
         choosesaveFolderPath : Prompts the user with a file dialog to choose
@@ -304,6 +346,9 @@ class OptionsPage(AbstractPage):
         EventManager.setEventDate(self.tempEventInfo["eventDate"])
         EventManager.setEventFolder(self.tempEventInfo["saveFolder"])
         self.screenWindow.setDecorFile(self.tempEventInfo["decorFile"])
+        layout = self.layouts[self.LayoutChoiceBox.currentIndex()]
+        self.screenWindow.setSheetLayout(layout)
+        EventManager.setLayoutId(layout.id)
 
         if self.createEvent and not EventManager.isEventOpened():
             EventManager.initSaveFolder(EventManager.getEventFolder())
@@ -336,4 +381,5 @@ class OptionsPage(AbstractPage):
             self.screenWindow.stopPreview()
 
         EventManager.setEventOpened(False)
+        EventManager.closeSaveFolder()
         self.mainWindow.loadPage(PageEnum.START)
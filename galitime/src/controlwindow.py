@@ -79,6 +79,9 @@ class ControlWindow(AbstractControlWindow):
             page (str): page name
         """
 
+        if self.currentPage is not None:
+            self.currentPage.unload()
+
         self.currentPage = PAGE_DICT[page](self, *args, **kwargs)
         self.setCentralWidget(self.currentPage.load())
 
@@ -12,8 +12,10 @@ from PyQt5.QtWidgets import QApplication
 
 from .controlwindow import ControlWindow
 from .peripherals.camera import CameraWrapper
+from .peripherals.camerabackend import createBackend
 from .screenwindow import ScreenWindow
 from .utilities import logger
+from .utilities.constants import CAMERA_PORTS
 
 
 def main():
@@ -26,7 +28,8 @@ def main():
 
     app = QApplication(sys.argv)
 
-    cam = CameraWrapper()
+    backend = createBackend()
+    cams = [CameraWrapper(backend=backend, port=port) for port in CAMERA_PORTS]
     screen = ScreenWindow()
     control = ControlWindow()
 
@@ -35,7 +38,8 @@ def main():
     control.show()
     screen.show()
 
-    cam.connect()
+    for cam in cams:
+        cam.connectInBackground()
 
     sys.exit(app.exec())
 
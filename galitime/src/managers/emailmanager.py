@@ -10,20 +10,19 @@ import atexit
 # Config & data files
 import configparser
 import email.message
-import json
 import logging
 import mimetypes
 # File manipulation
 import os
-import shutil
 # Email sending
 import smtplib
 
 from PyQt5.QtWidgets import QMessageBox
 
 from .emailinput import EmailInput
+from .eventindex import EventIndex
 from ..utilities.constants import EMAIL_CONFIG_FILE
-from ..utilities.constants import EMAIL_INFO_FILE, ENCODING
+from ..utilities.constants import ENCODING
 from ..utilities.constants import DEFAULT_PHOTO
 
 logger = logging.getLogger(__name__)
@@ -35,20 +34,8 @@ class EmailManager:
 
     eventManager = None
     config = configparser.ConfigParser()
-    emailFolder = None
     mailSession: smtplib.SMTP = None
 
-    @classmethod
-    def setEmailFolder(cls, folderpath: str) -> None:
-        """setEmailFolder : Sets the emails folder path
-
-        Args:
-            folderpath (str): folderpath to the emails folder
-        """
-        if not folderpath.endswith("/"):
-            folderpath += "/"
-        cls.emailFolder = folderpath
-
     @classmethod
     def setEventManager(cls, eventManager: str) -> None:
         """setEventManager : Sets the event manager object
@@ -59,16 +46,6 @@ class EmailManager:
         if eventManager is not None:
             cls.eventManager = eventManager
 
-    @classmethod
-    def getEmailFolder(cls) -> str:
-        """
-        getEmailFolder : Returns the email folder path
-
-        Returns:
-            str: Email folder path
-        """
-        return cls.emailFolder
-
     @classmethod
     def getEmailNumber(cls) -> int:
         """
@@ -77,55 +54,19 @@ class EmailManager:
         Returns:
             int: Number of email addresses
         """
-
-        return len(os.listdir(cls.emailFolder))
+        index = EventIndex.getIndex()
+        return index.countRecipients() if index is not None else 0
 
     @classmethod
     def getEmailList(cls) -> list[str]:
         """
-        getEmailList : Returns a list contining all email folders
-
-        Returns:
-            list[str]: List of emai folders
-        """
-        return os.listdir(cls.emailFolder)
-
-    @classmethod
-    def createMailFolder(cls, mail: str) -> str:
-        """createMailFolder : Creates a folder for the supplied email
-
-        Args:
-            mail (str): email in the form example@domain.xxx
-
-        Returns:
-            str: folderpath to the email folder
-        """
-        mailPath = cls.emailFolder + mail.replace("/", " ")
-        os.mkdir(mailPath)
-
-        mailDict = {
-            "email": mail, "photoNumber": 0,
-        }
-        cls._writeEmailInfo(mail, mailDict)
-
-        logger.info("New email folder created for email %s", mail)
-
-        return mailPath
-
-    @classmethod
-    def getMail(cls, mail: str) -> str:
-        """getMail : Retrieves folderpath to the mail folder.
-
-        Args:
-            mail (str): email in the form example@domain.xxx
+        getEmailList : Returns the email addresses stored, see EventIndex
 
         Returns:
-            str: Filepath to the email folder, empty string if not found.
+            list[str]: Email addresses, sorted
         """
-        mailPath = cls.emailFolder + mail.replace("/", " ")
-        if not os.path.exists(mailPath):
-            return ""
-        return mailPath
+        index = EventIndex.getIndex()
+        return index.getRecipients() if index is not None else []
 
     @classmethod
     def readConfig(cls) -> None:
@@ -168,29 +109,26 @@ class EmailManager:
         logger.error(error_msg)
         QMessageBox.critical(cls.eventManager.parent, "Configuration error", error_msg)
 
-    @classmethod
-    def _readEmailInfo(cls, mail: str) -> dict:
-        with open(
-                cls.emailFolder + mail + "/" + EMAIL_INFO_FILE, "rt", encoding=ENCODING
-        ) as file:
-            return json.load(file)
-
-    @classmethod
-    def _writeEmailInfo(cls, mail: str, infoDict: dict) -> None:
-        mailPath = cls.emailFolder + mail.replace("/", " ")
-
-        with open(mailPath + "/" + EMAIL_INFO_FILE, "wt", encoding=ENCODING) as file:
-            json.dump(infoDict, file, indent=4)
-
     @classmethod
     def addPhotoToMailFolder(cls, photoPath: str) -> None:
-        """addPhotoToMailFolder
+        """addPhotoToMailFolder : Prompts for email addresses and adds the photo to
+        those sent to them, in the event index
 
         Args:
             photoPath (str): photo filepath to add to email
         """
-        if os.path.basename(photoPath) == DEFAULT_PHOTO:
+        if os.path.basename(photoPath) == os.path.basename(DEFAULT_PHOTO):
             logger.warning("Ignoring default photo %s", DEFAULT_PHOTO)
+            return
+
+        if len(photoPath) == 0:
+            logger.error("No photo supplied")
+            return
+
+        index = EventIndex.getIndex()
+        if index is None:
+            logger.error("No event opened, can't add photo %s to emails", photoPath)
+            return
 
         Input = EmailInput()
         Input.prompt(cls.getEmailList())
@@ -201,21 +139,11 @@ class EmailManager:
             return
 
         for mail in mailList:
-            mailPath = cls.getMail(mail)
-            if len(mailPath) == 0:
-                mailPath = cls.createMailFolder(mail)
+            if not index.hasRecipient(mail):
+                logger.info("New email recipient %s", mail)
+            index.addRecipientPhoto(mail, photoPath)
 
-            if len(photoPath) == 0:
-                logger.error("No photo supplied")
-                return
-
-            shutil.copy(photoPath, mailPath)
-
-            mailDict = cls._readEmailInfo(mail)
-            mailDict["photoNumber"] += 1
-            cls._writeEmailInfo(mail, mailDict)
-
-        logger.info("Added photo %s to %s mail folders", photoPath, repr(mailList))
+        logger.info("Added photo %s to %s mail recipients", photoPath, repr(mailList))
 
         # cls.sendViaMail(mailList, photoPath)
 
@@ -480,43 +408,39 @@ class EmailManager:
         cls.closeConnection()
 
     @classmethod
-    def sendPhotosToMails(cls, mailFolderList: list[str]) -> None:
+    def sendPhotosToMails(cls, mailList: list[str]) -> None:
         """
-        Sends all photos in the email folder to relevant email
+        Sends the photos added to each email address, see addPhotoToMailFolder, and
+        records the sends in the event index
 
         Args:
-            mailFolderList (list[str]): List of email to send named folders to
+            mailList (list[str]): List of email addresses to send photos to
         """
-        logger.info("Sending %u emails containing photos", len(mailFolderList))
+        logger.info("Sending %u emails containing photos", len(mailList))
+
+        index = EventIndex.getIndex()
+        if index is None:
+            logger.error("No event opened, returning")
+            return
 
         if cls.connectToMailServer() is None:
             logger.error("Failed to establish connection to mail server, returning")
             return
 
         mailsStatuses = []
-        for emailFolder in mailFolderList:
-            folderPath = cls.getEmailFolder() + emailFolder
-            if not folderPath.endswith('/'):
-                folderPath += '/'
-
-            # Retrieve destination address
-            with open(folderPath + EMAIL_INFO_FILE, "rt", encoding=ENCODING) as info:
-                emailAddress = json.load(info)["email"].strip()
-
-            imagePathList = [
-                folderPath + imagePath for imagePath in os.listdir(folderPath)
-            ]
-            # Removing EMAIL_INFO_FILE so only photos should remain
-            if folderPath + EMAIL_INFO_FILE in imagePathList:
-                imagePathList.remove(folderPath + EMAIL_INFO_FILE)
+        for emailAddress in mailList:
+            imagePathList = index.getRecipientPhotos(emailAddress)
 
             for i in range(0, len(imagePathList), 4):
                 photoBatch = imagePathList[i : min(i+4, len(imagePathList))]
 
                 message = cls.createMailMessage(emailAddress, photoBatch)
                 errorsDict = cls.mailSession.send_message(message)
+                error = None
                 if len(errorsDict):
-                    mailsStatuses.append(errorsDict)
+                    error = str(errorsDict)
+                    mailsStatuses.append(error)
+                index.addSend(emailAddress, len(photoBatch), error)
 
         if not mailsStatuses:
             logger.info("All mails have been sent")
@@ -0,0 +1,722 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module containing the event index, the SQLite database listing the photos,
+email recipients, print jobs and email sends of an event
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Iterator
+
+from ..utilities.constants import EMAIL_INFO_FILE, ENCODING, EVENT_INDEX_FILE
+
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+# Photo kinds
+PHOTO_RAW = "raw"  # photo downloaded from a camera, in raw_photos/
+PHOTO_EXPORT = "photo"  # photo exported with the decor
+PHOTO_SHEET = "sheet"  # multi-photo sheet, such as a strip
+# Copy in the emails/ folder of an event created before the index, not counted
+PHOTO_EMAIL_COPY = "emailCopy"
+# Exported photos and sheets files, see EventIndex.scanPhotos
+PHOTO_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+# Counter names, see EventIndex.getCounter
+COUNTER_RECIPIENTS = "recipients"
+COUNTER_PRINTS = "prints"
+COUNTER_SENDS = "sends"
+
+SCHEMA_VERSION = 2
+SCHEMA = f"""
+CREATE TABLE photos (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    createdAt REAL NOT NULL
+);
+CREATE INDEX photosKind ON photos (kind, id);
+
+CREATE TABLE recipients (
+    id INTEGER PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    photoCount INTEGER NOT NULL DEFAULT 0,
+    createdAt REAL NOT NULL
+);
+
+CREATE TABLE recipientPhotos (
+    recipientId INTEGER NOT NULL REFERENCES recipients (id) ON DELETE CASCADE,
+    photoId INTEGER NOT NULL REFERENCES photos (id) ON DELETE CASCADE,
+    addedAt REAL NOT NULL,
+    PRIMARY KEY (recipientId, photoId)
+) WITHOUT ROWID;
+CREATE INDEX recipientPhotosPhoto ON recipientPhotos (photoId);
+
+CREATE TABLE printJobs (
+    id INTEGER PRIMARY KEY,
+    photoId INTEGER NOT NULL REFERENCES photos (id) ON DELETE CASCADE,
+    printer TEXT NOT NULL,
+    createdAt REAL NOT NULL
+);
+CREATE INDEX printJobsPhoto ON printJobs (photoId);
+
+CREATE TABLE sends (
+    id INTEGER PRIMARY KEY,
+    recipientId INTEGER NOT NULL REFERENCES recipients (id) ON DELETE CASCADE,
+    photoCount INTEGER NOT NULL,
+    error TEXT,
+    sentAt REAL NOT NULL
+);
+CREATE INDEX sendsRecipient ON sends (recipientId, sentAt);
+
+-- Row counts kept up to date by triggers, so counting is a primary key lookup
+CREATE TABLE counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TRIGGER photosInsert AFTER INSERT ON photos BEGIN
+    INSERT INTO counters VALUES ('photos.' || NEW.kind, 1)
+        ON CONFLICT (name) DO UPDATE SET value = value + 1;
+END;
+CREATE TRIGGER photosDelete AFTER DELETE ON photos BEGIN
+    UPDATE counters SET value = value - 1 WHERE name = 'photos.' || OLD.kind;
+END;
+
+CREATE TRIGGER recipientsInsert AFTER INSERT ON recipients BEGIN
+    INSERT INTO counters VALUES ('{COUNTER_RECIPIENTS}', 1)
+        ON CONFLICT (name) DO UPDATE SET value = value + 1;
+END;
+CREATE TRIGGER recipientsDelete AFTER DELETE ON recipients BEGIN
+    UPDATE counters SET value = value - 1 WHERE name = '{COUNTER_RECIPIENTS}';
+END;
+
+CREATE TRIGGER recipientPhotosInsert AFTER INSERT ON recipientPhotos BEGIN
+    UPDATE recipients SET photoCount = photoCount + 1 WHERE id = NEW.recipientId;
+END;
+CREATE TRIGGER recipientPhotosDelete AFTER DELETE ON recipientPhotos BEGIN
+    UPDATE recipients SET photoCount = photoCount - 1 WHERE id = OLD.recipientId;
+END;
+
+CREATE TRIGGER printJobsInsert AFTER INSERT ON printJobs BEGIN
+    INSERT INTO counters VALUES ('{COUNTER_PRINTS}', 1)
+        ON CONFLICT (name) DO UPDATE SET value = value + 1;
+END;
+CREATE TRIGGER printJobsDelete AFTER DELETE ON printJobs BEGIN
+    UPDATE counters SET value = value - 1 WHERE name = '{COUNTER_PRINTS}';
+END;
+
+CREATE TRIGGER sendsInsert AFTER INSERT ON sends BEGIN
+    INSERT INTO counters VALUES ('{COUNTER_SENDS}', 1)
+        ON CONFLICT (name) DO UPDATE SET value = value + 1;
+END;
+CREATE TRIGGER sendsDelete AFTER DELETE ON sends BEGIN
+    UPDATE counters SET value = value - 1 WHERE name = '{COUNTER_SENDS}';
+END;
+"""
+# Schema changes, by version, applied in order to older indexes
+MIGRATIONS = {
+    2: """
+    -- Folders modification times at their last scan, see EventIndex.scanPhotos
+    CREATE TABLE scans (
+        folder TEXT PRIMARY KEY,
+        mtimeNs INTEGER NOT NULL
+    ) WITHOUT ROWID;
+    """,
+}
+
+
+class EventIndexClosedError(Exception):
+    """
+    EventIndexClosedError : Error raised when using an index already closed, such
+    as by a worker thread finishing after another event was opened
+    """
+
+
+class EventIndex:
+    """
+    EventIndex : SQLite database of an event folder, in WAL mode, indexing its
+    photos, the email recipients and the photos added to them, the print jobs and
+    the email sends. Every list is an indexed query and every counter is
+    maintained by triggers, so they don't depend on the event size. Paths inside
+    the event folder are stored relative to it, so the folder can be moved.
+
+    The index of the opened event is shared, see open and getIndex. Thread safe.
+    """
+
+    IndexInstance: EventIndex = None
+
+    def __init__(self, eventFolder: str) -> None:
+        """
+        Args:
+            eventFolder (str): Event folder, the index file is created in it if
+            missing
+        """
+        self.eventFolder = os.path.abspath(eventFolder)
+        self.filepath = os.path.join(self.eventFolder, EVENT_INDEX_FILE)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            self.filepath, check_same_thread=False, isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode = WAL")
+        # Durable enough in WAL mode, only the last transactions can be lost
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.execute("PRAGMA foreign_keys = ON")
+
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version < SCHEMA_VERSION:
+            # Created or migrated at once, a crash can't leave a partial schema
+            script = SCHEMA if version == 0 else ""
+            for migration in range(max(version, 1) + 1, SCHEMA_VERSION + 1):
+                script += MIGRATIONS[migration]
+            self._db.executescript(
+                f"BEGIN; {script} PRAGMA user_version = {SCHEMA_VERSION}; COMMIT;"
+            )
+            if version == 0:
+                logger.info("Created event index %s", self.filepath)
+            else:
+                logger.info(
+                    "Event index %s upgraded from version %u", self.filepath, version
+                )
+        elif version > SCHEMA_VERSION:
+            logger.warning(
+                "Event index %s was written by a newer version (%u)",
+                self.filepath, version
+            )
+        # Imported on the first scan, once the exported photos are indexed
+        self._importPending = version == 0
+
+    @classmethod
+    def open(cls, eventFolder: str, rawFolder: str = None) -> EventIndex:
+        """
+        open : Opens the index of an event folder, closing the previous one, and
+        makes it the shared index. The previous index stays open if the new one
+        can't be opened or scanned.
+
+        Args:
+            eventFolder (str): Event folder
+            rawFolder (str, optional): Raw photos folder scanned before sharing the
+            index, see scanPhotos. Not scanned if None. Defaults to None.
+
+        Raises:
+            sqlite3.DatabaseError: The index couldn't be opened or scanned
+
+        Returns:
+            EventIndex: Opened index
+        """
+        index = EventIndex(eventFolder)
+        if rawFolder is not None:
+            try:
+                index.scanPhotos(rawFolder)
+            except BaseException:
+                index.close()
+                raise
+
+        if cls.IndexInstance is not None:
+            cls.IndexInstance.close()
+        cls.IndexInstance = index
+        return index
+
+    @classmethod
+    def getIndex(cls) -> EventIndex | None:
+        """
+        getIndex : Returns the index of the opened event
+
+        Returns:
+            EventIndex | None: Index, None if no event was opened
+        """
+        return cls.IndexInstance
+
+    def close(self) -> None:
+        """
+        close : Closes the database, checkpointing the WAL file into it. The other
+        methods raise EventIndexClosedError afterwards.
+        """
+        with self._lock:
+            if self._db is None:
+                return
+            self._db.close()
+            self._db = None
+        if EventIndex.IndexInstance is self:
+            EventIndex.IndexInstance = None
+        logger.debug("Event index %s closed", self.filepath)
+
+    # Photos
+
+    def addPhoto(self, path: str, kind: str) -> int:
+        """
+        addPhoto : Indexes a photo, once
+
+        Args:
+            path (str): Photo filepath
+            kind (str): One of the PHOTO_* kinds
+
+        Returns:
+            int: Photo id
+        """
+        with self._locked(), self._transaction():
+            return self._addPhoto(path, kind)
+
+    def getPhotos(self, kind: str, limit: int = -1) -> list[str]:
+        """
+        getPhotos : Returns the latest photos of a kind
+
+        Args:
+            kind (str): One of the PHOTO_* kinds
+            limit (int, optional): Maximum number of photos, all if negative.
+            Defaults to -1.
+
+        Returns:
+            list[str]: Photos filepaths, from the latest
+        """
+        with self._locked():
+            rows = self._db.execute(
+                "SELECT path FROM photos WHERE kind = ? ORDER BY id DESC LIMIT ?",
+                (kind, limit)
+            ).fetchall()
+        return [self._absolute(path) for path, in rows]
+
+    def hasPhoto(self, path: str) -> bool:
+        """
+        hasPhoto : Returns whether a photo is indexed
+
+        Args:
+            path (str): Photo filepath
+
+        Returns:
+            bool: Photo indexed
+        """
+        with self._locked():
+            row = self._db.execute(
+                "SELECT 1 FROM photos WHERE path = ?", (self._relative(path),)
+            ).fetchone()
+        return row is not None
+
+    def isEventPath(self, path: str) -> bool:
+        """
+        isEventPath : Returns whether a file is in the event folder
+
+        Args:
+            path (str): Filepath
+
+        Returns:
+            bool: File in the event folder
+        """
+        return not os.path.isabs(self._relative(path))
+
+    def countPhotos(self, kind: str) -> int:
+        """
+        countPhotos : Returns the number of photos of a kind
+
+        Args:
+            kind (str): One of the PHOTO_* kinds
+
+        Returns:
+            int: Number of photos
+        """
+        return self.getCounter("photos." + kind)
+
+    def scanPhotos(self, rawFolder: str) -> int:
+        """
+        scanPhotos : Indexes the photos of the event missing from the index, such
+        as those of events created before it or copied by hand. The raw photos
+        folder and the event folder, holding the exported photos and sheets, are
+        only listed if they were modified since their last scan, and only the new
+        files are indexed. Images of the event folder named neither after a raw
+        photo nor as a sheet are ignored. Files removed by hand stay indexed, along with their
+        prints and emails.
+
+        Args:
+            rawFolder (str): Raw photos folder
+
+        Returns:
+            int: Number of photos indexed
+        """
+        rawFolder = os.path.abspath(rawFolder)
+        rawPrefix = self._relative(rawFolder) + os.sep
+
+        def isRawName(name: str) -> bool:
+            row = self._db.execute(
+                "SELECT 1 FROM photos WHERE path = ?", (rawPrefix + name,)
+            ).fetchone()
+            return row is not None
+
+        def getCompositeKind(name: str) -> str | None:
+            if os.path.splitext(name)[1].lower() not in PHOTO_EXTENSIONS:
+                return None
+            # Exported photos are named after their raw photo, and sheets after
+            # their layout and their first raw photo: "<layout id>_<raw name>"
+            if isRawName(name):
+                return PHOTO_EXPORT
+            for index, char in enumerate(name):
+                if char == "_" and index > 0 and isRawName(name[index + 1:]):
+                    return PHOTO_SHEET
+            # Decor, logo or any other image copied in the event folder
+            return None
+
+        added = 0
+        with self._locked(), self._transaction():
+            for folder, kinds, getKind in (
+                (rawFolder, (PHOTO_RAW,), lambda name: PHOTO_RAW),
+                (self.eventFolder, (PHOTO_EXPORT, PHOTO_SHEET), getCompositeKind),
+            ):
+                mtimeNs = self._getModificationTime(folder)
+                if mtimeNs is None:
+                    continue
+                added += self._scanFolder(folder, kinds, getKind)
+                self._db.execute(
+                    "INSERT INTO scans VALUES (?, ?)"
+                    " ON CONFLICT (folder) DO UPDATE SET mtimeNs = excluded.mtimeNs",
+                    (self._relative(folder), mtimeNs)
+                )
+
+        if added:
+            logger.info("Indexed %u photos missing from the event index", added)
+        if self._importPending:
+            self._importPending = False
+            self._importEmailFolders()
+        return added
+
+    # Recipients
+
+    def addRecipient(self, email: str) -> int:
+        """
+        addRecipient : Indexes an email recipient, once
+
+        Args:
+            email (str): Email address
+
+        Returns:
+            int: Recipient id
+        """
+        with self._locked(), self._transaction():
+            return self._addRecipient(email)
+
+    def getRecipients(self) -> list[str]:
+        """
+        getRecipients : Returns the email recipients
+
+        Returns:
+            list[str]: Email addresses, sorted
+        """
+        with self._locked():
+            rows = self._db.execute("SELECT email FROM recipients ORDER BY email")
+            return [email for email, in rows]
+
+    def hasRecipient(self, email: str) -> bool:
+        """
+        hasRecipient : Returns whether an email recipient is indexed
+
+        Args:
+            email (str): Email address
+
+        Returns:
+            bool: Recipient indexed
+        """
+        with self._locked():
+            return self._getRecipientId(email) is not None
+
+    def countRecipients(self) -> int:
+        """
+        countRecipients : Returns the number of email recipients
+
+        Returns:
+            int: Number of recipients
+        """
+        return self.getCounter(COUNTER_RECIPIENTS)
+
+    def addRecipientPhoto(
+        self, email: str, photoPath: str, kind: str = PHOTO_EXPORT
+    ) -> bool:
+        """
+        addRecipientPhoto : Adds a photo to those sent to a recipient, indexing
+        both if needed
+
+        Args:
+            email (str): Email address
+            photoPath (str): Photo filepath
+            kind (str, optional): Photo kind, if it isn't indexed yet. Defaults to
+            PHOTO_EXPORT.
+
+        Returns:
+            bool: True if the photo was added, False if the recipient already had it
+        """
+        with self._locked(), self._transaction():
+            recipientId = self._addRecipient(email)
+            photoId = self._addPhoto(photoPath, kind)
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO recipientPhotos VALUES (?, ?, ?)",
+                (recipientId, photoId, time.time())
+            )
+            return cursor.rowcount > 0
+
+    def getRecipientPhotos(self, email: str) -> list[str]:
+        """
+        getRecipientPhotos : Returns the photos added to a recipient
+
+        Args:
+            email (str): Email address
+
+        Returns:
+            list[str]: Photos filepaths, in the order they were added
+        """
+        with self._locked():
+            rows = self._db.execute(
+                "SELECT photos.path FROM recipients"
+                " JOIN recipientPhotos ON recipientPhotos.recipientId = recipients.id"
+                " JOIN photos ON photos.id = recipientPhotos.photoId"
+                " WHERE recipients.email = ?"
+                " ORDER BY recipientPhotos.addedAt, photos.id",
+                (email.strip(),)
+            ).fetchall()
+        return [self._absolute(path) for path, in rows]
+
+    def countRecipientPhotos(self, email: str) -> int:
+        """
+        countRecipientPhotos : Returns the number of photos added to a recipient
+
+        Args:
+            email (str): Email address
+
+        Returns:
+            int: Number of photos, 0 for unknown recipients
+        """
+        with self._locked():
+            row = self._db.execute(
+                "SELECT photoCount FROM recipients WHERE email = ?", (email.strip(),)
+            ).fetchone()
+        return row[0] if row else 0
+
+    # Print jobs and sends
+
+    def addPrintJob(self, photoPath: str, printer: str) -> None:
+        """
+        addPrintJob : Records a print job
+
+        Args:
+            photoPath (str): Printed photo filepath
+            printer (str): Printer name
+        """
+        with self._locked(), self._transaction():
+            photoId = self._addPhoto(photoPath, PHOTO_EXPORT)
+            self._db.execute(
+                "INSERT INTO printJobs (photoId, printer, createdAt) VALUES (?, ?, ?)",
+                (photoId, printer, time.time())
+            )
+
+    def addSend(self, email: str, photoCount: int, error: str = None) -> None:
+        """
+        addSend : Records an email send
+
+        Args:
+            email (str): Recipient email address
+            photoCount (int): Number of photos sent
+            error (str, optional): Send error, None on success. Defaults to None.
+        """
+        with self._locked(), self._transaction():
+            self._db.execute(
+                "INSERT INTO sends (recipientId, photoCount, error, sentAt)"
+                " VALUES (?, ?, ?, ?)",
+                (self._addRecipient(email), photoCount, error, time.time())
+            )
+
+    def getCounter(self, name: str) -> int:
+        """
+        getCounter : Returns a counter, see the COUNTER_* names and countPhotos
+
+        Args:
+            name (str): Counter name
+
+        Returns:
+            int: Counter value
+        """
+        with self._locked():
+            row = self._db.execute(
+                "SELECT value FROM counters WHERE name = ?", (name,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    # Internals, called with the lock held
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        """
+        _locked : Holds the lock of the index, checking it wasn't closed
+
+        Raises:
+            EventIndexClosedError: The index is closed
+        """
+        with self._lock:
+            if self._db is None:
+                raise EventIndexClosedError(f"Event index {self.filepath} is closed")
+            yield
+
+    def _transaction(self) -> _Transaction:
+        """
+        _transaction : Returns the connection as a context manager committing the
+        transaction on success and rolling it back on error
+        """
+        self._db.execute("BEGIN")
+        return _Transaction(self._db)
+
+    def _addPhoto(self, path: str, kind: str) -> int:
+        path = self._relative(path)
+        self._db.execute(
+            "INSERT OR IGNORE INTO photos (path, kind, createdAt) VALUES (?, ?, ?)",
+            (path, kind, time.time())
+        )
+        return self._db.execute(
+            "SELECT id FROM photos WHERE path = ?", (path,)
+        ).fetchone()[0]
+
+    def _addRecipient(self, email: str) -> int:
+        email = email.strip()
+        self._db.execute(
+            "INSERT OR IGNORE INTO recipients (email, createdAt) VALUES (?, ?)",
+            (email, time.time())
+        )
+        return self._getRecipientId(email)
+
+    def _getRecipientId(self, email: str) -> int | None:
+        row = self._db.execute(
+            "SELECT id FROM recipients WHERE email = ?", (email.strip(),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _getModificationTime(self, folder: str) -> int | None:
+        """
+        _getModificationTime : Returns the modification time of a folder, if it
+        changed since its last scan
+
+        Args:
+            folder (str): Folder path
+
+        Returns:
+            int | None: Modification time in nanoseconds, None if the folder is
+            missing or unchanged
+        """
+        try:
+            mtimeNs = os.stat(folder).st_mtime_ns
+        except OSError:
+            return None
+        row = self._db.execute(
+            "SELECT mtimeNs FROM scans WHERE folder = ?", (self._relative(folder),)
+        ).fetchone()
+        return None if row and row[0] == mtimeNs else mtimeNs
+
+    def _scanFolder(
+        self, folder: str, kinds: tuple[str], getKind: Callable[[str], str | None]
+    ) -> int:
+        """
+        _scanFolder : Indexes the files of a folder missing from the index
+
+        Args:
+            folder (str): Folder path
+            kinds (tuple[str]): Kinds of the photos indexed in the folder
+            getKind (Callable[[str], str | None]): Returns the photo kind of a new
+            file name, None for files that aren't indexed photos
+
+        Returns:
+            int: Number of photos indexed
+        """
+        placeholders = ", ".join("?" * len(kinds))
+        indexed = {
+            path for path, in self._db.execute(
+                f"SELECT path FROM photos WHERE kind IN ({placeholders})", kinds
+            )
+        }
+
+        photos = []
+        relativeFolder = self._relative(folder)
+        prefix = "" if relativeFolder == "." else relativeFolder + os.sep
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name.startswith(".") or not entry.is_file():
+                    continue
+                path = prefix + entry.name
+                if path in indexed:
+                    continue
+                kind = getKind(entry.name)
+                if kind is None:
+                    continue
+                photos.append((path, kind, entry.stat().st_mtime))
+                indexed.add(path)
+
+        self._db.executemany(
+            "INSERT OR IGNORE INTO photos (path, kind, createdAt) VALUES (?, ?, ?)",
+            photos
+        )
+        return len(photos)
+
+    def _relative(self, path: str) -> str:
+        path = os.path.abspath(path)
+        if os.path.commonpath((path, self.eventFolder)) == self.eventFolder:
+            return os.path.relpath(path, self.eventFolder)
+        return path
+
+    def _absolute(self, path: str) -> str:
+        return os.path.join(self.eventFolder, path)
+
+    def _importEmailFolders(self) -> None:
+        """
+        _importEmailFolders : Indexes the email folders of events created before
+        the index, one folder with an EMAIL_INFO_FILE per recipient. The photos
+        copied in them are linked to the exported photo of the same name when
+        it's indexed, else indexed as copies, so that no photo is counted twice.
+        """
+        emailFolder = os.path.join(self.eventFolder, "emails")
+        if not os.path.isdir(emailFolder):
+            return
+
+        imported = 0
+        for entry in os.scandir(emailFolder):
+            if not entry.is_dir():
+                continue
+            email = entry.name
+            try:
+                infoPath = os.path.join(entry.path, EMAIL_INFO_FILE)
+                with open(infoPath, "rt", encoding=ENCODING) as file:
+                    email = json.load(file)["email"]
+            except (OSError, ValueError, KeyError) as err:
+                logger.warning("Email folder %s info unreadable: %s", entry.name, err)
+
+            for photo in os.scandir(entry.path):
+                if not photo.is_file() or photo.name == EMAIL_INFO_FILE:
+                    continue
+                exportPath = os.path.join(self.eventFolder, photo.name)
+                if self.hasPhoto(exportPath):
+                    self.addRecipientPhoto(email, exportPath)
+                else:
+                    self.addRecipientPhoto(email, photo.path, PHOTO_EMAIL_COPY)
+            self.addRecipient(email)
+            imported += 1
+
+        if imported:
+            logger.info("Imported %u email folders in the event index", imported)
+
+
+class _Transaction:
+    """
+    _Transaction : Context manager ending the transaction begun by
+    EventIndex._transaction
+    """
+
+    def __init__(self, db: sqlite3.Connection) -> None:
+        self.db = db
+
+    def __enter__(self) -> sqlite3.Connection:
+        return self.db
+
+    def __exit__(self, errorType, error, traceback) -> None:
+        self.db.execute("COMMIT" if errorType is None else "ROLLBACK")
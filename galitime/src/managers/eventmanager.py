@@ -6,20 +6,22 @@
 Module for folder management
 """
 
-import json
 import logging
 import os
 import re
 import shutil
+import sqlite3
 
 from PyQt5.QtCore import QDate
 from PyQt5.QtWidgets import QFileDialog, QMessageBox
 from PyQt5.QtWidgets import QMainWindow
 
 from ..managers.emailmanager import EmailManager
+from ..managers.eventindex import EventIndex
 from ..managers.photomanager import PhotoManager
-from ..utilities.constants import DATE_FORMAT, ENCODING
-from ..utilities.constants import EVENT_SAVE_FILE
+from ..managers.statestore import StateStore
+from ..utilities.constants import DATE_FORMAT
+from ..utilities.constants import EVENT_INDEX_FILE, EVENT_SAVE_FILE
 
 logger = logging.getLogger(__name__)
 logger.propagate = True
@@ -34,7 +36,9 @@ class EventManager:
     eventName = ""
     eventDate = ""
     photoNumber = 0
+    layoutId = ""
     eventOpened = False
+    infoStore: StateStore = None
 
     parent = None
 
@@ -84,6 +88,17 @@ class EventManager:
             raise SyntaxError("Date format not valid, must respect yyyy-MM-dd format")
         cls.eventDate = eventDate
 
+    @classmethod
+    def setLayoutId(cls, layoutId: str) -> None:
+        """
+        setLayoutId : Sets the id of the layout chosen for the event, see
+        rendering/layout.py
+
+        Args:
+            layoutId (str): Layout id, the template file name without extension
+        """
+        cls.layoutId = layoutId
+
     @classmethod
     def setEventOpened(cls, eventOpened: bool) -> None:
         """
@@ -126,6 +141,14 @@ class EventManager:
         """
         return cls.eventDate
 
+    @classmethod
+    def getLayoutId(cls) -> str:
+        """
+        getLayoutId : returns the id of the layout chosen for the event, empty if
+        none was saved
+        """
+        return cls.layoutId
+
     @classmethod
     def isEventOpened(cls) -> bool:
         """
@@ -145,10 +168,9 @@ class EventManager:
         logger.debug("Creating new event folder structure in folder %s", saveFolder)
         os.mkdir(saveFolder)
         os.mkdir(saveFolder + "raw_photos")
-        os.mkdir(saveFolder + "emails")
 
-        EmailManager.setEmailFolder(saveFolder + "emails")
         PhotoManager.setPhotoFolder(saveFolder + "raw_photos")
+        EventIndex.open(saveFolder)
         logger.info(
             "Successfully created new event folder structure in folder %s", saveFolder
         )
@@ -161,35 +183,50 @@ class EventManager:
         infoDict = {
             "eventName": cls.getEventName(),
             "eventDate": cls.getEventDate(),
+            "layoutId": cls.getLayoutId(),
             "photoNumber": PhotoManager.getPhotoNumber(),
             "emailNumber": EmailManager.getEmailNumber(),
         }
         cls._writeInfoFile(infoDict)
         logger.debug("Event info file updated")
 
+    @classmethod
+    def _getInfoStore(cls) -> StateStore:
+        """
+        _getInfoStore : Returns the store of the event info file, the store of the
+        previous event folder is flushed and closed.
+
+        Returns:
+            StateStore: Info file store
+        """
+        filepath = cls.saveFolder + EVENT_SAVE_FILE
+        if cls.infoStore is None or cls.infoStore.filepath != filepath:
+            if cls.infoStore is not None:
+                cls.infoStore.close()
+            cls.infoStore = StateStore(filepath)
+        return cls.infoStore
+
     @classmethod
     def _writeInfoFile(cls, infodict: dict) -> None:
         """
         _writeInfoFile: Write supplied dictionnary to info file in it's json
-        representation.
+        representation, in the background, see StateStore.
 
         Args:
             infodict (dict): event info dict to write.
         """
-        with open(cls.saveFolder + EVENT_SAVE_FILE, "wt", encoding=ENCODING) as file:
-            json.dump(infodict, file, indent=4)
+        cls._getInfoStore().update(infodict)
 
     @classmethod
     def _readInfoFile(cls) -> dict:
         """
         _readInfoFile : Reads the event info file and return a dict representation of
-        it's json content
+        it's json content, including the updates not written yet
 
         Returns:
             dict: json content of info file
         """
-        with open(cls.saveFolder + EVENT_SAVE_FILE, "rt", encoding=ENCODING) as file:
-            return json.load(file)
+        return cls._getInfoStore().read()
 
     @classmethod
     def initSaveFolder(cls, saveFolder: str, overwrite: bool = False) -> None:
@@ -221,6 +258,7 @@ class EventManager:
                     return
 
             logger.info("Removing pre-existing folder %s and it's contents", saveFolder)
+            cls.closeSaveFolder()
             shutil.rmtree(saveFolder)
 
         cls.createFolderScructure(saveFolder)
@@ -262,28 +300,33 @@ class EventManager:
                 f"No {EVENT_SAVE_FILE} file found in\n{folder}\n Aborting load "
                 f"operation\n\nInvalid folder", )
             return False
-        cls.saveFolder = folder
-
-        with open(folder + EVENT_SAVE_FILE, "rt", encoding=ENCODING) as file:
-            infoDict = json.load(file)
 
         # File structure check
-        if not os.path.exists(cls.saveFolder + "raw_photos"):
+        if not os.path.exists(folder + "raw_photos"):
             QMessageBox.warning(
                 cls.parent,
                 "Loading error",
                 f"No raw_photos in \n{folder}\n Creating an empty one\n\nraw_photos "
                 f"folder missing", )
-            os.mkdir(cls.saveFolder + "raw_photos")
-        PhotoManager.photoFolder = cls.saveFolder + "raw_photos/"
+            os.mkdir(folder + "raw_photos")
+
+        # Opened before switching to the folder, a rejected folder leaves the
+        # opened event as is
+        try:
+            EventIndex.open(folder, folder + "raw_photos/")
+        except sqlite3.DatabaseError as err:
+            logger.error("Could not open the event index: %s", err)
+            QMessageBox.critical(
+                cls.parent,
+                "Loading error",
+                f"The event index {EVENT_INDEX_FILE} of\n{folder}\ncould not be "
+                f"opened\n\nError:\n{err}",
+            )
+            return False
 
-        if not os.path.exists(cls.saveFolder + "emails"):
-            QMessageBox.warning(
-                cls.parent, "Loading error", f"""No emails in {folder}
-                Creating an empty one
-                'emails/' folder missing""", )
-            os.mkdir(cls.saveFolder + "emails")
-        EmailManager.setEmailFolder(cls.saveFolder + "emails/")
+        cls.saveFolder = folder
+        infoDict = cls._readInfoFile()
+        PhotoManager.setPhotoFolder(cls.saveFolder + "raw_photos/")
 
         # Content checking
 
@@ -305,11 +348,28 @@ class EventManager:
             infoDict["eventDate"] = defaultValue
         cls.setEventDate(infoDict["eventDate"])
 
+        # Missing from the info files of older events, the current layout is kept
+        cls.setLayoutId(str(infoDict.get("layoutId", "")))
+
         logger.debug("Loaded folder successfully")
 
         cls.updateInfoFile()
 
         return True
 
+    @classmethod
+    def closeSaveFolder(cls) -> None:
+        """
+        closeSaveFolder : Writes the pending event info and closes the index of the
+        opened event folder
+        """
+        if cls.infoStore is not None:
+            cls.infoStore.close()
+            cls.infoStore = None
+
+        index = EventIndex.getIndex()
+        if index is not None:
+            index.close()
+
 
 EmailManager.setEventManager(EventManager)
@@ -8,6 +8,8 @@ Screen window, contains screen class and control options
 
 import logging
 
+from .eventindex import EventIndex, EventIndexClosedError, PHOTO_RAW
+
 logger = logging.getLogger(__name__)
 logger.propagate = True
 
@@ -18,7 +20,6 @@ class PhotoManager:
     """
 
     decorFile = None
-    photoNumber = 0
     photoFolder = ""
 
     @classmethod
@@ -44,14 +45,30 @@ class PhotoManager:
         cls.photoFolder = photoFolder
 
     @classmethod
-    def incrementPhotoNumber(cls, increment: int = 1):
+    def addPhoto(cls, photoPath: str, kind: str = PHOTO_RAW) -> None:
         """
-        incrementPhotoNumber : Increments the photo number by the given value
+        addPhoto : Records a photo in the event index
 
         Args:
-            increment (int, optional): Increment value. Defaults to 1.
+            photoPath (str): Photo filepath
+            kind (str, optional): One of the EventIndex PHOTO_* kinds. Defaults to
+            PHOTO_RAW.
         """
-        cls.photoNumber += increment
+        index = EventIndex.getIndex()
+        if index is None:
+            logger.debug("No event opened, photo %s not indexed", photoPath)
+            return
+        try:
+            if not index.isEventPath(photoPath):
+                # Photo of the previous event, retrieved after another one was opened
+                logger.warning(
+                    "Photo %s outside of the event folder not indexed", photoPath
+                )
+                return
+            index.addPhoto(photoPath, kind)
+        except EventIndexClosedError:
+            # Index closed by another event being opened meanwhile
+            logger.warning("Photo %s of a closed event not indexed", photoPath)
 
     @classmethod
     def getPhotoNumber(cls) -> int:
@@ -61,4 +78,5 @@ class PhotoManager:
         Returns:
             int: Number of photos
         """
-        return cls.photoNumber
+        index = EventIndex.getIndex()
+        return index.countPhotos(PHOTO_RAW) if index is not None else 0
@@ -0,0 +1,195 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module writing the json state files, atomically and in the background
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import threading
+
+from ..utilities.constants import ENCODING, STATE_RETRY_DELAY, STATE_WRITE_DELAY
+
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+
+def writeJsonFile(filepath: str, data: object) -> None:
+    """
+    writeJsonFile : Writes data to a json file atomically. The data is written and
+    synced to a temporary file which then replaces the previous one, so that a
+    crash or a power cut leaves either the previous file or the new one, never a
+    truncated one.
+
+    Args:
+        filepath (str): Json filepath
+        data (object): Json serializable data
+
+    Raises:
+        OSError: The file couldn't be written
+    """
+    temporaryPath = filepath + ".tmp"
+    with open(temporaryPath, "wt", encoding=ENCODING) as file:
+        json.dump(data, file, indent=4)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporaryPath, filepath)
+
+    # Syncing the folder too, so that the rename itself is on the disk
+    try:
+        folder = os.open(os.path.dirname(os.path.abspath(filepath)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(folder)
+    except OSError:
+        pass
+    finally:
+        os.close(folder)
+
+
+class StateStore:
+    """
+    StateStore : Write-behind json state file. Updates only replace the state in
+    memory, and the last one is written by a background timer STATE_WRITE_DELAY
+    seconds after the first pending update, so bursts of updates cost a single
+    write. Pending states are written when flushed, and on exit. Failed writes are
+    retried STATE_RETRY_DELAY seconds later, states that can't be serialized are
+    dropped. Thread safe.
+    """
+
+    _stores: set[StateStore] = set()
+    _storesLock = threading.Lock()
+
+    def __init__(self, filepath: str, delay: float = STATE_WRITE_DELAY) -> None:
+        """
+        Args:
+            filepath (str): Json filepath
+            delay (float, optional): Seconds updates are coalesced before writing.
+            Defaults to STATE_WRITE_DELAY.
+        """
+        self.filepath = filepath
+        self.delay = delay
+
+        self._state: object = None
+        self._pending = False
+        self._timer: threading.Timer = None
+        self._lock = threading.Lock()
+        # Serializes the writes, the timer and a flush can't write at once
+        self._writeLock = threading.Lock()
+
+        with StateStore._storesLock:
+            StateStore._stores.add(self)
+
+    def update(self, state: object) -> None:
+        """
+        update : Replaces the state, written later unless the store is flushed
+
+        Args:
+            state (object): Json serializable state, not modified afterwards
+        """
+        with self._lock:
+            self._state = state
+            self._pending = True
+            if self._timer is None:
+                self._startTimer(self.delay)
+
+    def _startTimer(self, delay: float) -> None:
+        """
+        _startTimer : Starts the timer flushing the store, called with the lock held
+
+        Args:
+            delay (float): Seconds before flushing
+        """
+        self._timer = threading.Timer(delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def read(self) -> object:
+        """
+        read : Returns the state, pending or written
+
+        Raises:
+            OSError: The file couldn't be read
+            ValueError: The file isn't valid json
+
+        Returns:
+            object: State
+        """
+        with self._lock:
+            if self._pending:
+                return self._state
+        with open(self.filepath, "rt", encoding=ENCODING) as file:
+            return json.load(file)
+
+    def isPending(self) -> bool:
+        """
+        isPending : Returns whether an update wasn't written yet
+
+        Returns:
+            bool: Update pending
+        """
+        with self._lock:
+            return self._pending
+
+    def flush(self) -> None:
+        """
+        flush : Writes the pending state now, if any. Write errors are logged, the
+        state stays pending and the write is retried later. A state that can't be
+        serialized is logged and dropped, retrying it would fail the same way.
+        """
+        with self._writeLock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._pending:
+                    return
+                state = self._state
+                self._pending = False
+
+            try:
+                writeJsonFile(self.filepath, state)
+            except (TypeError, ValueError) as err:
+                logger.error(
+                    "Could not serialize state file %s, update dropped: %s",
+                    self.filepath, err
+                )
+                return
+            except OSError as err:
+                logger.error("Could not write state file %s: %s", self.filepath, err)
+                with self._lock:
+                    if not self._pending:
+                        self._state = state
+                        self._pending = True
+                    if self._timer is None:
+                        self._startTimer(STATE_RETRY_DELAY)
+                return
+        logger.debug("State file %s written", self.filepath)
+
+    def close(self) -> None:
+        """
+        close : Flushes the store and stops flushing it on exit
+        """
+        self.flush()
+        with StateStore._storesLock:
+            StateStore._stores.discard(self)
+
+    @classmethod
+    def flushAll(cls) -> None:
+        """
+        flushAll : Flushes every open store, registered to run on exit
+        """
+        with cls._storesLock:
+            stores = list(cls._stores)
+        for store in stores:
+            store.flush()
+
+
+atexit.register(StateStore.flushAll)
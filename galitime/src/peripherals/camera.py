@@ -9,19 +9,30 @@ Module containing class handling camera IO and related functions
 from __future__ import annotations
 
 import atexit
+import functools
 import logging
 import os
 import subprocess
+import threading
 import time
 from typing import Callable
 
-import gphoto2 as gp
 from PyQt5.QtCore import QDateTime
-from PyQt5.QtWidgets import QMessageBox
 
-from ..utilities.constants import CAMERA_LOG_FILE, DEFAULT_PHOTO
-from ..utilities.constants import ENCODING, MOVIE_PATH
-from ..utilities.constants import START_BYTES, STOP_BYTES
+from .camerabackend import CameraBackend, CameraError, CameraFilePath
+from .camerabackend import EVENT_FILE_ADDED, EVENT_TIMEOUT, createBackend
+from .cameraconnector import CameraConnector, STATE_CONNECTED, STATE_CONNECTING
+from .cameraconnector import STATE_DISCONNECTED
+from .camerainfo import CameraInfoCache
+from .cardingester import CardIngester
+from .liveview import CapturePreviewReader
+from .mjpeg import MjpegFileExtractor, MjpegStreamReader
+from .photodownloader import PhotoDownloader
+from ..utilities.constants import CAMERA_LOG_FILE, CAPTURE_TARGET, DEFAULT_PHOTO
+from ..utilities.constants import ENCODING, MOVIE_PATH, MAX_MOVIE_SIZE
+from ..utilities.constants import PREVIEW_KILL_TIMEOUT, PREVIEW_MODE
+from ..utilities.constants import PREVIEW_STALL_TIMEOUT
+from ..utilities.previewmetrics import PreviewMetrics
 
 logger = logging.getLogger(__name__)
 logger.propagate = True
@@ -29,9 +40,11 @@ logger.propagate = True
 
 def promptError(func: Callable) -> Callable:
     """
-    promptError : Decorator aimed at encapsulating a function call in a try/except
-    structure and prompt any error into a popup. This aims at informing about
-    camera error (the most common) without having to restart the whole application.
+    promptError : Decorator aimed at encapsulating a CameraWrapper method call in a
+    try/except structure, logging any error and publishing it with the
+    errorOccurred signal of the camera connector. This aims at informing about
+    camera error (the most common) without having to restart the whole application
+    nor blocking it with a popup.
 
     Args:
         func (callable): function to be encapsulated
@@ -40,22 +53,18 @@ def promptError(func: Callable) -> Callable:
         callable: encapsulated function with error prompt handler
     """
 
-    def encapsulated(*args, **kwargs):
+    @functools.wraps(func)
+    def encapsulated(self: CameraWrapper, *args, **kwargs):
         # Encapsulating function
         try:
             # The function to run
-            normalReturn = func(*args, **kwargs)
+            normalReturn = func(self, *args, **kwargs)
             return normalReturn
         except Exception as err:
             logger.error(
                 "A camera error occurred in function %s : %s", func.__name__, err
             )
-            QMessageBox.critical(
-                None,
-                "Camera error",
-                f"An error occurred in function '{func.__name__}':\n"
-                f"{func}\n\nError:\n{err}"
-            )
+            self._onError(func.__name__, err)
             return None
 
     return encapsulated
@@ -65,31 +74,89 @@ class CameraWrapper:
     """
     Wrapper class for the camera, in charge of creating and managing processes
     responsible for previewing images.
+
+    Several cameras can be bound to specific ports, each one with its own session,
+    lock and workers. The first one created is the main camera, used for the
+    preview, the files of the other ones are suffixed with their number.
     """
 
     CameraInstance: CameraWrapper = None
+    CameraInstances: list[CameraWrapper] = []
+
+    def __init__(
+        self,
+        previewMode: str = PREVIEW_MODE,
+        captureTarget: str = CAPTURE_TARGET,
+        backend: CameraBackend = None,
+        port: str | None = None
+    ) -> None:
+        self.index = len(CameraWrapper.CameraInstances)
+        self.port = port
+        self.fileSuffix = "" if self.index == 0 else f"_cam{self.index + 1}"
 
-    def __init__(self) -> None:
         self.connected = False
         self.isPreviewing = False
+        self.previewMode = previewMode
+        self.captureTarget = captureTarget
         self.previewProcess = None
+        self.streamReader: MjpegStreamReader | CapturePreviewReader = None
+        self.frameCallback: Callable[[bytes, float], None] = None
+        self.metrics = PreviewMetrics()
 
-        self.prevFileSize = 0
+        self.frameExtractor = MjpegFileExtractor(MOVIE_PATH)
+        with open(DEFAULT_PHOTO, "br") as file:
+            self.defaultFrame = file.read()
         self.prevFrame = b""
-        self.previewStartTime = 0
-
+        self.lastFrameTime = 0
         self.frameCount = 0
-        self.logfile = open(CAMERA_LOG_FILE, "wt", encoding=ENCODING)
 
-        self._clearGphoto()
-        self.cam = gp.Camera()
+        self.logfile = open(self.suffixed(CAMERA_LOG_FILE), "wt", encoding=ENCODING)
+
+        self.backend = backend if backend is not None else createBackend()
+
+        # Only the main camera runs a preview process, clearing the processes from
+        # the other cameras would kill it
+        if self.ownsPreview():
+            self._clearGphoto()
+        self.cam = self.backend.createSession(port)
+        # gphoto2 camera sessions aren't thread safe
+        self.camLock = threading.RLock()
+        # Cleared while a capture is pending, downloads wait for it to be done
+        self.captureIdle = threading.Event()
+        self.captureIdle.set()
+
+        self.connector = CameraConnector(self)
+        self.connector.start()
+
+        self.downloader = PhotoDownloader(self._downloadPhoto)
+        self.downloader.start()
+
+        self.ingester = CardIngester(self)
+        if self.capturesToCard():
+            self.ingester.start()
+
+        self.infoCache = CameraInfoCache(
+            {
+                "cameras": self.backend.autodetect,
+                "abilities": lambda: self.cam.getInfo("abilities"),
+                "config": lambda: self.cam.getInfo("config"),
+                "about": lambda: self.cam.getInfo("about"),
+                "summary": lambda: self.cam.getInfo("summary"),
+            },
+            self.camLock,
+            self.isConnected
+        )
+        self.infoCache.start()
 
-        CameraWrapper.CameraInstance = self
+        CameraWrapper.CameraInstances.append(self)
+        if CameraWrapper.CameraInstance is None:
+            CameraWrapper.CameraInstance = self
 
-        if os.path.exists(MOVIE_PATH):
-            os.remove(MOVIE_PATH)
-        with open(MOVIE_PATH, "wb") as file:
-            file.write(b"")
+        if self.ownsPreview():
+            if os.path.exists(MOVIE_PATH):
+                os.remove(MOVIE_PATH)
+            with open(MOVIE_PATH, "wb") as file:
+                file.write(b"")
 
         # Ensuring proper cleanup
         atexit.register(self._cleanUp)
@@ -97,22 +164,86 @@ class CameraWrapper:
     @classmethod
     def getCamera(cls) -> CameraWrapper:
         """
-        getCamera : Returns the current camera instance
+        getCamera : Returns the main camera instance
 
         Returns:
-            CameraWrapper: Current camera instance
+            CameraWrapper: Main camera instance
         """
         return cls.CameraInstance
 
+    @classmethod
+    def getCameras(cls) -> list[CameraWrapper]:
+        """
+        getCameras : Returns every camera instance, the main one first
+
+        Returns:
+            list[CameraWrapper]: Camera instances
+        """
+        return list(cls.CameraInstances)
+
+    def getName(self) -> str:
+        """
+        getName : Returns the camera display name, with its number and port
+
+        Returns:
+            str: Camera name
+        """
+        return f"Caméra {self.index + 1} ({self.port or 'auto'})"
+
+    def suffixed(self, filepath: str) -> str:
+        """
+        suffixed : Adds the camera suffix to a file name, so that the files of
+        several cameras don't collide. The main camera files aren't suffixed.
+
+        Args:
+            filepath (str): File path
+
+        Returns:
+            str: Suffixed file path
+        """
+        root, extension = os.path.splitext(filepath)
+        return root + self.fileSuffix + extension
+
+    def setPort(self, port: str | None) -> None:
+        """
+        setPort : Binds the camera to another port, closing the current session.
+        The new session is connected in the background.
+
+        Args:
+            port (str | None): Camera port, as listed by listCams, None for the
+            first camera detected
+        """
+        logger.info("Binding %s to port %s", self.getName(), port)
+        with self.camLock:
+            if self.connected:
+                self.connected = False
+                try:
+                    self.cam.exit()
+                except CameraError as err:
+                    logger.debug("Could not close camera session: %s", err)
+            self.port = port
+            self.cam = self.backend.createSession(port)
+        self.infoCache.invalidate()
+        self.connectInBackground()
+
+    def ownsPreview(self) -> bool:
+        """
+        ownsPreview : Returns True for the main camera, the only one running the
+        preview process and using the movie file
+
+        Returns:
+            bool: Preview ownership
+        """
+        return self.index == 0
+
     def _clearGphoto(self) -> None:
         """
         _clearGphoto : Clear all processes origiating from gphoto2 that may lock the
         camera.
         """
         logger.debug("Clearing gphoto processes")
-        completedProcess = subprocess.run(["pkill", "gphoto2"], check=False)
 
-        if completedProcess.returncode != 0:
+        if not self.backend.clearProcesses():
             logger.warning("Failed to clear gphoto processes")
         else:
             logger.debug("Successfully cleared gphoto processes")
@@ -151,17 +282,119 @@ class CameraWrapper:
         """
         return self.connected
 
-    @promptError
-    def connect(self) -> None:
+    def canConnect(self) -> bool:
+        """
+        canConnect : Returns False while the camera is released to the preview
+        process, True otherwise
+
+        Returns:
+            bool: Connection possibility
         """
-        connect : Initiates connection to camera device
+        return not (self.isPreviewing and self.releasesCamera())
+
+    def connect(self) -> bool:
+        """
+        connect : Initiates connection to camera device right away, for callers
+        needing the camera immediately such as the photo capture after the
+        preview. On failure, the connection is retried in the background, see
+        connectInBackground.
+
+        Returns:
+            bool: True if the camera is connected
+        """
+        if self.isConnected():
+            return True
+
+        self.connector.setState(STATE_CONNECTING)
+        try:
+            self._connect()
+        except CameraError as err:
+            logger.warning("Camera connection failed, retrying in background: %s", err)
+            self.connector.request()
+            return False
+
+        self.connector.cancel()
+        self.connector.setState(STATE_CONNECTED)
+        return True
+
+    def connectInBackground(self) -> None:
+        """
+        connectInBackground : Initiates connection to camera device without
+        blocking, retrying with backoff until it succeeds. The connection state is
+        published by the connector stateChanged signal.
+        """
+        self.connector.request()
+
+    def _connect(self, reconnect: bool = False) -> None:
+        """
+        _connect : Opens the camera session, called from the GUI thread or the
+        connector thread
+
+        Args:
+            reconnect (bool, optional): Closes the session first if it is opened.
+            Defaults to False.
+
+        Raises:
+            CameraError: If the camera is released or the connection failed
         """
         logger.debug("Attempting to connect to Camera")
-        self.connected = False
-        self.cam.init()
-        self.connected = True
+        with self.camLock:
+            if not self.canConnect():
+                raise CameraError("Camera released to the preview process")
+            if self.connected and not reconnect:
+                return
+            if self.connected:
+                self.connected = False
+                try:
+                    self.cam.exit()
+                except CameraError as err:
+                    logger.debug("Could not close camera session: %s", err)
+
+            self.cam.init()
+            self.connected = True
+            if self.capturesToCard():
+                self._setCaptureTarget()
+        # Fetched again on the next read, not right before a capture
+        self.infoCache.invalidate()
         logger.debug("Successfully connected to Camera")
 
+    def _onError(self, funcName: str, err: Exception) -> None:
+        """
+        _onError : Publishes a camera error, and reconnects the camera in the
+        background since its session is usually unusable afterwards.
+
+        Args:
+            funcName (str): Failed function name
+            err (Exception): Raised error
+        """
+        self.connector.errorOccurred.emit(f"{funcName} : {err}")
+        if isinstance(err, CameraError) and self.canConnect():
+            self.connector.request(reconnect=True)
+
+    def reconnect(self) -> bool:
+        """
+        reconnect : Closes and reopens the camera session after an error, unless
+        the camera was released to the preview process meanwhile.
+
+        Returns:
+            bool: True if the camera is connected
+        """
+        with self.camLock:
+            if not self.connected:
+                return False
+            try:
+                self.cam.exit()
+                self.cam.init()
+                if self.capturesToCard():
+                    self._setCaptureTarget()
+            except CameraError as err:
+                logger.warning("Camera reconnection failed: %s", err)
+                self.connector.request(reconnect=True)
+                return False
+        self.infoCache.invalidate()
+        logger.info("Camera reconnected")
+        return True
+
     @promptError
     def listCams(self) -> tuple:
         """
@@ -170,12 +403,12 @@ class CameraWrapper:
         Returns:
             tuple: Tuple containing available camera list
         """
-        return tuple(gp.Camera.autodetect())
+        return self.backend.autodetect()
 
     @promptError
     def takePhoto(self, saveFolder: str) -> str:
         """
-        takePhoto : Trigger a photo capture
+        takePhoto : Trigger a photo capture and download the photo
 
         Args:
             saveFolder (str): Folderpath where the photo taken will be placed with a
@@ -185,60 +418,304 @@ class CameraWrapper:
         Returns:
             str: full photo filepath
         """
+        return self._downloadPhoto(self._capturePhoto(), saveFolder)
+
+    @promptError
+    def capturePhoto(self, barrier: threading.Barrier = None) -> CameraFilePath:
+        """
+        capturePhoto : Trigger a photo capture, the photo stays on the camera until
+        downloaded with downloadPhoto or the photo downloader.
+
+        Args:
+            barrier (threading.Barrier, optional): Barrier waited once the camera
+            is ready to shoot, to synchronize several cameras. Defaults to None.
+
+        Returns:
+            CameraFilePath: Captured photo path on the camera
+        """
+        return self._capturePhoto(barrier)
+
+    @promptError
+    def triggerPhoto(self, barrier: threading.Barrier = None) -> bool:
+        """
+        triggerPhoto : Triggers a photo capture and returns as soon as the shutter
+        fired, without waiting for the photo. In card capture mode, the photo is
+        then saved on the memory card and ingested by the card ingester.
+
+        Args:
+            barrier (threading.Barrier, optional): Barrier waited once the camera
+            is ready to shoot, to synchronize several cameras. Defaults to None.
+
+        Returns:
+            bool: True once triggered
+        """
+        logger.info("Triggering capture...")
+        # Before blocking the downloads, the ingester may be loading the manifest
+        self.ingester.prepare()
+        self.captureIdle.clear()
+        try:
+            if barrier is not None:
+                # Waited without the lock, an ingestion can't break the barrier
+                barrier.wait()
+            with self.camLock:
+                self.cam.triggerCapture()
+        finally:
+            self.captureIdle.set()
+        logger.debug("Capture successfully triggered")
+        return True
+
+    def capturesToCard(self) -> bool:
+        """
+        capturesToCard : Returns True if photos are saved on the camera memory card
+        and ingested in the background, False if they are downloaded after each
+        capture.
+
+        Returns:
+            bool: Card capture mode
+        """
+        return self.captureTarget == "card"
+
+    def _setCaptureTarget(self) -> None:
+        """
+        _setCaptureTarget : Sets the 'capturetarget' configuration to the memory
+        card, if the camera has one.
+        """
+        with self.camLock:
+            try:
+                for choice in self.cam.getConfigChoices("capturetarget"):
+                    if "card" in choice.lower():
+                        self.cam.setConfigValue("capturetarget", choice)
+                        self.infoCache.invalidate("config")
+                        logger.debug("Capture target set to %s", choice)
+                        return
+                logger.warning("No memory card capture target available")
+            except CameraError as err:
+                logger.warning("Could not set capture target: %s", err)
+
+    def listCardFiles(self) -> list[tuple[str, str]]:
+        """
+        listCardFiles : Lists the files stored on the camera, recursively from the
+        root folder.
+
+        Returns:
+            list[tuple[str, str]]: Folder and name of each file
+        """
+        cardFiles = []
+        folders = ["/"]
+        with self.camLock:
+            if not self.connected:
+                raise CameraError("Camera released to the preview process")
+            while folders:
+                folder = folders.pop()
+                for name in self.cam.listFiles(folder):
+                    cardFiles.append((folder, name))
+                for name in self.cam.listFolders(folder):
+                    folders.append(os.path.join(folder, name))
+        return sorted(cardFiles)
+
+    def waitForCardFiles(self, timeout: int) -> list[tuple[str, str]]:
+        """
+        waitForCardFiles : Waits for camera events and returns the files added
+        meanwhile. Events are consumed until the camera has none left, the lock is
+        only held for one event at a time.
+
+        Args:
+            timeout (int): Maximum time waited for each event in milliseconds
+
+        Returns:
+            list[tuple[str, str]]: Folder and name of each added file
+        """
+        addedFiles = []
+        while True:
+            with self.camLock:
+                if not self.connected:
+                    break
+                eventType, filePath = self.cam.waitForEvent(timeout)
+            if eventType == EVENT_TIMEOUT:
+                break
+            if eventType == EVENT_FILE_ADDED:
+                addedFiles.append((filePath.folder, filePath.name))
+        return addedFiles
+
+    def ingestCardFile(self, folder: str, name: str, saveFolder: str) -> str:
+        """
+        ingestCardFile : Downloads a file stored on the camera, naming it after its
+        camera folder and name so that a file ingested twice is overwritten.
+
+        Args:
+            folder (str): Camera folder
+            name (str): Camera file name
+            saveFolder (str): Folderpath where the file is saved
+
+        Returns:
+            str: full file path
+        """
+        self.captureIdle.wait()
+        with self.camLock:
+            if not self.connected:
+                raise CameraError("Camera released to the preview process")
+            data = self.cam.readFile(folder, name)
+
+        filepath = self.suffixed(os.path.join(
+            saveFolder, f"{os.path.basename(folder.rstrip('/'))}_{name}"
+        ))
+        with open(filepath, "wb") as file:
+            file.write(data)
+        return filepath
+
+    def _capturePhoto(self, barrier: threading.Barrier = None) -> CameraFilePath:
         logger.info("Capturing image...")
-        photoPath = self.cam.capture(gp.GP_CAPTURE_IMAGE)
+        self.captureIdle.clear()
+        try:
+            if barrier is not None:
+                # Waited without the lock, a download in progress can't break the
+                # barrier, the capture only starts once it's done
+                barrier.wait()
+            with self.camLock:
+                photoPath = self.cam.capture()
+        finally:
+            self.captureIdle.set()
         logger.debug("Image successfully captured")
+        return photoPath
 
-        photoFile = self.cam.file_get(
-            photoPath.folder, photoPath.name, gp.GP_FILE_TYPE_NORMAL
-        )
+    def getThumbnail(self, photoPath: CameraFilePath) -> bytes:
+        """
+        getThumbnail : Retrieves the embedded thumbnail of a captured photo, falling
+        back on the last preview frame if the camera can't provide one.
+
+        Args:
+            photoPath (CameraFilePath): Captured photo path on the camera
+
+        Returns:
+            bytes: Encoded thumbnail
+        """
+        try:
+            with self.camLock:
+                return self.cam.readFile(
+                    photoPath.folder, photoPath.name, thumbnail=True
+                )
+        except CameraError as err:
+            logger.warning("No thumbnail available, using last preview frame: %s", err)
+            return self.readPreview()
+
+    @promptError
+    def downloadPhoto(self, photoPath: CameraFilePath, saveFolder: str) -> str:
+        """
+        downloadPhoto : Retrieves a captured photo and saves it
+
+        Args:
+            photoPath (CameraFilePath): Captured photo path on the camera
+            saveFolder (str): Folderpath where the photo will be placed with a time
+            stamp name
+
+        Returns:
+            str: full photo filepath
+        """
+        return self._downloadPhoto(photoPath, saveFolder)
+
+    def _downloadPhoto(self, photoPath: CameraFilePath, saveFolder: str) -> str:
+        # Yielding to a pending capture, it would wait for the whole download
+        self.captureIdle.wait()
+        with self.camLock:
+            photoData = self.cam.readFile(photoPath.folder, photoPath.name)
         logger.debug("Image successfully retrieved")
 
         timestamp = QDateTime.currentDateTime().toString(
             "dd:MM:yyyy_hh'h'MM'm'ss's'zzz"
         )
-        filepath = f"{saveFolder}/{timestamp}.jpeg"
+        filepath = f"{saveFolder}/{timestamp}{self.fileSuffix}.jpeg"
 
-        photoFile.save(filepath)
+        with open(filepath, "wb") as file:
+            file.write(photoData)
         logger.info("Image successfully captured and saved")
         return filepath
 
-    def readPreview(self) -> bytes:
+    def setFrameCallback(self, frameCallback: Callable[[bytes, float], None]) -> None:
         """
-        readPreview : Read last available preview frame from the movie file and
-        returns it.
+        setFrameCallback : Sets the function called with each new preview frame and
+        its time.monotonic() reception timestamp. In stream mode, the callback is
+        called from the reader thread.
+
+        Args:
+            frameCallback (Callable[[bytes, float], None]): New frame callback
+        """
+        self.frameCallback = frameCallback
+
+    def needsPolling(self) -> bool:
+        """
+        needsPolling : Returns True if new preview frames have to be polled with
+        pollPreview, False if they are pushed to the frame callback.
 
         Returns:
-            bytes: Last available jpeg frame
+            bool: Polling requirement
         """
-        filesize = os.path.getsize(MOVIE_PATH)
+        return self.previewMode == "file"
 
-        if filesize == 0:
-            with open(DEFAULT_PHOTO, "br") as file:
-                return file.read()
+    def releasesCamera(self) -> bool:
+        """
+        releasesCamera : Returns True if the camera session has to be closed while
+        previewing because a gphoto2 process takes it over, False if the preview is
+        pulled from the opened session.
+
+        Returns:
+            bool: Camera release requirement
+        """
+        return self.previewMode != "gphoto"
 
-        if filesize == self.prevFileSize:
-            return self.prevFrame
-        self.prevFileSize = filesize
+    def getPreviewMetrics(self) -> dict:
+        """
+        getPreviewMetrics : Returns the metrics of the current (or last) preview
+        session, see PreviewMetrics.getSnapshot.
 
-        self.frameCount += 1
+        Returns:
+            dict: Preview metrics
+        """
+        return self.metrics.getSnapshot()
 
-        # Fully uncompressed image (theoretical maximum)
-        maxsize = 960 * 640 * 3
+    def pollPreview(self) -> None:
+        """
+        pollPreview : Checks the movie file for a new frame and passes it to the
+        frame callback. Only needed in file mode.
+        """
+        frame = self.frameExtractor.readNewFrame()
+        if frame is not None:
+            self._onNewFrame(frame, time.monotonic())
 
-        with open(MOVIE_PATH, "br") as file:
-            # Sets cursor 690*640*3 bytes before the end of the file if possible
-            file.seek(filesize - maxsize if (filesize - maxsize) > 0 else 0)
-            rawdata = file.read(maxsize if maxsize < filesize else filesize)
+    def readPreview(self) -> bytes:
+        """
+        readPreview : Returns the last available preview frame, polling the movie
+        file first in file mode.
 
-        frame = rawdata[rawdata.rfind(START_BYTES):]
+        Returns:
+            bytes: Last available jpeg frame
+        """
+        if self.needsPolling():
+            self.pollPreview()
 
-        # Checking if the image has been fully received
-        if not frame.endswith(STOP_BYTES):
-            return self.prevFrame
+        if not self.prevFrame:
+            return self.defaultFrame
+        return self.prevFrame
 
+    def _onNewFrame(self, frame: bytes, timestamp: float) -> None:
+        """
+        _onNewFrame : Called for every frame received from the camera, counts it and
+        forwards it to the frame callback unless it is a copy of the previous one.
+
+        Args:
+            frame (bytes): Jpeg frame
+            timestamp (float): time.monotonic() reception timestamp
+        """
+        self.lastFrameTime = timestamp
+        self.frameCount += 1
+        self.metrics.count("produced")
+
+        if frame == self.prevFrame:
+            self.metrics.count("duplicated")
+            return
         self.prevFrame = frame
-        return frame
+
+        if self.frameCallback is not None:
+            self.frameCallback(frame, timestamp)
 
     @promptError
     def startPreview(self) -> None:
@@ -248,43 +725,193 @@ class CameraWrapper:
         """
         self.isPreviewing = True
 
-        self._cleanMovieFile()
+        self.prevFrame = b""
+        self.metrics.reset()
 
-        self.frameCount = 0
-        self.previewStartTime = time.time_ns()
-
-        self.cam.exit()
-        self.previewProcess = subprocess.Popen(
-            ["gphoto2", "--capture-movie", "--force-overwrite"],
-            stderr=subprocess.STDOUT,
-            stdout=self.logfile,
-            cwd=os.path.dirname(MOVIE_PATH), )
-        # , "--stdout", "|",
-        # "ffmpeg", "-i", "-", "-f", "mjpeg", "out.avi", "-y"])
-        logger.info("POPEN Liveview capture started")
+        if self.releasesCamera():
+            self.connector.cancel()
+            with self.camLock:
+                self.connected = False
+                self.cam.exit()
+            self.connector.setState(STATE_DISCONNECTED)
+
+        self._spawnPreviewProcess()
+        logger.info("Liveview capture started (%s mode)", self.previewMode)
+
+    @promptError
+    def restartPreview(self) -> None:
+        """
+        restartPreview : Restarts the preview process or reader only, the camera is
+        neither reconnected nor reinitialized.
+        """
+        if not self.isPreviewing:
+            return
+
+        self._killPreviewProcess()
+        self._spawnPreviewProcess()
+        logger.info("Liveview capture restarted")
 
     @promptError
     def stopPreview(self) -> None:
         """
         stopPreview : Terminates the separate preview process, stopping preview.
-        Reconnects the camera for normal photo operation.
+        The camera has to be reconnected afterwards for normal photo operation if
+        it isn't connected anymore.
         """
         if self.isPreviewing:
-            self.previewProcess.terminate()
-            self.previewProcess.wait()
+            self._killPreviewProcess()
         self.isPreviewing = False
-        logger.info("POPEN Liveview capture stopped")
+        logger.info("Liveview capture stopped")
+
+        self.metrics.logSummary()
+
+    def _spawnPreviewProcess(self) -> None:
+        """
+        _spawnPreviewProcess : Launches the gphoto2 liveview process, and the
+        stream reader thread in stream mode, or only the capture preview reader
+        thread in gphoto mode.
+        """
+        self.lastFrameTime = time.monotonic()
+
+        if self.previewMode == "gphoto":
+            self.streamReader = CapturePreviewReader(
+                self._capturePreviewFrame, self._onNewFrame
+            )
+            self.streamReader.start()
+        elif self.previewMode == "stream":
+            self.previewProcess = self.backend.spawnLiveview(
+                None, self.logfile, self.port
+            )
+            self.streamReader = MjpegStreamReader(
+                self.previewProcess.stdout, frameCallback=self._onNewFrame
+            )
+            self.streamReader.start()
+        else:
+            self._cleanMovieFile()
+            self.frameExtractor.reset()
+            self.previewProcess = self.backend.spawnLiveview(
+                MOVIE_PATH, self.logfile, self.port
+            )
+
+    def _killPreviewProcess(self) -> None:
+        """
+        _killPreviewProcess : Terminates the gphoto2 liveview process, killing it if
+        it is frozen, and joins the reader thread.
+        """
+        if self.previewMode == "gphoto":
+            self.streamReader.stop()
+            self.streamReader.join()
+            self.streamReader = None
+            self._setViewfinder(False)
+            return
+
+        self.previewProcess.terminate()
+        try:
+            self.previewProcess.wait(PREVIEW_KILL_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            logger.warning("Preview process not responding, killing it")
+            self.previewProcess.kill()
+            self.previewProcess.wait()
+
+        if self.streamReader is not None:
+            self.streamReader.stop()
+            self.streamReader.join()
+            self.streamReader = None
+            self.previewProcess.stdout.close()
+
+    def _capturePreviewFrame(self) -> bytes:
+        """
+        _capturePreviewFrame : Captures a single liveview frame from the opened
+        camera session.
+
+        Returns:
+            bytes: Jpeg frame
+        """
+        with self.camLock:
+            return self.cam.capturePreview()
 
-        fps = round(self.frameCount / (time.time_ns() - self.previewStartTime), 3)
-        logger.info("Mean FPS since last clip: %s", str(fps))
+    def _setViewfinder(self, enabled: bool) -> None:
+        """
+        _setViewfinder : Raises or lowers the camera mirror by setting the
+        'viewfinder' configuration, if the camera has one.
+
+        Args:
+            enabled (bool): Viewfinder state
+        """
+        with self.camLock:
+            try:
+                self.cam.setConfigValue("viewfinder", int(enabled))
+                self.infoCache.invalidate("config")
+            except CameraError as err:
+                logger.debug("Could not set viewfinder: %s", err)
+
+    def isPreviewAlive(self) -> bool:
+        """
+        isPreviewAlive : Returns True if the preview process, or reader thread in
+        gphoto mode, is running
+
+        Returns:
+            bool: Preview process state
+        """
+        if self.previewMode == "gphoto":
+            return self.streamReader is not None and self.streamReader.is_alive()
+        return self.previewProcess is not None and self.previewProcess.poll() is None
+
+    def getFrameAge(self) -> float:
+        """
+        getFrameAge : Returns the time elapsed since the last new preview frame, or
+        since the preview process start if no frame was received yet.
+
+        Returns:
+            float: Elapsed time in seconds
+        """
+        return time.monotonic() - self.lastFrameTime
+
+    def getFrameCount(self) -> int:
+        """
+        getFrameCount : Returns the number of preview frames received from the
+        camera since its creation, duplicates included.
+
+        Returns:
+            int: Frame count
+        """
+        return self.frameCount
+
+    def getRestartReason(self) -> str | None:
+        """
+        getRestartReason : Checks if the preview process has to be restarted, which
+        only happens if it died, if the stream stalled or if the movie file of the
+        file mode grew over MAX_MOVIE_SIZE.
+
+        Returns:
+            str | None: Reason of the restart, None if no restart is needed
+        """
+        if not self.isPreviewing:
+            return None
+        if not self.isPreviewAlive():
+            return "preview process or reader exited"
+        if self.getFrameAge() > PREVIEW_STALL_TIMEOUT:
+            return f"no frame for {PREVIEW_STALL_TIMEOUT} s"
+        if self.previewMode == "file" and os.path.getsize(MOVIE_PATH) > MAX_MOVIE_SIZE:
+            return "movie file size limit reached"
+        return None
 
     def _closeLog(self) -> None:
         self.logfile.close()
 
     def _cleanUp(self) -> None:
+        if self in CameraWrapper.CameraInstances:
+            CameraWrapper.CameraInstances.remove(self)
+        if CameraWrapper.CameraInstance is self:
+            CameraWrapper.CameraInstance = None
+
         exitFunctions = (
-            self.cam.exit, self.stopPreview, self._cleanMovieFile, self._clearGphoto,
-            self._closeLog,)
+            self.connector.stop, self.downloader.stop, self.ingester.stop,
+            self.infoCache.stop, self.cam.exit, self.stopPreview,
+            self.frameExtractor.close,)
+        if self.ownsPreview():
+            exitFunctions += (self._cleanMovieFile, self._clearGphoto)
+        exitFunctions += (self._closeLog,)
 
         for func in exitFunctions:
             try:
@@ -295,41 +922,50 @@ class CameraWrapper:
     @promptError
     def getAbilities(self) -> tuple:
         try:
-            return tuple(self.cam.get_abilities())
+            with self.camLock:
+                return tuple(self.cam.getInfo("abilities"))
         except TypeError:
             return tuple()
 
     @promptError
     def getAbout(self):
-        return self.cam.get_about()
+        with self.camLock:
+            return self.cam.getInfo("about")
 
     @promptError
     def getConfig(self):
-        return self.cam.get_config()
+        with self.camLock:
+            return self.cam.getInfo("config")
 
     @promptError
     def getManual(self):
-        return self.cam.get_manual()
+        with self.camLock:
+            return self.cam.getInfo("manual")
 
     @promptError
     def getPortInfo(self):
-        return self.cam.get_port_info()
+        with self.camLock:
+            return self.cam.getInfo("portinfo")
 
     @promptError
     def getSimpleConfig(self):
-        return self.cam.get_simple_config()
+        with self.camLock:
+            return self.cam.getInfo("simpleconfig")
 
     @promptError
     def getStorageInfo(self):
-        return self.cam.get_storageinfo()
+        with self.camLock:
+            return self.cam.getInfo("storageinfo")
 
     @promptError
     def getSummary(self):
-        return self.cam.get_summary()
+        with self.camLock:
+            return self.cam.getInfo("summary")
 
     @promptError
     def listConfig(self):
-        return self.cam.list_config()
+        with self.camLock:
+            return self.cam.getInfo("configlist")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,248 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module defining the camera backend interface, giving access to a camera session
+and to the liveview process, so that the camera wrapper doesn't depend on the
+actual camera library
+"""
+
+from __future__ import annotations
+
+import abc
+import collections
+import logging
+import subprocess
+from typing import TextIO
+
+from ..utilities.constants import CAMERA_BACKEND
+
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+CameraFilePath = collections.namedtuple("CameraFilePath", ("folder", "name"))
+
+# Camera event types returned by CameraSession.waitForEvent
+EVENT_TIMEOUT = "timeout"
+EVENT_FILE_ADDED = "file added"
+EVENT_OTHER = "other"
+
+# Information names accepted by CameraSession.getInfo
+INFO_NAMES = (
+    "abilities", "about", "config", "configlist", "manual", "portinfo",
+    "simpleconfig", "storageinfo", "summary",
+)
+
+
+class CameraError(Exception):
+    """
+    CameraError : Error raised by camera sessions and backends
+    """
+
+
+class CameraSession(abc.ABC):
+    """
+    CameraSession : Connection to a single camera. Sessions aren't thread safe,
+    calls have to be serialized by the caller.
+    """
+
+    @abc.abstractmethod
+    def init(self) -> None:
+        """
+        init : Opens the session
+        """
+
+    @abc.abstractmethod
+    def exit(self) -> None:
+        """
+        exit : Closes the session, releasing the camera to other processes
+        """
+
+    @abc.abstractmethod
+    def capture(self) -> CameraFilePath:
+        """
+        capture : Takes a photo and waits for it to be stored on the camera
+
+        Returns:
+            CameraFilePath: Captured photo path on the camera
+        """
+
+    @abc.abstractmethod
+    def triggerCapture(self) -> None:
+        """
+        triggerCapture : Takes a photo and returns as soon as the shutter fired,
+        the photo is reported later by waitForEvent
+        """
+
+    @abc.abstractmethod
+    def capturePreview(self) -> bytes:
+        """
+        capturePreview : Captures a single liveview frame
+
+        Returns:
+            bytes: Jpeg frame
+        """
+
+    @abc.abstractmethod
+    def readFile(self, folder: str, name: str, thumbnail: bool = False) -> bytes:
+        """
+        readFile : Downloads a file stored on the camera
+
+        Args:
+            folder (str): Camera folder
+            name (str): Camera file name
+            thumbnail (bool, optional): Downloads the embedded thumbnail instead of
+            the file. Defaults to False.
+
+        Returns:
+            bytes: File content
+        """
+
+    @abc.abstractmethod
+    def listFiles(self, folder: str) -> list[str]:
+        """
+        listFiles : Lists the files of a camera folder
+
+        Args:
+            folder (str): Camera folder
+
+        Returns:
+            list[str]: File names
+        """
+
+    @abc.abstractmethod
+    def listFolders(self, folder: str) -> list[str]:
+        """
+        listFolders : Lists the sub folders of a camera folder
+
+        Args:
+            folder (str): Camera folder
+
+        Returns:
+            list[str]: Folder names
+        """
+
+    @abc.abstractmethod
+    def waitForEvent(self, timeout: int) -> tuple[str, CameraFilePath | None]:
+        """
+        waitForEvent : Waits for the next camera event
+
+        Args:
+            timeout (int): Maximum waiting time in milliseconds
+
+        Returns:
+            tuple[str, CameraFilePath | None]: Event type, one of the EVENT_*
+            constants, and added file path for EVENT_FILE_ADDED events
+        """
+
+    @abc.abstractmethod
+    def getConfigChoices(self, name: str) -> list[str]:
+        """
+        getConfigChoices : Returns the values accepted by a configuration entry
+
+        Args:
+            name (str): Configuration entry name
+
+        Returns:
+            list[str]: Accepted values
+        """
+
+    @abc.abstractmethod
+    def setConfigValue(self, name: str, value: object) -> None:
+        """
+        setConfigValue : Sets a configuration entry on the camera
+
+        Args:
+            name (str): Configuration entry name
+            value (object): New value
+        """
+
+    @abc.abstractmethod
+    def getInfo(self, name: str) -> object:
+        """
+        getInfo : Returns camera information for display
+
+        Args:
+            name (str): Information name, one of INFO_NAMES
+
+        Returns:
+            object: Information object
+        """
+
+
+class CameraBackend(abc.ABC):
+    """
+    CameraBackend : Factory of camera sessions, also in charge of the liveview
+    process streaming MJPEG while the camera session is released.
+    """
+
+    @abc.abstractmethod
+    def createSession(self, port: str | None = None) -> CameraSession:
+        """
+        createSession : Creates a camera session, not opened yet
+
+        Args:
+            port (str | None, optional): Port of the camera, as listed by
+            autodetect, the first camera detected if None. Defaults to None.
+
+        Returns:
+            CameraSession: New session
+        """
+
+    @abc.abstractmethod
+    def autodetect(self) -> tuple:
+        """
+        autodetect : Lists the available cameras
+
+        Returns:
+            tuple: (name, port) tuples
+        """
+
+    @abc.abstractmethod
+    def spawnLiveview(
+        self, outputPath: str | None, logfile: TextIO, port: str | None = None
+    ) -> subprocess.Popen:
+        """
+        spawnLiveview : Launches the liveview process
+
+        Args:
+            outputPath (str | None): MJPEG file written by the process, None to
+            stream it on the process stdout pipe
+            logfile (TextIO): File receiving the process logs
+            port (str | None, optional): Port of the camera, the first camera
+            detected if None. Defaults to None.
+
+        Returns:
+            subprocess.Popen: Liveview process
+        """
+
+    @abc.abstractmethod
+    def clearProcesses(self) -> bool:
+        """
+        clearProcesses : Kills the leftover processes that may lock the camera
+
+        Returns:
+            bool: True if processes were cleared
+        """
+
+
+def createBackend(name: str = CAMERA_BACKEND) -> CameraBackend:
+    """
+    createBackend : Creates a camera backend, the camera libraries are only
+    imported by the backend using them.
+
+    Args:
+        name (str, optional): "gphoto" or "simulated". Defaults to CAMERA_BACKEND.
+
+    Returns:
+        CameraBackend: New backend
+    """
+    logger.debug("Using %s camera backend", name)
+    if name == "gphoto":
+        from .gphotobackend import GphotoBackend
+        return GphotoBackend()
+    if name == "simulated":
+        from .simulatedbackend import SimulatedBackend
+        return SimulatedBackend()
+    raise ValueError(f"Unknown camera backend '{name}'")
@@ -0,0 +1,201 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module containing the camera connector, opening the camera session outside of
+the GUI thread
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from .camerabackend import CameraError
+from ..utilities.constants import CONNECT_RETRY_DELAY, CONNECT_RETRY_MAX_DELAY
+
+if TYPE_CHECKING:
+    from .camera import CameraWrapper
+
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+# Connection states published by CameraConnector.stateChanged
+STATE_DISCONNECTED = "disconnected"
+STATE_CONNECTING = "connecting"
+STATE_CONNECTED = "connected"
+STATE_FAILED = "failed"
+
+
+class CameraConnector(QThread):
+    """
+    CameraConnector : Worker thread connecting the camera on request. Failed
+    connections are retried until success, spaced by an exponential backoff
+    starting at CONNECT_RETRY_DELAY seconds and capped at CONNECT_RETRY_MAX_DELAY.
+
+    The connection state is published with stateChanged, failures with failed
+    along with the delay before the next attempt, and the errors of the other
+    camera operations with errorOccurred, see promptError. While the camera is
+    released to the preview process, pending connections are dropped since
+    stopping the preview reconnects the camera anyway.
+    """
+
+    stateChanged = pyqtSignal(str)
+    failed = pyqtSignal(str, float)
+    errorOccurred = pyqtSignal(str)
+
+    def __init__(self, camera: CameraWrapper) -> None:
+        """
+        Args:
+            camera (CameraWrapper): Camera to connect
+        """
+        super().__init__()
+        self.setObjectName("CameraConnector")
+        self.camera = camera
+
+        self.state = STATE_DISCONNECTED
+        self.failCount = 0
+        self.nextAttemptTime = 0.0
+
+        self._condition = threading.Condition()
+        self._requested = False
+        self._forceReconnect = False
+        self._running = True
+
+    def getState(self) -> str:
+        """
+        getState : Returns the connection state
+
+        Returns:
+            str: One of the STATE_* constants
+        """
+        return self.state
+
+    def setState(self, state: str) -> None:
+        """
+        setState : Updates the connection state, emitting stateChanged if it
+        changed. Called from any thread.
+
+        Args:
+            state (str): One of the STATE_* constants
+        """
+        if state == self.state:
+            return
+        self.state = state
+        logger.debug("Camera %s", state)
+        self.stateChanged.emit(state)
+
+    def getRetryDelay(self) -> float:
+        """
+        getRetryDelay : Returns the delay before the next connection attempt
+
+        Returns:
+            float: Delay in seconds
+        """
+        if self.failCount == 0:
+            return 0.0
+        return min(
+            CONNECT_RETRY_MAX_DELAY,
+            CONNECT_RETRY_DELAY * 2 ** (self.failCount - 1)
+        )
+
+    def request(self, reconnect: bool = False) -> None:
+        """
+        request : Asks for a connection without waiting for it. A pending retry
+        is attempted right away.
+
+        Args:
+            reconnect (bool, optional): Closes and reopens the session even if the
+            camera is connected, after a camera error. Defaults to False.
+        """
+        with self._condition:
+            self._requested = True
+            self._forceReconnect = self._forceReconnect or reconnect
+            self.nextAttemptTime = 0.0
+            self._condition.notify()
+
+    def cancel(self) -> None:
+        """
+        cancel : Drops the pending connection request and resets the backoff
+        """
+        with self._condition:
+            self._requested = False
+            self._forceReconnect = False
+            self.failCount = 0
+
+    def stop(self) -> None:
+        """
+        stop : Stops the worker and waits for it to finish
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self.wait()
+
+    def run(self) -> None:
+        logger.debug("Camera connector started")
+        while True:
+            with self._condition:
+                while self._running and not self._isAttemptDue():
+                    timeout = None
+                    if self._requested:
+                        timeout = self.nextAttemptTime - time.monotonic()
+                    self._condition.wait(timeout)
+                if not self._running:
+                    break
+                reconnect = self._forceReconnect
+            self._attempt(reconnect)
+        logger.debug("Camera connector stopped")
+
+    def _isAttemptDue(self) -> bool:
+        return self._requested and time.monotonic() >= self.nextAttemptTime
+
+    def _attempt(self, reconnect: bool) -> None:
+        """
+        _attempt : Connects the camera once, scheduling the next attempt on failure
+
+        Args:
+            reconnect (bool): Closes the session first if the camera is connected
+        """
+        if self.camera.isConnected() and not reconnect:
+            self._onConnected()
+            return
+        if not self.camera.canConnect():
+            logger.debug("Camera released to the preview process, connection dropped")
+            self.cancel()
+            return
+
+        self.setState(STATE_CONNECTING)
+        try:
+            self.camera._connect(reconnect)
+        except CameraError as err:
+            with self._condition:
+                self.failCount += 1
+                retryDelay = self.getRetryDelay()
+                self.nextAttemptTime = time.monotonic() + retryDelay
+            logger.warning(
+                "Camera connection failed (attempt %u, next attempt in %.0f s): %s",
+                self.failCount, retryDelay, err
+            )
+            self.setState(STATE_FAILED)
+            self.failed.emit(str(err), retryDelay)
+            return
+
+        if self.failCount:
+            logger.info("Camera connected after %u failed attempt(s)", self.failCount)
+        self._onConnected()
+
+    def _onConnected(self) -> None:
+        with self._condition:
+            self._requested = False
+            self._forceReconnect = False
+            self.failCount = 0
+        # The camera may have been released to the preview process meanwhile
+        self.setState(
+            STATE_CONNECTED if self.camera.isConnected() else STATE_DISCONNECTED
+        )
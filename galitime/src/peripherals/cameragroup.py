@@ -0,0 +1,85 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module containing the camera group, triggering several cameras at the same time
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import logging
+import threading
+
+from .camera import CameraWrapper
+from ..utilities.constants import CAPTURE_SYNC_TIMEOUT
+
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+
+class CameraGroup:
+    """
+    CameraGroup : Cameras triggered together. Each connected camera captures from
+    its own thread, the threads wait on a barrier once they hold their camera lock
+    so that every shutter fires at the same time. The photos are then downloaded
+    by the downloader of each camera, in parallel.
+    """
+
+    def __init__(self, cameras: list[CameraWrapper]) -> None:
+        """
+        Args:
+            cameras (list[CameraWrapper]): Cameras, the main one first
+        """
+        self.cameras = cameras
+
+    def capture(self) -> list[object]:
+        """
+        capture : Captures a photo with every connected camera, or triggers it in
+        card capture mode, see CameraWrapper.capturePhoto and triggerPhoto. The
+        disconnected cameras are skipped.
+
+        Returns:
+            list[object]: Result of each camera, in the order of the cameras, None
+            if the camera failed or was skipped
+        """
+        readyCameras = []
+        for camera in self.cameras:
+            if camera.isConnected():
+                readyCameras.append(camera)
+            else:
+                # Its connector keeps on retrying the connection meanwhile
+                logger.warning("%s not connected, skipped", camera.getName())
+
+        # No thread needed for a single camera
+        if len(readyCameras) == 1:
+            results = {readyCameras[0]: self._captureWith(readyCameras[0], None)}
+        elif readyCameras:
+            barrier = threading.Barrier(len(readyCameras), timeout=CAPTURE_SYNC_TIMEOUT)
+            with concurrent.futures.ThreadPoolExecutor(len(readyCameras)) as executor:
+                futures = {
+                    camera: executor.submit(self._captureWith, camera, barrier)
+                    for camera in readyCameras
+                }
+            results = {camera: future.result() for camera, future in futures.items()}
+        else:
+            results = {}
+
+        return [results.get(camera) for camera in self.cameras]
+
+    @staticmethod
+    def _captureWith(camera: CameraWrapper, barrier: threading.Barrier | None) -> object:
+        """
+        _captureWith : Captures a photo with a single camera
+
+        Args:
+            camera (CameraWrapper): Camera
+            barrier (threading.Barrier | None): Barrier shared by the cameras
+
+        Returns:
+            object: Capture result, None on failure
+        """
+        if camera.capturesToCard():
+            return camera.triggerPhoto(barrier)
+        return camera.capturePhoto(barrier)
@@ -0,0 +1,163 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module containing the camera information cache, querying the camera metadata
+outside of the GUI thread
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from ..utilities.constants import CAMERA_INFO_TTL
+
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+
+class CameraInfoCache(QThread):
+    """
+    CameraInfoCache : Worker thread keeping the camera metadata (abilities,
+    configuration, summary...) in memory. Entries are only fetched when read:
+    reading a missing entry, one older than CAMERA_INFO_TTL seconds or an
+    invalidated one returns the cached value and asks the worker to fetch it
+    again, while the camera session is available. Reading the cache never causes
+    USB traffic itself, and connecting the camera doesn't either.
+    """
+
+    updated = pyqtSignal(str)
+
+    def __init__(
+        self,
+        fetchers: dict[str, Callable[[], object]],
+        lock: threading.RLock,
+        isAvailable: Callable[[], bool]
+    ) -> None:
+        """
+        Args:
+            fetchers (dict[str, Callable[[], object]]): Function querying the camera
+            for each entry name
+            lock (threading.RLock): Lock held while querying the camera
+            isAvailable (Callable[[], bool]): Function returning True if the camera
+            can be queried
+        """
+        super().__init__()
+        self.setObjectName("CameraInfoCache")
+
+        self.fetchers = fetchers
+        self.lock = lock
+        self.isAvailable = isAvailable
+
+        self._entries: dict[str, tuple[float, object]] = {}
+        self._requested: set[str] = set()
+        self._entriesLock = threading.Lock()
+        self._wakeEvent = threading.Event()
+        self._running = True
+
+    def get(self, name: str) -> object | None:
+        """
+        get : Returns a cached entry, without querying the camera. A missing or
+        outdated entry is fetched in the background, updated is emitted once done.
+
+        Args:
+            name (str): Entry name
+
+        Returns:
+            object | None: Cached value, None if not fetched yet
+        """
+        with self._entriesLock:
+            entry = self._entries.get(name)
+            outdated = entry is None or time.monotonic() - entry[0] >= CAMERA_INFO_TTL
+            if outdated and name in self.fetchers:
+                self._requested.add(name)
+        if outdated:
+            self._wakeEvent.set()
+        return None if entry is None else entry[1]
+
+    def getAge(self, name: str) -> float | None:
+        """
+        getAge : Returns the time elapsed since an entry was fetched
+
+        Args:
+            name (str): Entry name
+
+        Returns:
+            float | None: Entry age in seconds, None if not fetched yet
+        """
+        with self._entriesLock:
+            entry = self._entries.get(name)
+        return None if entry is None else time.monotonic() - entry[0]
+
+    def invalidate(self, *names: str) -> None:
+        """
+        invalidate : Marks entries as outdated, they are fetched again on their next
+        read. Outdated values are still returned by get until replaced.
+
+        Args:
+            names (str): Entry names, every entry if none is given
+        """
+        with self._entriesLock:
+            for name in names or tuple(self._entries):
+                if name in self._entries:
+                    self._entries[name] = (float("-inf"), self._entries[name][1])
+
+    def stop(self) -> None:
+        """
+        stop : Stops the worker and waits for it to finish
+        """
+        self._running = False
+        self._wakeEvent.set()
+        self.wait()
+
+    def run(self) -> None:
+        logger.debug("Camera info cache started")
+        while self._running:
+            self._wakeEvent.wait()
+            self._wakeEvent.clear()
+            with self._entriesLock:
+                requested = self._requested
+                self._requested = set()
+            # Requests made while the camera is unavailable are dropped, the entries
+            # are asked for again on their next read
+            if self._running and self.isAvailable():
+                self._fetchRequested(requested)
+        logger.debug("Camera info cache stopped")
+
+    def _fetchRequested(self, names: set[str]) -> None:
+        """
+        _fetchRequested : Queries the camera for the requested entries still missing
+        or outdated
+
+        Args:
+            names (set[str]): Requested entry names
+        """
+        for name, fetcher in self.fetchers.items():
+            if name not in names:
+                continue
+            age = self.getAge(name)
+            if age is not None and age < CAMERA_INFO_TTL:
+                continue
+            if not self._running:
+                return
+
+            try:
+                with self.lock:
+                    # The camera may have been released while waiting for the lock
+                    if not self.isAvailable():
+                        return
+                    value = fetcher()
+            except Exception as err:
+                logger.warning("Could not fetch camera %s: %s", name, err)
+                continue
+
+            with self._entriesLock:
+                self._entries[name] = (time.monotonic(), value)
+            logger.debug("Camera %s cached", name)
+            self.updated.emit(name)
@@ -0,0 +1,277 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module containing the card ingester, copying the photos saved on the camera memory
+card to the photo folder in the background
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtGui import QImage
+
+from ..managers.photomanager import PhotoManager
+from ..managers.statestore import writeJsonFile
+from ..utilities.constants import ENCODING, INGEST_BATCH_SIZE, INGEST_EVENT_TIMEOUT
+from ..utilities.constants import INGEST_MANIFEST, INGEST_MAX_ATTEMPTS
+from ..utilities.constants import INGEST_PREPARE_TIMEOUT, INGEST_RETRY_DELAY
+
+if TYPE_CHECKING:
+    from .camera import CameraWrapper
+
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+
+class CardIngester(QThread):
+    """
+    CardIngester : Worker thread waiting for the files added on the camera memory
+    card and downloading them to the photo folder by batches.
+
+    Every ingested card file is recorded in a manifest saved in the photo folder,
+    so that files captured but not ingested before a crash are ingested on the
+    next start. The files already on the card when a photo folder is first used
+    are recorded without being ingested. Camera errors are retried every
+    INGEST_RETRY_DELAY seconds, reconnecting the camera, and the card is fully
+    listed again afterwards so that no file added meanwhile is missed. A file
+    failing INGEST_MAX_ATTEMPTS times in a row, such as a corrupt card file, is
+    recorded as failed in the manifest and skipped, so it can't block the next
+    ones, and ingestFailed is emitted.
+    """
+
+    photoIngested = pyqtSignal(str, QImage)
+    ingestFailed = pyqtSignal(str)
+
+    def __init__(self, camera: CameraWrapper) -> None:
+        """
+        Args:
+            camera (CameraWrapper): Camera whose memory card is ingested
+        """
+        super().__init__()
+        self.setObjectName("CardIngester")
+
+        self.camera = camera
+        self.pending: list[tuple[str, str]] = []
+
+        self._manifestFolder = None
+        self._manifestLock = threading.Lock()
+        self._ingested: set[str] = set()
+        self._failed: set[str] = set()
+        self._attempts: dict[str, int] = {}
+        self._rescan = True
+        # Notified once the manifest of a new photo folder is loaded
+        self._manifestLoaded = threading.Condition()
+        self._wakeEvent = threading.Event()
+        self._stopEvent = threading.Event()
+
+    def prepare(self, timeout: float = INGEST_PREPARE_TIMEOUT) -> None:
+        """
+        prepare : Waits for the worker to load or create the manifest of the current
+        photo folder before a capture, so that the captured photo isn't recorded as
+        an existing file when the ingester didn't get to create the manifest yet.
+        Returns right away once the manifest is loaded.
+
+        Args:
+            timeout (float, optional): Seconds waited for the manifest. Defaults to
+            INGEST_PREPARE_TIMEOUT.
+        """
+        photoFolder = PhotoManager.getPhotoFolder()
+        if not photoFolder or photoFolder == self._manifestFolder:
+            return
+
+        self._wakeEvent.set()
+        with self._manifestLoaded:
+            loaded = self._manifestLoaded.wait_for(
+                lambda: self._manifestFolder == photoFolder, timeout
+            )
+        if not loaded:
+            logger.warning("Card ingestion manifest of %s not ready yet", photoFolder)
+
+    def stop(self) -> None:
+        """
+        stop : Stops the ingester after the current file and waits for it to finish
+        """
+        self._stopEvent.set()
+        self._wakeEvent.set()
+        self.wait()
+
+    def run(self) -> None:
+        logger.debug("Card ingester started")
+        while not self._stopEvent.is_set():
+            if not PhotoManager.getPhotoFolder() or not self.camera.isConnected():
+                # No event opened or camera released to the preview process
+                self._wakeEvent.wait(INGEST_RETRY_DELAY)
+                self._wakeEvent.clear()
+                continue
+
+            try:
+                self._ingestNewFiles()
+            except Exception as err:
+                logger.warning("Card ingestion error, retrying: %s", err)
+                self._rescan = True
+                self._stopEvent.wait(INGEST_RETRY_DELAY)
+                self.camera.reconnect()
+        logger.debug("Card ingester stopped, %u files pending", len(self.pending))
+
+    def _ingestNewFiles(self) -> None:
+        """
+        _ingestNewFiles : Waits for new card files, and lists the whole card if
+        needed, then ingests the pending files by batches of INGEST_BATCH_SIZE.
+        """
+        photoFolder = PhotoManager.getPhotoFolder()
+        if photoFolder != self._manifestFolder:
+            self._loadManifest(photoFolder)
+
+        # The card is listed without the lock, prepare doesn't wait for the USB
+        if self._rescan:
+            self._rescan = False
+            cardFiles = self.camera.listCardFiles()
+            with self._manifestLock:
+                self._addPending(cardFiles)
+
+        newFiles = self.camera.waitForCardFiles(INGEST_EVENT_TIMEOUT)
+        with self._manifestLock:
+            self._addPending(newFiles)
+
+        # The pending files and the manifest are only accessed with its lock held
+        while not self._stopEvent.is_set():
+            with self._manifestLock:
+                if photoFolder != self._manifestFolder or not self.pending:
+                    return
+                batch = self.pending[:INGEST_BATCH_SIZE]
+
+            try:
+                for folder, name in batch:
+                    key = self._getKey(folder, name)
+                    try:
+                        filepath = self.camera.ingestCardFile(folder, name, photoFolder)
+                    except Exception as err:
+                        if not self._giveUp(key, err):
+                            raise
+                        filepath = None
+
+                    with self._manifestLock:
+                        if photoFolder != self._manifestFolder:
+                            return
+                        if (folder, name) in self.pending:
+                            self.pending.remove((folder, name))
+                        self._attempts.pop(key, None)
+                        if filepath is None:
+                            self._failed.add(key)
+                        else:
+                            self._ingested.add(key)
+
+                    if filepath is None:
+                        self.ingestFailed.emit(f"Photo {key} could not be ingested")
+                        continue
+
+                    logger.debug("Ingested %s/%s to %s", folder, name, filepath)
+                    PhotoManager.addPhoto(filepath)
+                    self.photoIngested.emit(filepath, QImage(filepath))
+            finally:
+                with self._manifestLock:
+                    if photoFolder == self._manifestFolder:
+                        self._saveManifest()
+
+    def _giveUp(self, key: str, error: Exception) -> bool:
+        """
+        _giveUp : Counts a failed ingestion of a card file
+
+        Args:
+            key (str): Card file key
+            error (Exception): Ingestion error
+
+        Returns:
+            bool: True if the file failed INGEST_MAX_ATTEMPTS times and must be
+            skipped, False if it must be retried
+        """
+        with self._manifestLock:
+            attempts = self._attempts.get(key, 0) + 1
+            self._attempts[key] = attempts
+        if attempts < INGEST_MAX_ATTEMPTS:
+            return False
+
+        logger.error(
+            "Could not ingest card file %s after %u attempts, skipping it: %s",
+            key, attempts, error
+        )
+        return True
+
+    def _addPending(self, cardFiles: list[tuple[str, str]]) -> None:
+        for folder, name in cardFiles:
+            key = self._getKey(folder, name)
+            if key not in self._ingested and key not in self._failed and \
+                    (folder, name) not in self.pending:
+                self.pending.append((folder, name))
+
+    @staticmethod
+    def _getKey(folder: str, name: str) -> str:
+        return f"{folder.rstrip('/')}/{name}"
+
+    def _loadManifest(self, photoFolder: str) -> None:
+        """
+        _loadManifest : Loads the manifest of the given photo folder, or creates it
+        with the files currently on the card, then wakes up prepare. Called from the
+        worker thread only, the card is listed without the manifest lock held.
+
+        Args:
+            photoFolder (str): Photo folder
+        """
+        created = False
+        try:
+            manifestPath = photoFolder + self.camera.suffixed(INGEST_MANIFEST)
+            with open(manifestPath, "rt", encoding=ENCODING) as file:
+                manifest = json.load(file)
+            if isinstance(manifest, list):
+                # Manifest written before the failed files were recorded
+                manifest = {"ingested": manifest}
+            ingested = set(manifest.get("ingested", []))
+            failed = set(manifest.get("failed", []))
+            logger.info(
+                "Resuming card ingestion, %u files already ingested, %u failed",
+                len(ingested), len(failed)
+            )
+        except FileNotFoundError:
+            ingested = {
+                self._getKey(folder, name)
+                for folder, name in self.camera.listCardFiles()
+            }
+            failed = set()
+            created = True
+            logger.info(
+                "New card ingestion manifest, skipping %u existing files",
+                len(ingested)
+            )
+
+        with self._manifestLock:
+            self._ingested = ingested
+            self._failed = failed
+            self._manifestFolder = photoFolder
+            self.pending = []
+            self._attempts = {}
+            self._rescan = True
+            if created:
+                self._saveManifest()
+
+        with self._manifestLoaded:
+            self._manifestLoaded.notify_all()
+
+    def _saveManifest(self) -> None:
+        """
+        _saveManifest : Writes the manifest atomically, so that a crash never leaves
+        a truncated manifest, see writeJsonFile. Not delayed, files ingested but
+        missing from the manifest would be ingested twice. Called with the manifest
+        lock held.
+        """
+        manifestPath = self._manifestFolder + self.camera.suffixed(INGEST_MANIFEST)
+        writeJsonFile(
+            manifestPath,
+            {"ingested": sorted(self._ingested), "failed": sorted(self._failed)}
+        )
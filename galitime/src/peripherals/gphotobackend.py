@@ -0,0 +1,187 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module implementing the camera backend with the gphoto2 library and the gphoto2
+command line tool
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import os
+import subprocess
+from typing import Callable, TextIO
+
+import gphoto2 as gp
+
+from .camerabackend import CameraBackend, CameraError, CameraFilePath, CameraSession
+from .camerabackend import EVENT_FILE_ADDED, EVENT_OTHER, EVENT_TIMEOUT
+
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+
+def convertErrors(func: Callable) -> Callable:
+    """
+    convertErrors : Decorator raising gphoto2 errors as CameraError
+
+    Args:
+        func (callable): function to be encapsulated
+
+    Returns:
+        callable: encapsulated function
+    """
+
+    @functools.wraps(func)
+    def encapsulated(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except gp.GPhoto2Error as err:
+            raise CameraError(str(err)) from err
+
+    return encapsulated
+
+
+class GphotoSession(CameraSession):
+    """
+    GphotoSession : Camera session over gphoto2.Camera
+    """
+
+    INFO_FUNCTIONS = {
+        "abilities": "get_abilities",
+        "about": "get_about",
+        "config": "get_config",
+        "configlist": "list_config",
+        "manual": "get_manual",
+        "portinfo": "get_port_info",
+        "simpleconfig": "get_simple_config",
+        "storageinfo": "get_storageinfo",
+        "summary": "get_summary",
+    }
+
+    def __init__(self, port: str | None = None) -> None:
+        self.port = port
+        self.camera = gp.Camera()
+
+    @convertErrors
+    def init(self) -> None:
+        if self.port is not None:
+            self._bindPort()
+        self.camera.init()
+
+    def _bindPort(self) -> None:
+        """
+        _bindPort : Binds the session to its port, looked up again at each
+        connection since the port list changes when cameras are plugged.
+        """
+        portInfoList = gp.PortInfoList()
+        portInfoList.load()
+        portIndex = portInfoList.lookup_path(self.port)
+        self.camera.set_port_info(portInfoList[portIndex])
+
+        # Sets the model too, sparing the detection of the other cameras
+        for name, port in gp.Camera.autodetect():
+            if port == self.port:
+                abilitiesList = gp.CameraAbilitiesList()
+                abilitiesList.load()
+                modelIndex = abilitiesList.lookup_model(name)
+                self.camera.set_abilities(abilitiesList[modelIndex])
+                return
+        raise CameraError(f"No camera detected on port {self.port}")
+
+    @convertErrors
+    def exit(self) -> None:
+        self.camera.exit()
+
+    @convertErrors
+    def capture(self) -> CameraFilePath:
+        photoPath = self.camera.capture(gp.GP_CAPTURE_IMAGE)
+        return CameraFilePath(photoPath.folder, photoPath.name)
+
+    @convertErrors
+    def triggerCapture(self) -> None:
+        self.camera.trigger_capture()
+
+    @convertErrors
+    def capturePreview(self) -> bytes:
+        cameraFile = self.camera.capture_preview()
+        return bytes(memoryview(cameraFile.get_data_and_size()))
+
+    @convertErrors
+    def readFile(self, folder: str, name: str, thumbnail: bool = False) -> bytes:
+        fileType = gp.GP_FILE_TYPE_PREVIEW if thumbnail else gp.GP_FILE_TYPE_NORMAL
+        cameraFile = self.camera.file_get(folder, name, fileType)
+        return bytes(memoryview(cameraFile.get_data_and_size()))
+
+    @convertErrors
+    def listFiles(self, folder: str) -> list[str]:
+        return [name for name, _ in self.camera.folder_list_files(folder)]
+
+    @convertErrors
+    def listFolders(self, folder: str) -> list[str]:
+        return [name for name, _ in self.camera.folder_list_folders(folder)]
+
+    @convertErrors
+    def waitForEvent(self, timeout: int) -> tuple[str, CameraFilePath | None]:
+        eventType, eventData = self.camera.wait_for_event(timeout)
+        if eventType == gp.GP_EVENT_TIMEOUT:
+            return EVENT_TIMEOUT, None
+        if eventType == gp.GP_EVENT_FILE_ADDED:
+            return EVENT_FILE_ADDED, CameraFilePath(eventData.folder, eventData.name)
+        return EVENT_OTHER, None
+
+    @convertErrors
+    def getConfigChoices(self, name: str) -> list[str]:
+        config = self.camera.get_config()
+        return list(config.get_child_by_name(name).get_choices())
+
+    @convertErrors
+    def setConfigValue(self, name: str, value: object) -> None:
+        config = self.camera.get_config()
+        config.get_child_by_name(name).set_value(value)
+        self.camera.set_config(config)
+
+    @convertErrors
+    def getInfo(self, name: str) -> object:
+        return getattr(self.camera, self.INFO_FUNCTIONS[name])()
+
+
+class GphotoBackend(CameraBackend):
+    """
+    GphotoBackend : Backend for the cameras supported by gphoto2, the liveview is
+    streamed by the gphoto2 command line tool.
+    """
+
+    def createSession(self, port: str | None = None) -> GphotoSession:
+        return GphotoSession(port)
+
+    @convertErrors
+    def autodetect(self) -> tuple:
+        return tuple(gp.Camera.autodetect())
+
+    def spawnLiveview(
+        self, outputPath: str | None, logfile: TextIO, port: str | None = None
+    ) -> subprocess.Popen:
+        command = ["gphoto2", "--capture-movie"]
+        if port is not None:
+            command += ["--port", port]
+
+        if outputPath is None:
+            return subprocess.Popen(
+                command + ["--stdout"],
+                stderr=logfile,
+                stdout=subprocess.PIPE, )
+
+        # gphoto2 always names the movie file movie.mjpg
+        return subprocess.Popen(
+            command + ["--force-overwrite"],
+            stderr=subprocess.STDOUT,
+            stdout=logfile,
+            cwd=os.path.dirname(outputPath), )
+
+    def clearProcesses(self) -> bool:
+        completedProcess = subprocess.run(["pkill", "gphoto2"], check=False)
+        return completedProcess.returncode == 0
@@ -0,0 +1,74 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module containing the in-process liveview reader, pulling preview frames from an
+opened camera session
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable
+
+from ..utilities.constants import LIVEVIEW_ERROR_DELAY, LIVEVIEW_MAX_ERRORS
+
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+
+class CapturePreviewReader(threading.Thread):
+    """
+    CapturePreviewReader : Thread repeatedly calling a frame capture function
+    (such as gphoto2 Camera.capture_preview) and passing each frame to a callback
+    with its time.monotonic() reception timestamp. The thread stops by itself after
+    LIVEVIEW_MAX_ERRORS consecutive capture errors.
+    """
+
+    def __init__(
+        self,
+        captureFunction: Callable[[], bytes],
+        frameCallback: Callable[[bytes, float], None]
+    ) -> None:
+        super().__init__(name="CapturePreviewReader", daemon=True)
+        self.captureFunction = captureFunction
+        self.frameCallback = frameCallback
+        self.frameCount = 0
+        self.lastFrameTime = None
+
+        self._running = True
+
+    def stop(self) -> None:
+        """
+        stop : Asks the reader to stop, the thread exits after the current capture.
+        """
+        self._running = False
+
+    def run(self) -> None:
+        logger.debug("Capture preview reader started")
+        errorCount = 0
+
+        while self._running:
+            try:
+                frame = self.captureFunction()
+            except Exception as err:
+                errorCount += 1
+                logger.warning(
+                    "Preview capture error (%u/%u): %s",
+                    errorCount, LIVEVIEW_MAX_ERRORS, err
+                )
+                if errorCount >= LIVEVIEW_MAX_ERRORS:
+                    logger.error("Too many preview capture errors, stopping reader")
+                    break
+                time.sleep(LIVEVIEW_ERROR_DELAY)
+                continue
+
+            errorCount = 0
+            self.frameCount += 1
+            self.lastFrameTime = time.monotonic()
+            self.frameCallback(frame, self.lastFrameTime)
+
+        logger.debug("Capture preview reader stopped after %u frames", self.frameCount)
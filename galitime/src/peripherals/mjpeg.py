@@ -0,0 +1,255 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module containing MJPEG parsing helpers used to extract jpeg frames from the
+camera liveview output
+"""
+
+from __future__ import annotations
+
+import collections
+import logging
+import mmap
+import os
+import threading
+import time
+from typing import BinaryIO, Callable
+
+from ..utilities.constants import FRAME_BUFFER_SIZE, FRAME_INDEX_SIZE
+from ..utilities.constants import MAX_PENDING_SIZE, STREAM_CHUNK_SIZE
+from ..utilities.constants import START_BYTES, STOP_BYTES
+
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+
+class MjpegStreamReader(threading.Thread):
+    """
+    MjpegStreamReader : Thread reading a MJPEG byte stream (such as the stdout of
+    'gphoto2 --capture-movie --stdout') and keeping the last complete jpeg frames
+    in a small bounded ring buffer. An optional callback is called from the reader
+    thread with each new frame and its time.monotonic() reception timestamp.
+    """
+
+    def __init__(
+        self,
+        stream: BinaryIO,
+        bufferSize: int = FRAME_BUFFER_SIZE,
+        frameCallback: Callable[[bytes, float], None] = None
+    ) -> None:
+        super().__init__(name="MjpegStreamReader", daemon=True)
+        self.stream = stream
+        self.frameCallback = frameCallback
+        self.frames = collections.deque(maxlen=bufferSize)
+        self.frameCount = 0
+        self.lastFrameTime = None
+
+        self._pending = bytearray()
+        self._scanOffset = 0
+        self._running = True
+
+    def getLastFrame(self) -> bytes | None:
+        """
+        getLastFrame : Returns the newest complete frame read from the stream
+
+        Returns:
+            bytes | None: Last complete jpeg frame, None if no frame was read yet
+        """
+        try:
+            return self.frames[-1]
+        except IndexError:
+            return None
+
+    def stop(self) -> None:
+        """
+        stop : Asks the reader to stop, the thread exits on the next read or when
+        the stream reaches EOF.
+        """
+        self._running = False
+
+    def run(self) -> None:
+        logger.debug("MJPEG stream reader started")
+        while self._running:
+            chunk = self.stream.read1(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            self._pending += chunk
+            self._extractFrames()
+        logger.debug("MJPEG stream reader stopped after %u frames", self.frameCount)
+
+    def _extractFrames(self) -> None:
+        """
+        _extractFrames : Moves every complete frame of the pending buffer into the
+        ring buffer. Bytes preceding a frame start are discarded and the search for
+        the frame end resumes where the previous call stopped. A frame without end
+        after MAX_PENDING_SIZE bytes is dropped, the reader resynchronises on the
+        next frame start.
+        """
+        while True:
+            start = self._pending.find(START_BYTES)
+            if start < 0:
+                # Keeping a possibly truncated start marker
+                del self._pending[:-len(START_BYTES)]
+                self._scanOffset = 0
+                return
+
+            if start > 0:
+                del self._pending[:start]
+                self._scanOffset = max(0, self._scanOffset - start)
+
+            end = self._pending.find(
+                STOP_BYTES, max(len(START_BYTES), self._scanOffset)
+            )
+            if end < 0 and len(self._pending) > MAX_PENDING_SIZE:
+                logger.warning(
+                    "No frame end in %u bytes, dropping the frame", len(self._pending)
+                )
+                nextStart = self._pending.find(START_BYTES, len(START_BYTES))
+                del self._pending[:nextStart if nextStart > 0 else len(START_BYTES)]
+                self._scanOffset = 0
+                continue
+            if end < 0:
+                # Marker may be split between two chunks
+                self._scanOffset = max(0, len(self._pending) - len(STOP_BYTES) + 1)
+                return
+
+            end += len(STOP_BYTES)
+            frame = bytes(self._pending[:end])
+            self.frames.append(frame)
+            self.frameCount += 1
+            self.lastFrameTime = time.monotonic()
+            if self.frameCallback is not None:
+                self.frameCallback(frame, self.lastFrameTime)
+
+            del self._pending[:end]
+            self._scanOffset = 0
+
+
+class MjpegFileExtractor:
+    """
+    MjpegFileExtractor : Incremental jpeg frame extractor for a growing MJPEG file.
+    The last parsed offset is remembered so that only newly appended bytes are
+    scanned, through a read-only mmap of the file, and the boundaries of the last
+    parsed frames are kept in an index.
+    """
+
+    def __init__(self, filepath: str, indexSize: int = FRAME_INDEX_SIZE) -> None:
+        self.filepath = filepath
+        self.frameIndex = collections.deque(maxlen=indexSize)
+        self.frameCount = 0
+
+        self._file: BinaryIO = None
+        self._parsedSize = 0
+        self._scanOffset = 0
+        self._frameStart = None
+
+    def reset(self) -> None:
+        """
+        reset : Forgets every parsed offset and frame boundary, the file will be
+        parsed from the beginning on next read.
+        """
+        self.frameIndex.clear()
+        self._parsedSize = 0
+        self._scanOffset = 0
+        self._frameStart = None
+
+    def close(self) -> None:
+        """
+        close : Closes the underlying file
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.reset()
+
+    def _openFile(self) -> bool:
+        """
+        _openFile : Opens the movie file, reopening it if it was replaced on disk
+        since the last read.
+
+        Returns:
+            bool: True if the file is opened, False if it doesn't exist
+        """
+        try:
+            diskInode = os.stat(self.filepath).st_ino
+        except FileNotFoundError:
+            self.close()
+            return False
+
+        if self._file is not None:
+            if os.fstat(self._file.fileno()).st_ino == diskInode:
+                return True
+            logger.debug("Movie file %s was replaced, reopening it", self.filepath)
+            self.close()
+
+        self._file = open(self.filepath, "br")
+        return True
+
+    def readNewFrame(self) -> bytes | None:
+        """
+        readNewFrame : Scans the bytes appended since the last call and returns the
+        newest complete frame found in them.
+
+        Returns:
+            bytes | None: Newest complete jpeg frame, None if no new frame was
+            appended
+        """
+        if not self._openFile():
+            return None
+
+        filesize = os.fstat(self._file.fileno()).st_size
+        if filesize < self._parsedSize:
+            logger.debug("Movie file %s was truncated", self.filepath)
+            self.reset()
+        if filesize == self._parsedSize:
+            return None
+
+        with mmap.mmap(self._file.fileno(), filesize, access=mmap.ACCESS_READ) as mm:
+            newFrames = self._scan(mm, filesize)
+            self._parsedSize = filesize
+            if newFrames == 0:
+                return None
+
+            start, end = self.frameIndex[-1]
+            with memoryview(mm) as view:
+                return view[start:end].tobytes()
+
+    def _scan(self, mm: mmap.mmap, filesize: int) -> int:
+        """
+        _scan : Indexes the frames completed between the last parsed offset and the
+        end of the file.
+
+        Args:
+            mm (mmap.mmap): Mapped movie file
+            filesize (int): Mapped size
+
+        Returns:
+            int: Number of completed frames found
+        """
+        newFrames = 0
+        position = self._scanOffset
+
+        while True:
+            if self._frameStart is None:
+                start = mm.find(START_BYTES, position, filesize)
+                if start < 0:
+                    # Marker may be split with the next append
+                    self._scanOffset = max(position, filesize - len(START_BYTES) + 1)
+                    return newFrames
+                self._frameStart = start
+                position = start + len(START_BYTES)
+
+            end = mm.find(STOP_BYTES, position, filesize)
+            if end < 0:
+                self._scanOffset = max(position, filesize - len(STOP_BYTES) + 1)
+                return newFrames
+
+            end += len(STOP_BYTES)
+            self.frameIndex.append((self._frameStart, end))
+            self.frameCount += 1
+            newFrames += 1
+
+            self._frameStart = None
+            position = end
@@ -0,0 +1,91 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module containing the photo downloader, retrieving captured photos from the camera
+outside of the GUI thread
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import queue
+from typing import Callable
+
+from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtGui import QImage
+
+from ..managers.photomanager import PhotoManager
+
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+
+class PhotoDownloader(QThread):
+    """
+    PhotoDownloader : Worker thread downloading captured photos one after the
+    other, saving them to disk and decoding them. Each download job gets an id
+    returned by download, and emitted back with the result.
+    """
+
+    photoDownloaded = pyqtSignal(int, str, QImage)
+    downloadFailed = pyqtSignal(int, str)
+
+    def __init__(self, downloadFunction: Callable[[object, str], str]) -> None:
+        """
+        Args:
+            downloadFunction (Callable[[object, str], str]): Function downloading
+            the given camera file path to the given folder and returning the saved
+            file path
+        """
+        super().__init__()
+        self.setObjectName("PhotoDownloader")
+
+        self.downloadFunction = downloadFunction
+        self._jobs = queue.Queue()
+        self._jobIds = itertools.count(1)
+
+    def download(self, cameraFilePath: object, saveFolder: str) -> int:
+        """
+        download : Queues a photo download
+
+        Args:
+            cameraFilePath (object): Camera file path returned by the capture
+            saveFolder (str): Folder where the photo is saved
+
+        Returns:
+            int: Download job id
+        """
+        jobId = next(self._jobIds)
+        self._jobs.put((jobId, cameraFilePath, saveFolder))
+        return jobId
+
+    def stop(self) -> None:
+        """
+        stop : Stops the downloader once the queued downloads are done and waits for
+        it to finish.
+        """
+        self._jobs.put(None)
+        self.wait()
+
+    def run(self) -> None:
+        logger.debug("Photo downloader started")
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+
+            jobId, cameraFilePath, saveFolder = job
+            try:
+                filepath = self.downloadFunction(cameraFilePath, saveFolder)
+                image = QImage(filepath)
+            except Exception as err:
+                logger.error("Photo download %u failed: %s", jobId, err)
+                self.downloadFailed.emit(jobId, str(err))
+            else:
+                logger.debug("Photo download %u done: %s", jobId, filepath)
+                PhotoManager.addPhoto(filepath)
+                self.photoDownloaded.emit(jobId, filepath, image)
+        logger.debug("Photo downloader stopped")
@@ -0,0 +1,143 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module containing the preview watchdog, restarting a stalled or exited liveview
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import TYPE_CHECKING
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from ..utilities.constants import PREVIEW_CHECK_INTERVAL, PREVIEW_RESTART_DELAY
+from ..utilities.constants import PREVIEW_RESTART_MAX_DELAY
+
+if TYPE_CHECKING:
+    from .camera import CameraWrapper
+
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+
+class PreviewWatchdog(QObject):
+    """
+    PreviewWatchdog : Checks the camera preview every PREVIEW_CHECK_INTERVAL
+    seconds and restarts it only if no new frame arrived within
+    PREVIEW_STALL_TIMEOUT seconds or if the preview process exited, see
+    CameraWrapper.getRestartReason.
+
+    Consecutive restarts are spaced by an exponential backoff, starting at
+    PREVIEW_RESTART_DELAY seconds and capped at PREVIEW_RESTART_MAX_DELAY, so that
+    an unplugged camera isn't hammered. The preview is considered recovered once a
+    new frame arrives after a restart, the time elapsed since the stall was
+    detected is then logged and added to the preview metrics.
+    """
+
+    restarted = pyqtSignal(str, int)
+    recovered = pyqtSignal(float)
+
+    def __init__(self, camera: CameraWrapper) -> None:
+        """
+        Args:
+            camera (CameraWrapper): Watched camera
+        """
+        super().__init__()
+        self.camera = camera
+
+        self.timer = QTimer()
+        self.timer.timeout.connect(self._check)
+
+        self.stallTime = None
+        self.restartCount = 0
+        self.nextRestartTime = 0.0
+        self.restartFrameCount = 0
+
+    def start(self) -> None:
+        """
+        start : Starts watching a new preview session
+        """
+        self._resetBackoff()
+        self.timer.start(PREVIEW_CHECK_INTERVAL * 1000)
+
+    def stop(self) -> None:
+        """
+        stop : Stops watching the preview
+        """
+        self.timer.stop()
+        if self.stallTime is not None:
+            logger.warning(
+                "Preview stopped %.1f s after stalling, before recovering",
+                time.monotonic() - self.stallTime
+            )
+        self._resetBackoff()
+
+    def getRestartDelay(self) -> float:
+        """
+        getRestartDelay : Returns the minimum delay before the next restart
+
+        Returns:
+            float: Delay in seconds
+        """
+        if self.restartCount == 0:
+            return 0.0
+        return min(
+            PREVIEW_RESTART_MAX_DELAY,
+            PREVIEW_RESTART_DELAY * 2 ** (self.restartCount - 1)
+        )
+
+    def _resetBackoff(self) -> None:
+        self.stallTime = None
+        self.restartCount = 0
+        self.nextRestartTime = 0.0
+
+    def _check(self) -> None:
+        """
+        _check : Watchdog timer callback, detects stalls and recoveries and
+        restarts the preview once the backoff delay elapsed.
+        """
+        now = time.monotonic()
+        reason = self.camera.getRestartReason()
+
+        if reason is None:
+            if self.stallTime is not None and \
+                    self.camera.getFrameCount() > self.restartFrameCount:
+                self._onRecovered(now - self.stallTime)
+            return
+
+        if self.stallTime is None:
+            self.stallTime = now
+            logger.warning("Preview stalled: %s", reason)
+
+        if now < self.nextRestartTime:
+            return
+
+        self.restartCount += 1
+        self.nextRestartTime = now + self.getRestartDelay()
+        self.restartFrameCount = self.camera.getFrameCount()
+
+        logger.warning(
+            "Restarting preview (attempt %u, next attempt in %.0f s at the earliest)"
+            ": %s", self.restartCount, self.getRestartDelay(), reason
+        )
+        self.camera.restartPreview()
+        self.restarted.emit(reason, self.restartCount)
+
+    def _onRecovered(self, recoveryTime: float) -> None:
+        """
+        _onRecovered : Reports a preview recovery and resets the backoff
+
+        Args:
+            recoveryTime (float): Time elapsed since the stall detection in seconds
+        """
+        logger.info(
+            "Preview recovered in %.2f s after %u restart(s)",
+            recoveryTime, self.restartCount
+        )
+        self.camera.metrics.addRecovery(recoveryTime)
+        self._resetBackoff()
+        self.recovered.emit(recoveryTime)
@@ -0,0 +1,458 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module implementing a simulated camera backend, needing no camera, used to
+benchmark the application on any computer. The liveview process is this module
+run with 'python3 -m', streaming a recorded or synthetic MJPEG.
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import glob
+import logging
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import types
+from typing import TextIO
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QRect, QSize
+from PyQt5.QtGui import QColor, QImage, QImageReader, QPainter
+
+from .camerabackend import CameraBackend, CameraError, CameraFilePath, CameraSession
+from .camerabackend import EVENT_FILE_ADDED, EVENT_TIMEOUT, INFO_NAMES
+from ..utilities.constants import SIMULATED_CAMERAS, SIMULATED_CAPTURE_LATENCY
+from ..utilities.constants import SIMULATED_ERROR_RATE
+from ..utilities.constants import SIMULATED_DOWNLOAD_LATENCY, SIMULATED_FPS
+from ..utilities.constants import SIMULATED_PHOTO_FOLDER, SIMULATED_RESOLUTION
+from ..utilities.constants import SIMULATED_SOURCE, START_BYTES, STOP_BYTES
+
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+CARD_FOLDER = "/store_00010001/DCIM/100SIMUL"
+PHOTO_SIZE = (3000, 2000)  # pixels, synthetic photos
+THUMBNAIL_SIZE = (160, 120)  # pixels
+SYNTHETIC_FRAMES = 60  # frames looped by the synthetic liveview
+
+
+def encodeJpeg(image: QImage, quality: int = 85) -> bytes:
+    """
+    encodeJpeg : Encodes an image to jpeg
+
+    Args:
+        image (QImage): Image to encode
+        quality (int, optional): Jpeg quality. Defaults to 85.
+
+    Returns:
+        bytes: Jpeg data
+    """
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "JPG", quality)
+    return bytes(data)
+
+
+def renderSyntheticFrame(width: int, height: int, index: int, count: int) -> bytes:
+    """
+    renderSyntheticFrame : Renders a liveview like frame, a gradient with a bar
+    moving along with the frame index so that consecutive frames differ.
+
+    Args:
+        width (int): Frame width
+        height (int): Frame height
+        index (int): Frame index
+        count (int): Number of frames in the loop
+
+    Returns:
+        bytes: Jpeg frame
+    """
+    image = QImage(width, height, QImage.Format_RGB32)
+    image.fill(QColor(40, 40, 60))
+
+    painter = QPainter(image)
+    bands = 16
+    for band in range(bands):
+        shade = 40 + band * 180 // bands
+        painter.fillRect(
+            QRect(0, band * height // bands, width, height // bands + 1),
+            QColor(shade, shade // 2, 255 - shade)
+        )
+    barWidth = max(1, width // 10)
+    painter.fillRect(
+        QRect(index * (width - barWidth) // max(1, count - 1), 0, barWidth, height),
+        QColor(255, 255, 255)
+    )
+    painter.end()
+    return encodeJpeg(image)
+
+
+def loadFrames(source: str | None, resolution: tuple[int, int]) -> list[bytes]:
+    """
+    loadFrames : Loads the liveview frames, from a recorded MJPEG file if given,
+    synthetic ones otherwise
+
+    Args:
+        source (str | None): Recorded MJPEG filepath
+        resolution (tuple[int, int]): Synthetic frames width and height
+
+    Returns:
+        list[bytes]: Jpeg frames, looped by the liveview
+    """
+    if source is None:
+        return [
+            renderSyntheticFrame(*resolution, index, SYNTHETIC_FRAMES)
+            for index in range(SYNTHETIC_FRAMES)
+        ]
+
+    with open(source, "rb") as file:
+        data = file.read()
+
+    frames = []
+    start = data.find(START_BYTES)
+    while start >= 0:
+        end = data.find(STOP_BYTES, start + len(START_BYTES))
+        if end < 0:
+            break
+        end += len(STOP_BYTES)
+        frames.append(data[start:end])
+        start = data.find(START_BYTES, end)
+
+    if not frames:
+        raise CameraError(f"No jpeg frame found in {source}")
+    return frames
+
+
+class SimulatedSession(CameraSession):
+    """
+    SimulatedSession : Simulated camera session. Captured photos are taken in turn
+    from the jpeg files of a folder, or synthetic, and kept on a simulated memory
+    card. Captures and downloads wait for the configured latencies and every call
+    fails with the configured error rate.
+    """
+
+    def __init__(self, backend: SimulatedBackend, port: str | None = None) -> None:
+        self.backend = backend
+        self.port = port
+        self.connected = False
+        self.config = {"capturetarget": "Internal RAM", "viewfinder": 0}
+
+        self.card: dict[CameraFilePath, str | None] = {}
+        self.photoCount = 0
+        self.events = collections.deque()
+
+        self._frames = None
+        self._frameIndex = 0
+        self._nextFrameTime = 0.0
+
+    def _simulate(self, latency: float = 0.0) -> None:
+        """
+        _simulate : Waits for the given latency then fails randomly with the
+        backend error rate
+
+        Args:
+            latency (float, optional): Latency in seconds. Defaults to 0.0.
+        """
+        if latency > 0:
+            time.sleep(latency)
+        if random.random() < self.backend.errorRate:
+            raise CameraError("Simulated camera error")
+
+    def _storePhoto(self) -> CameraFilePath:
+        self.photoCount += 1
+        photos = self.backend.getPhotos()
+        source = photos[(self.photoCount - 1) % len(photos)] if photos else None
+
+        photoPath = CameraFilePath(CARD_FOLDER, f"IMG_{self.photoCount:04d}.JPG")
+        self.card[photoPath] = source
+        return photoPath
+
+    def init(self) -> None:
+        self._simulate()
+        if self.port is not None and \
+                self.port not in (port for _, port in self.backend.autodetect()):
+            raise CameraError(f"No camera detected on port {self.port}")
+        self.connected = True
+
+    def exit(self) -> None:
+        self.connected = False
+
+    def capture(self) -> CameraFilePath:
+        self._simulate(self.backend.captureLatency)
+        return self._storePhoto()
+
+    def triggerCapture(self) -> None:
+        self._simulate()
+        # The photo is reported once written to the card
+        self.events.append(
+            (time.monotonic() + self.backend.captureLatency, self._storePhoto())
+        )
+
+    def capturePreview(self) -> bytes:
+        if self._frames is None:
+            self._frames = self.backend.getFrames()
+
+        # Pacing frames at the backend frame rate
+        now = time.monotonic()
+        if self._nextFrameTime > now:
+            time.sleep(self._nextFrameTime - now)
+        self._nextFrameTime = max(now, self._nextFrameTime) + 1 / self.backend.fps
+
+        self._simulate()
+        frame = self._frames[self._frameIndex % len(self._frames)]
+        self._frameIndex += 1
+        return frame
+
+    def readFile(self, folder: str, name: str, thumbnail: bool = False) -> bytes:
+        photoPath = CameraFilePath(folder, name)
+        if photoPath not in self.card:
+            raise CameraError(f"No file {folder}/{name} on the simulated card")
+
+        if thumbnail:
+            self._simulate()
+            return self.backend.readPhoto(self.card[photoPath], QSize(*THUMBNAIL_SIZE))
+
+        self._simulate(self.backend.downloadLatency)
+        return self.backend.readPhoto(self.card[photoPath])
+
+    def listFiles(self, folder: str) -> list[str]:
+        self._simulate()
+        return sorted(path.name for path in self.card if path.folder == folder)
+
+    def listFolders(self, folder: str) -> list[str]:
+        self._simulate()
+        prefix = folder.rstrip("/") + "/"
+        if not CARD_FOLDER.startswith(prefix):
+            return []
+        return [CARD_FOLDER[len(prefix):].split("/")[0]]
+
+    def waitForEvent(self, timeout: int) -> tuple[str, CameraFilePath | None]:
+        self._simulate()
+        deadline = time.monotonic() + timeout / 1000
+        if self.events:
+            readyTime, photoPath = self.events[0]
+            if readyTime <= deadline:
+                time.sleep(max(0.0, readyTime - time.monotonic()))
+                self.events.popleft()
+                return EVENT_FILE_ADDED, photoPath
+
+        time.sleep(timeout / 1000)
+        return EVENT_TIMEOUT, None
+
+    def getConfigChoices(self, name: str) -> list[str]:
+        self._simulate()
+        if name == "capturetarget":
+            return ["Internal RAM", "Memory card"]
+        raise CameraError(f"No choices for simulated configuration '{name}'")
+
+    def setConfigValue(self, name: str, value: object) -> None:
+        self._simulate()
+        if name not in self.config:
+            raise CameraError(f"No simulated configuration '{name}'")
+        self.config[name] = value
+
+    def getInfo(self, name: str) -> object:
+        if name not in INFO_NAMES:
+            raise CameraError(f"Unknown camera information '{name}'")
+        self._simulate()
+        if name in ("config", "simpleconfig"):
+            return types.SimpleNamespace(**self.config)
+        return types.SimpleNamespace(
+            model="Simulated camera",
+            port="sim:",
+            fps=self.backend.fps,
+            resolution="x".join(map(str, self.backend.resolution)),
+            photos=len(self.card),
+        )
+
+
+class SimulatedBackend(CameraBackend):
+    """
+    SimulatedBackend : Backend simulating a camera. The liveview streams the
+    frames of a recorded MJPEG file, or synthetic frames at the given resolution,
+    at the given frame rate and can be made to stall after a given time to test
+    the preview watchdog.
+    """
+
+    def __init__(
+        self,
+        fps: float = SIMULATED_FPS,
+        resolution: tuple[int, int] = SIMULATED_RESOLUTION,
+        source: str | None = SIMULATED_SOURCE,
+        photoFolder: str | None = SIMULATED_PHOTO_FOLDER,
+        captureLatency: float = SIMULATED_CAPTURE_LATENCY,
+        downloadLatency: float = SIMULATED_DOWNLOAD_LATENCY,
+        errorRate: float = SIMULATED_ERROR_RATE,
+        stallAfter: float | None = None,
+        cameras: int = SIMULATED_CAMERAS
+    ) -> None:
+        """
+        Args:
+            fps (float, optional): Liveview frame rate. Defaults to SIMULATED_FPS.
+            resolution (tuple[int, int], optional): Synthetic frames size. Defaults
+            to SIMULATED_RESOLUTION.
+            source (str | None, optional): Recorded MJPEG file streamed instead of
+            synthetic frames. Defaults to SIMULATED_SOURCE.
+            photoFolder (str | None, optional): Folder of the jpeg files returned
+            by captures, synthetic photos if None. Defaults to
+            SIMULATED_PHOTO_FOLDER.
+            captureLatency (float, optional): Capture duration in seconds. Defaults
+            to SIMULATED_CAPTURE_LATENCY.
+            downloadLatency (float, optional): Photo download duration in seconds.
+            Defaults to SIMULATED_DOWNLOAD_LATENCY.
+            errorRate (float, optional): Probability for each session call to
+            fail. Defaults to SIMULATED_ERROR_RATE.
+            stallAfter (float | None, optional): Time in seconds after which the
+            liveview process stops sending frames, never if None. Defaults to None.
+            cameras (int, optional): Number of simulated cameras, on ports "sim:1",
+            "sim:2"... Defaults to SIMULATED_CAMERAS.
+        """
+        self.fps = fps
+        self.resolution = resolution
+        self.source = source
+        self.photoFolder = photoFolder
+        self.captureLatency = captureLatency
+        self.downloadLatency = downloadLatency
+        self.errorRate = errorRate
+        self.stallAfter = stallAfter
+        self.cameras = cameras
+
+        self._frames = None
+        self._syntheticPhoto = None
+        self._lock = threading.Lock()
+
+    def getFrames(self) -> list[bytes]:
+        """
+        getFrames : Returns the liveview frames, loaded once
+
+        Returns:
+            list[bytes]: Jpeg frames
+        """
+        with self._lock:
+            if self._frames is None:
+                self._frames = loadFrames(self.source, self.resolution)
+            return self._frames
+
+    def getPhotos(self) -> list[str]:
+        """
+        getPhotos : Returns the jpeg files of the photo folder
+
+        Returns:
+            list[str]: Jpeg filepaths, empty for synthetic photos
+        """
+        if self.photoFolder is None:
+            return []
+        return sorted(
+            glob.glob(os.path.join(self.photoFolder, "*.jpg"))
+            + glob.glob(os.path.join(self.photoFolder, "*.jpeg"))
+            + glob.glob(os.path.join(self.photoFolder, "*.JPG"))
+        )
+
+    def readPhoto(self, filepath: str | None, size: QSize = None) -> bytes:
+        """
+        readPhoto : Returns the content of a simulated photo
+
+        Args:
+            filepath (str | None): Jpeg filepath, None for a synthetic photo
+            size (QSize, optional): Size of the returned image, full size if None.
+            Defaults to None.
+
+        Returns:
+            bytes: Jpeg data
+        """
+        if filepath is None:
+            with self._lock:
+                if self._syntheticPhoto is None:
+                    self._syntheticPhoto = renderSyntheticFrame(*PHOTO_SIZE, 0, 1)
+                data = self._syntheticPhoto
+            if size is None:
+                return data
+            return encodeJpeg(QImage.fromData(data).scaled(size))
+
+        if size is None:
+            with open(filepath, "rb") as file:
+                return file.read()
+        reader = QImageReader(filepath)
+        reader.setScaledSize(size)
+        return encodeJpeg(reader.read())
+
+    def createSession(self, port: str | None = None) -> SimulatedSession:
+        return SimulatedSession(self, port)
+
+    def autodetect(self) -> tuple:
+        return tuple(
+            (f"Simulated camera {index}", f"sim:{index}")
+            for index in range(1, self.cameras + 1)
+        )
+
+    def spawnLiveview(
+        self, outputPath: str | None, logfile: TextIO, port: str | None = None
+    ) -> subprocess.Popen:
+        command = [
+            sys.executable, "-m", __name__,
+            "--fps", str(self.fps),
+            "--width", str(self.resolution[0]),
+            "--height", str(self.resolution[1]),
+        ]
+        if self.source is not None:
+            command += ["--source", self.source]
+        if self.stallAfter is not None:
+            command += ["--stall-after", str(self.stallAfter)]
+
+        if outputPath is None:
+            return subprocess.Popen(command, stderr=logfile, stdout=subprocess.PIPE)
+        return subprocess.Popen(
+            command + ["--output", outputPath],
+            stderr=subprocess.STDOUT,
+            stdout=logfile, )
+
+    def clearProcesses(self) -> bool:
+        # Liveview processes are children of the application, always terminated
+        return True
+
+
+def main() -> None:
+    """
+    main : Simulated liveview process, writes MJPEG frames at the requested frame
+    rate to the output file or stdout until killed
+    """
+    parser = argparse.ArgumentParser(description="Simulated camera liveview")
+    parser.add_argument("--fps", type=float, default=SIMULATED_FPS)
+    parser.add_argument("--width", type=int, default=SIMULATED_RESOLUTION[0])
+    parser.add_argument("--height", type=int, default=SIMULATED_RESOLUTION[1])
+    parser.add_argument("--source", default=None)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--stall-after", type=float, default=None)
+    args = parser.parse_args()
+
+    frames = loadFrames(args.source, (args.width, args.height))
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+
+    startTime = time.monotonic()
+    index = 0
+    try:
+        while True:
+            frameTime = startTime + index / args.fps
+            if args.stall_after is not None and \
+                    frameTime - startTime > args.stall_after:
+                # Frozen like a camera stuck in liveview
+                time.sleep(3600)
+            time.sleep(max(0.0, frameTime - time.monotonic()))
+
+            output.write(frames[index % len(frames)])
+            output.flush()
+            index += 1
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
+
+
+if __name__ == "__main__":
+    main()
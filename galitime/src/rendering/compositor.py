@@ -0,0 +1,189 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module compositing layers over full resolution photos with NumPy, tile by tile
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+
+import numpy as np
+from PyQt5.QtCore import QPoint
+from PyQt5.QtGui import QImage
+
+from ..utilities.constants import COMPOSITE_TILE_SIZE
+
+# ---------- LOGGER SETUP ----------
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+
+# ----------------------------------
+
+# QImage 32 bits pixels are native endian 0xAARRGGBB integers
+ALPHA = 3 if sys.byteorder == "little" else 0
+
+
+def imageToArray(image: QImage, readOnly: bool = False) -> np.ndarray:
+    """
+    imageToArray : Returns the pixels of a premultiplied ARGB or RGB32 image as
+    an array sharing its memory, writing to the array modifies the image. The
+    image must be kept alive as long as the array is used.
+
+    Args:
+        image (QImage): Image, in Format_ARGB32_Premultiplied or Format_RGB32
+        readOnly (bool, optional): Returns a read only array, without detaching
+        the image from its implicitly shared copies. Defaults to False.
+
+    Raises:
+        ValueError: The image is in another format
+
+    Returns:
+        np.ndarray: (height, width, 4) uint8 array, in the QImage byte order
+    """
+    if image.format() not in (QImage.Format_ARGB32_Premultiplied, QImage.Format_RGB32):
+        raise ValueError(f"Unsupported image format {image.format()}")
+
+    pointer = image.constBits() if readOnly else image.bits()
+    pointer.setsize(image.sizeInBytes())
+    rows = np.frombuffer(pointer, np.uint8).reshape(
+        image.height(), image.bytesPerLine()
+    )
+    return rows[:, :image.width() * 4].reshape(image.height(), image.width(), 4)
+
+
+def arrayToImage(array: np.ndarray, opaque: bool = True) -> QImage:
+    """
+    arrayToImage : Copies an array of premultiplied pixels into a new image
+
+    Args:
+        array (np.ndarray): (height, width, 4) uint8 array, in the QImage byte
+        order
+        opaque (bool, optional): Creates an RGB32 image, else a premultiplied ARGB
+        one. Defaults to True.
+
+    Returns:
+        QImage: Image
+    """
+    height, width = array.shape[:2]
+    image = QImage(
+        width, height,
+        QImage.Format_RGB32 if opaque else QImage.Format_ARGB32_Premultiplied
+    )
+    imageToArray(image)[:] = array
+    return image
+
+
+def compositeImage(
+    frame: QImage, layers: list[tuple[QImage, QPoint]],
+    tileSize: int = COMPOSITE_TILE_SIZE
+) -> QImage:
+    """
+    compositeImage : Blends layers over a copy of the frame at its resolution,
+    see blendOver. Thread safe.
+
+    Args:
+        frame (QImage): Frame, usually the full resolution photo
+        layers (list[tuple[QImage, QPoint]]): Layers and their position on the
+        frame, from bottom to top
+        tileSize (int, optional): Tile side in pixels. Defaults to
+        COMPOSITE_TILE_SIZE.
+
+    Returns:
+        QImage: Opaque composited image
+    """
+    image = frame.convertToFormat(QImage.Format_RGB32)
+    if image.isNull():
+        return image
+
+    pixels = imageToArray(image)
+    for layer, position in layers:
+        layer = layer.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+        if not layer.isNull():
+            blendOver(
+                pixels, imageToArray(layer, readOnly=True),
+                position.x(), position.y(), tileSize
+            )
+    return image
+
+
+def blendOver(
+    frame: np.ndarray, layer: np.ndarray, x: int = 0, y: int = 0,
+    tileSize: int = COMPOSITE_TILE_SIZE
+) -> None:
+    """
+    blendOver : Blends a premultiplied layer over the frame in place, with the
+    source over operator. The layer is processed in square tiles so that the
+    temporary arrays stay small whatever the photo size, fully transparent tiles
+    are skipped and fully opaque ones copied. Only uses NumPy, so it can run in a
+    worker thread or a process pool.
+
+    Args:
+        frame (np.ndarray): (height, width, 4) uint8 premultiplied frame
+        layer (np.ndarray): (height, width, 4) uint8 premultiplied layer
+        x (int, optional): Layer position on the frame. Defaults to 0.
+        y (int, optional): Layer position on the frame. Defaults to 0.
+        tileSize (int, optional): Tile side in pixels. Defaults to
+        COMPOSITE_TILE_SIZE.
+    """
+    # Clipping the layer to the frame
+    left, top = max(x, 0), max(y, 0)
+    right = min(x + layer.shape[1], frame.shape[1])
+    bottom = min(y + layer.shape[0], frame.shape[0])
+    if left >= right or top >= bottom:
+        return
+
+    for tileTop in range(top, bottom, tileSize):
+        tileBottom = min(tileTop + tileSize, bottom)
+        for tileLeft in range(left, right, tileSize):
+            tileRight = min(tileLeft + tileSize, right)
+
+            source = layer[tileTop - y:tileBottom - y, tileLeft - x:tileRight - x]
+            alpha = source[..., ALPHA]
+            if not alpha.any():
+                continue
+
+            destination = frame[tileTop:tileBottom, tileLeft:tileRight]
+            if alpha.min() == 255:
+                destination[:] = source
+                continue
+            _blendTile(destination, source, alpha)
+
+
+def _blendTile(destination: np.ndarray, source: np.ndarray, alpha: np.ndarray) -> None:
+    """
+    _blendTile : Blends a tile in place, destination = source + destination *
+    (255 - alpha) / 255, rounded like QPainter. Pixels are processed as 32 bits
+    integers, two channels at a time.
+
+    Args:
+        destination (np.ndarray): Frame tile
+        source (np.ndarray): Layer tile
+        alpha (np.ndarray): Layer tile alpha channel
+    """
+    pixels = destination.view(np.uint32)[..., 0]
+    inverse = 255 - alpha.astype(np.uint32)
+
+    blended = None
+    for shift in (0, 8):
+        # Two 8 bits channels in 16 bits lanes, products fit in their lane
+        lanes = pixels >> shift if shift else pixels.copy()
+        lanes &= 0x00FF00FF
+        lanes *= inverse
+        lanes += (lanes >> 8) & 0x00FF00FF
+        lanes += 0x00800080
+        if shift:
+            lanes &= 0xFF00FF00
+            blended |= lanes
+        else:
+            lanes >>= 8
+            lanes &= 0x00FF00FF
+            blended = lanes
+
+    # Premultiplied colors can't overflow, each one is at most its alpha
+    blended += source.view(np.uint32)[..., 0]
+    pixels[:] = blended
@@ -0,0 +1,117 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module containing the decor cache, keeping the decor scaled to the sizes it is
+drawn at
+"""
+
+from __future__ import annotations
+
+import collections
+import logging
+import threading
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+from ..utilities.constants import DECOR_CACHE_SIZE
+
+# ---------- LOGGER SETUP ----------
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+
+# ----------------------------------
+
+
+class DecorCache:
+    """
+    DecorCache : Decor image scaled once per target size and kept in a least
+    recently used cache of DECOR_CACHE_SIZE entries. Images are stored in
+    premultiplied ARGB, the format QPainter blends without conversion, so that
+    drawing the decor over a frame is a plain blend. Thread safe, only QImages are
+    used.
+    """
+
+    def __init__(self, decorFile: str, maxSize: int = DECOR_CACHE_SIZE) -> None:
+        """
+        Args:
+            decorFile (str): Decor image filepath
+            maxSize (int, optional): Number of scaled images kept. Defaults to
+            DECOR_CACHE_SIZE.
+        """
+        self.maxSize = maxSize
+        self.decorFile = None
+        self.source = QImage()
+
+        self._scaled: collections.OrderedDict[tuple[int, int], QImage] = \
+            collections.OrderedDict()
+        self._lock = threading.Lock()
+
+        self.setFile(decorFile)
+
+    def setFile(self, decorFile: str) -> None:
+        """
+        setFile : Loads another decor image, invalidating the scaled images
+
+        Args:
+            decorFile (str): Decor image filepath
+        """
+        source = QImage(decorFile)
+        if source.isNull():
+            logger.warning("Could not load decor %s", decorFile)
+        else:
+            source = source.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+
+        with self._lock:
+            self.decorFile = decorFile
+            self.source = source
+            self._scaled.clear()
+
+    def isNull(self) -> bool:
+        """
+        isNull : Returns True if no decor image is loaded
+
+        Returns:
+            bool: Decor absence
+        """
+        return self.source.isNull()
+
+    def get(self, width: int, height: int) -> QImage:
+        """
+        get : Returns the decor scaled to the given size, scaling it only if it
+        isn't cached yet. The scaling is done without holding the lock, so a slow
+        full resolution scale doesn't block the other threads.
+
+        Args:
+            width (int): Width in pixels
+            height (int): Height in pixels
+
+        Returns:
+            QImage: Premultiplied ARGB decor, null if no decor is loaded
+        """
+        with self._lock:
+            source = self.source
+            if source.isNull():
+                return QImage()
+
+            scaled = self._scaled.get((width, height))
+            if scaled is not None:
+                self._scaled.move_to_end((width, height))
+                return scaled
+
+        scaled = source.scaled(
+            width, height, Qt.IgnoreAspectRatio, Qt.SmoothTransformation
+        ).convertToFormat(QImage.Format_ARGB32_Premultiplied)
+
+        with self._lock:
+            # Not cached if the decor was changed while scaling
+            if self.source is source:
+                self._scaled[(width, height)] = scaled
+                if len(self._scaled) > self.maxSize:
+                    self._scaled.popitem(last=False)
+
+        logger.debug("Decor scaled to %ux%u", width, height)
+        return scaled
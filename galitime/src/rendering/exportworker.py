@@ -0,0 +1,144 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module containing the export worker, rendering and saving images outside of the
+GUI thread
+"""
+
+import itertools
+import logging
+import os
+import queue
+from typing import Callable
+
+from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtGui import QImage, QImageWriter
+
+from ..utilities.constants import EXPORT_JPEG_QUALITY, EXPORT_PROGRESSIVE
+
+# ---------- LOGGER SETUP ----------
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+
+# ----------------------------------
+
+
+class ExportWorker(QThread):
+    """
+    ExportWorker : Worker thread rendering images with the supplied render
+    functions and saving them, one after the other. Render functions run in the
+    worker thread and must only use thread safe classes such as QImage and
+    QPainter on QImages, never QPixmaps. JPEG files are encoded with the
+    configured quality, and progressively if enabled.
+    """
+
+    exported = pyqtSignal(int, str)
+    exportFailed = pyqtSignal(int, str)
+
+    def __init__(
+        self, quality: int = EXPORT_JPEG_QUALITY, progressive: bool = EXPORT_PROGRESSIVE
+    ) -> None:
+        """
+        Args:
+            quality (int, optional): JPEG quality, from 0 to 100. Defaults to
+            EXPORT_JPEG_QUALITY.
+            progressive (bool, optional): Encodes JPEG files progressively.
+            Defaults to EXPORT_PROGRESSIVE.
+        """
+        super().__init__()
+        self.setObjectName("ExportWorker")
+
+        self.quality = quality
+        self.progressive = progressive
+
+        self._jobs = queue.Queue()
+        self._jobIds = itertools.count(1)
+
+    def export(self, renderFunction: Callable[[], QImage], filepath: str) -> int:
+        """
+        export : Queues an export
+
+        Args:
+            renderFunction (Callable[[], QImage]): Function rendering the image
+            filepath (str): Filepath where the image is saved
+
+        Returns:
+            int: Export job id
+        """
+        jobId = next(self._jobIds)
+        self._jobs.put((jobId, renderFunction, filepath))
+        return jobId
+
+    def setQuality(self, quality: int) -> None:
+        """
+        setQuality : Sets the JPEG quality of the next exports
+
+        Args:
+            quality (int): Quality, from 0 to 100
+        """
+        self.quality = max(0, min(100, quality))
+
+    def setProgressive(self, progressive: bool) -> None:
+        """
+        setProgressive : Enables the progressive encoding of the next JPEG exports
+
+        Args:
+            progressive (bool): Progressive encoding
+        """
+        self.progressive = progressive
+
+    def stop(self) -> None:
+        """
+        stop : Stops the worker once the queued exports are done and waits for it
+        to finish.
+        """
+        self._jobs.put(None)
+        self.wait()
+
+    def run(self) -> None:
+        logger.debug("Export worker started")
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+
+            jobId, renderFunction, filepath = job
+            try:
+                image = renderFunction()
+                if os.path.exists(filepath):
+                    os.remove(filepath)
+                self._save(image, filepath)
+            except Exception as err:
+                logger.error("Export %u failed: %s", jobId, err)
+                self.exportFailed.emit(jobId, str(err))
+            else:
+                logger.debug("Export %u done: %s", jobId, filepath)
+                self.exported.emit(jobId, filepath)
+        logger.debug("Export worker stopped")
+
+    def _save(self, image: QImage, filepath: str) -> None:
+        """
+        _save : Encodes and saves an image, the format being deduced from the
+        filepath extension
+
+        Args:
+            image (QImage): Image
+            filepath (str): Filepath
+
+        Raises:
+            OSError: The image couldn't be saved
+        """
+        if image.isNull():
+            raise OSError(f"Nothing to save to {filepath}")
+
+        writer = QImageWriter(filepath)
+        if os.path.splitext(filepath)[1].lower() in (".jpg", ".jpeg"):
+            writer.setQuality(self.quality)
+            writer.setProgressiveScanWrite(self.progressive)
+        if not writer.write(image):
+            raise OSError(
+                f"Could not save image to {filepath}: {writer.errorString()}"
+            )
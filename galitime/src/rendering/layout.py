@@ -0,0 +1,383 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module containing the layout templates, describing multi-photo sheets in json
+files, and the layout renderer composing them
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import logging
+import os
+import threading
+
+from PyQt5.QtCore import QPoint, QRect, QRectF, QSize, Qt
+from PyQt5.QtGui import QColor, QFont, QImage, QImageReader, QPainter
+
+from .decorcache import DecorCache
+from ..utilities.constants import ENCODING, LAYOUT_FOLDER
+
+# ---------- LOGGER SETUP ----------
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+
+# ----------------------------------
+
+CROP_FILL = "fill"  # photo cropped to fill its slot
+CROP_FIT = "fit"  # whole photo, letterboxed in its slot
+
+
+class LayoutError(Exception):
+    """
+    LayoutError : Error raised when a layout template is invalid
+    """
+
+
+def _readRect(value: object, name: str) -> QRect:
+    """
+    _readRect : Reads a [x, y, width, height] rectangle of a template
+
+    Args:
+        value (object): Json value
+        name (str): Value name, for the errors
+
+    Raises:
+        LayoutError: The value isn't a rectangle
+
+    Returns:
+        QRect: Rectangle
+    """
+    if (
+        not isinstance(value, list) or len(value) != 4
+        or not all(isinstance(number, int) for number in value)
+    ):
+        raise LayoutError(f"{name} must be a [x, y, width, height] list of integers")
+    rect = QRect(*value)
+    if rect.isEmpty():
+        raise LayoutError(f"{name} is empty")
+    return rect
+
+
+def _readColor(value: object, name: str) -> QColor:
+    color = QColor(value) if isinstance(value, str) else QColor()
+    if not color.isValid():
+        raise LayoutError(f"{name} must be a color name or #rrggbb code")
+    return color
+
+
+class LayoutSlot:
+    """
+    LayoutSlot : Place of a photo on a layout, the photo is scaled to the slot,
+    cropped to fill it or letterboxed, then rotated around the slot center. The
+    event decor can be drawn over the photo, like for single photos.
+    """
+
+    def __init__(self, description: dict) -> None:
+        """
+        Args:
+            description (dict): Json slot, {"rect": [x, y, width, height],
+            "rotation": degrees, "crop": "fill" or "fit", "decor": bool}
+
+        Raises:
+            LayoutError: The description is invalid
+        """
+        self.rect = _readRect(description.get("rect"), "Slot rect")
+        self.rotation = float(description.get("rotation", 0))
+        self.crop = description.get("crop", CROP_FILL)
+        if self.crop not in (CROP_FILL, CROP_FIT):
+            raise LayoutError(f"Slot crop must be {CROP_FILL!r} or {CROP_FIT!r}")
+        self.decor = bool(description.get("decor", False))
+
+
+class LayoutLayer:
+    """
+    LayoutLayer : Static part of a layout, an image or a text drawn below or above
+    the photos. Texts can use the {eventName} and {eventDate} fields.
+    """
+
+    def __init__(self, description: dict, folder: str) -> None:
+        """
+        Args:
+            description (dict): Json layer, {"image": filepath relative to the
+            template} or {"text": text, "color": color, "size": points}, along
+            with "rect": [x, y, width, height] and "above": bool
+            folder (str): Template folder
+
+        Raises:
+            LayoutError: The description is invalid
+        """
+        self.rect = (
+            _readRect(description["rect"], "Layer rect") if "rect" in description
+            else None
+        )
+        self.above = bool(description.get("above", True))
+
+        self.image = None
+        self.text = None
+        if "image" in description:
+            self.image = os.path.join(folder, description["image"])
+            if not os.path.exists(self.image):
+                raise LayoutError(f"Layer image {self.image} doesn't exist")
+        elif "text" in description:
+            self.text = str(description["text"])
+            self.color = _readColor(description.get("color", "black"), "Layer color")
+            self.pointSize = int(description.get("size", 40))
+        else:
+            raise LayoutError("Layers must have an image or a text")
+
+    def draw(self, painter: QPainter, size: QSize, fields: dict) -> None:
+        """
+        draw : Draws the layer on the layout
+
+        Args:
+            painter (QPainter): Active painter
+            size (QSize): Layout size
+            fields (dict): Values of the text fields
+        """
+        rect = self.rect or QRect(QPoint(0, 0), size)
+        if self.image is not None:
+            painter.drawImage(rect, QImage(self.image))
+            return
+
+        font = QFont()
+        font.setPointSize(self.pointSize)
+        painter.setFont(font)
+        painter.setPen(self.color)
+        try:
+            text = self.text.format(**fields)
+        except (KeyError, IndexError, ValueError):
+            logger.warning("Unknown field in layout text %r", self.text)
+            text = self.text
+        painter.drawText(rect, Qt.AlignCenter | Qt.TextWordWrap, text)
+
+
+class Layout:
+    """
+    Layout : Sheet of several photos described by a json template, see the
+    templates in LAYOUT_FOLDER. Templates have a name, a size in pixels, a
+    background color, photo slots (see LayoutSlot) and static layers (see
+    LayoutLayer).
+    """
+
+    def __init__(self, filepath: str) -> None:
+        """
+        Args:
+            filepath (str): Template json file
+
+        Raises:
+            LayoutError: The template can't be read or is invalid
+        """
+        self.filepath = filepath
+        self.id = os.path.splitext(os.path.basename(filepath))[0]
+
+        try:
+            with open(filepath, "rt", encoding=ENCODING) as file:
+                description = json.load(file)
+        except (OSError, ValueError) as err:
+            raise LayoutError(f"Could not read layout {filepath}: {err}") from err
+
+        try:
+            self.name = str(description.get("name", self.id))
+            size = description.get("size")
+            if (
+                not isinstance(size, list) or len(size) != 2
+                or not all(isinstance(number, int) and number > 0 for number in size)
+            ):
+                raise LayoutError("Layout size must be a [width, height] list")
+            self.size = QSize(*size)
+            self.background = _readColor(
+                description.get("background", "white"), "Layout background"
+            )
+
+            self.slots = [LayoutSlot(slot) for slot in description.get("slots", [])]
+            if not self.slots:
+                raise LayoutError("Layouts need at least one photo slot")
+            folder = os.path.dirname(filepath)
+            self.layers = [
+                LayoutLayer(layer, folder) for layer in description.get("layers", [])
+            ]
+        except (LayoutError, AttributeError, TypeError, ValueError) as err:
+            raise LayoutError(f"Invalid layout {filepath}: {err}") from err
+
+    def getSlotCount(self) -> int:
+        """
+        getSlotCount : Returns the number of photos of the layout
+
+        Returns:
+            int: Number of photo slots
+        """
+        return len(self.slots)
+
+
+def listLayouts(folder: str = LAYOUT_FOLDER) -> list[Layout]:
+    """
+    listLayouts : Loads the valid layout templates of a folder, invalid ones are
+    logged and skipped
+
+    Args:
+        folder (str, optional): Templates folder. Defaults to LAYOUT_FOLDER.
+
+    Returns:
+        list[Layout]: Layouts, sorted by file name
+    """
+    layouts = []
+    for filepath in sorted(glob.glob(os.path.join(folder, "*.json"))):
+        try:
+            layouts.append(Layout(filepath))
+        except LayoutError as err:
+            logger.error("Skipped layout: %s", err)
+    return layouts
+
+
+class LayoutRenderer:
+    """
+    LayoutRenderer : Composes the sheets of a layout. The static parts, the
+    background with the layers below the photos and the slots decor with the
+    layers above them, are rendered once on the first sheet and kept, so each
+    sheet only costs decoding and pasting the photos. Thread safe.
+    """
+
+    def __init__(self, layout: Layout, decorFile: str, fields: dict = None) -> None:
+        """
+        Args:
+            layout (Layout): Layout
+            decorFile (str): Event decor image file, drawn over the photos of the
+            slots asking for it
+            fields (dict, optional): Values of the text fields, such as the event
+            name. Defaults to None.
+        """
+        self.layout = layout
+        self.decorFile = decorFile
+        self.fields = fields or {}
+
+        self.background: QImage = None
+        self.overlay: QImage = None
+        self._lock = threading.Lock()
+
+    def render(self, photoPaths: list[str]) -> QImage:
+        """
+        render : Composes a sheet with the given photos, filling the slots in
+        order. Slots without photo are left empty.
+
+        Args:
+            photoPaths (list[str]): Photos filepaths
+
+        Returns:
+            QImage: Sheet
+        """
+        with self._lock:
+            if self.background is None:
+                self._prerender()
+        sheet = self.background.copy()
+
+        painter = QPainter(sheet)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        for slot, photoPath in zip(self.layout.slots, photoPaths):
+            photo = self._readPhoto(photoPath, slot)
+            if photo.isNull():
+                logger.warning("Could not read layout photo %s", photoPath)
+                continue
+
+            painter.save()
+            self._transformToSlot(painter, slot)
+            painter.drawImage(
+                QRectF(-photo.width() / 2, -photo.height() / 2,
+                       photo.width(), photo.height()),
+                photo
+            )
+            painter.restore()
+        painter.drawImage(0, 0, self.overlay)
+        painter.end()
+
+        return sheet
+
+    def _prerender(self) -> None:
+        """
+        _prerender : Renders the static parts of the layout
+        """
+        size = self.layout.size
+
+        self.background = QImage(size, QImage.Format_RGB32)
+        self.background.fill(self.layout.background)
+        painter = QPainter(self.background)
+        painter.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
+        for layer in self.layout.layers:
+            if not layer.above:
+                layer.draw(painter, size, self.fields)
+        painter.end()
+
+        self.overlay = QImage(size, QImage.Format_ARGB32_Premultiplied)
+        self.overlay.fill(Qt.transparent)
+        painter = QPainter(self.overlay)
+        painter.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
+        decor = DecorCache(self.decorFile)
+        for slot in self.layout.slots:
+            if not slot.decor:
+                continue
+            decorImage = decor.get(slot.rect.width(), slot.rect.height())
+            if decorImage.isNull():
+                continue
+            painter.save()
+            self._transformToSlot(painter, slot)
+            painter.drawImage(
+                QPoint(-slot.rect.width() // 2, -slot.rect.height() // 2), decorImage
+            )
+            painter.restore()
+        for layer in self.layout.layers:
+            if layer.above:
+                layer.draw(painter, size, self.fields)
+        painter.end()
+
+        logger.debug("Layout %s static parts rendered", self.layout.id)
+
+    @staticmethod
+    def _transformToSlot(painter: QPainter, slot: LayoutSlot) -> None:
+        """
+        _transformToSlot : Moves the painter origin to the slot center, rotated
+        like the slot
+
+        Args:
+            painter (QPainter): Active painter
+            slot (LayoutSlot): Slot
+        """
+        center = QRectF(slot.rect).center()
+        painter.translate(center)
+        painter.rotate(slot.rotation)
+
+    @staticmethod
+    def _readPhoto(photoPath: str, slot: LayoutSlot) -> QImage:
+        """
+        _readPhoto : Decodes a photo straight to its size in the slot, cropped if
+        the slot is filled
+
+        Args:
+            photoPath (str): Photo filepath
+            slot (LayoutSlot): Slot
+
+        Returns:
+            QImage: Photo, null if it couldn't be read
+        """
+        reader = QImageReader(photoPath)
+        sourceSize = reader.size()
+        if not sourceSize.isValid():
+            return QImage()
+
+        slotSize = slot.rect.size()
+        if slot.crop == CROP_FIT:
+            reader.setScaledSize(sourceSize.scaled(slotSize, Qt.KeepAspectRatio))
+        else:
+            scaledSize = sourceSize.scaled(slotSize, Qt.KeepAspectRatioByExpanding)
+            reader.setScaledSize(scaledSize)
+            reader.setScaledClipRect(QRect(
+                QPoint(
+                    (scaledSize.width() - slotSize.width()) // 2,
+                    (scaledSize.height() - slotSize.height()) // 2
+                ),
+                slotSize
+            ))
+        return reader.read()
@@ -0,0 +1,58 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module rendering the exported photos, overlayed with the decor and text
+"""
+
+import logging
+
+from PyQt5.QtCore import QPoint
+from PyQt5.QtGui import QImage, QPainter
+
+from .decorcache import DecorCache
+from .textcache import TextCache
+
+# ---------- LOGGER SETUP ----------
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+
+# ----------------------------------
+
+
+def renderPhoto(frame: QImage, decor: DecorCache = None, text: str = "") -> QImage:
+    """
+    renderPhoto : Renders the photo at its own resolution with the decor and text
+    drawn over it, as displayed on screen. Thread safe.
+
+    Args:
+        frame (QImage): Photo
+        decor (DecorCache, optional): Decor scaled to the photo size, none if
+        None. Defaults to None.
+        text (str, optional): Text centered on the photo. Defaults to "".
+
+    Returns:
+        QImage: Rendered photo, null if the photo is null
+    """
+    photo = frame.convertToFormat(QImage.Format_RGB32)
+    if photo.isNull():
+        logger.warning("No photo to render")
+        return photo
+
+    painter = QPainter(photo)
+    if decor is not None:
+        decorImage = decor.get(photo.width(), photo.height())
+        if not decorImage.isNull():
+            painter.drawImage(QPoint(0, 0), decorImage)
+
+    if text:
+        # Rendered once, the screen text cache belongs to the GUI thread
+        textPosition, textImage = TextCache(maxSize=1).get(
+            text, photo.width(), photo.height()
+        )
+        painter.drawImage(textPosition, textImage)
+    painter.end()
+
+    return photo
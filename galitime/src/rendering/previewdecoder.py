@@ -0,0 +1,188 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module containing the preview decoder, decoding jpeg frames outside of the GUI
+thread
+"""
+
+import logging
+import threading
+import time
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QSize, Qt, QThread
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader
+
+from ..utilities.previewmetrics import PreviewMetrics
+
+# ---------- LOGGER SETUP ----------
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+
+# ----------------------------------
+
+
+class PreviewDecoder(QThread):
+    """
+    PreviewDecoder : Worker thread turning preview jpeg frames into QImages.
+    Only the newest submitted frame is kept, a frame submitted while the previous
+    one is still waiting replaces it and the older one is dropped.
+    When a target size is set, frames are decoded straight to that size, letting
+    the jpeg decoder downscale during decompression.
+    """
+
+    frameDecoded = pyqtSignal(QImage, int, float)
+
+    def __init__(self, metrics: PreviewMetrics) -> None:
+        super().__init__()
+        self.setObjectName("PreviewDecoder")
+
+        self.metrics = metrics
+        self.latestSequence = 0
+
+        self._condition = threading.Condition()
+        self._pendingFrame: tuple[bytes, float] = None
+        self._running = True
+
+        self._targetSize: tuple[int, int] = None
+        # Decoding sizes of the source sizes, for the target size they were computed
+        # for, dropped when the target size changes
+        self._scaledTarget: tuple[int, int] = None
+        self._scaledSizes: dict[tuple[int, int], QSize] = {}
+
+    def setTargetSize(self, targetSize: QSize) -> None:
+        """
+        setTargetSize : Sets the size frames are decoded to, usually the size of the
+        widget displaying them. Can be called from any thread.
+
+        Args:
+            targetSize (QSize): Decoded frames size in device pixels, frames are
+            decoded at full size if empty
+        """
+        if targetSize.isEmpty():
+            self._targetSize = None
+        else:
+            self._targetSize = (targetSize.width(), targetSize.height())
+
+    def submit(self, frame: bytes, timestamp: float) -> None:
+        """
+        submit : Queues a frame for decoding, replacing the frame still waiting if
+        any. Can be called from any thread.
+
+        Args:
+            frame (bytes): Jpeg frame
+            timestamp (float): time.monotonic() reception timestamp of the frame
+        """
+        with self._condition:
+            if self._pendingFrame is not None:
+                self.metrics.count("dropped")
+            self._pendingFrame = (frame, timestamp)
+            self._condition.notify()
+
+    def clear(self) -> None:
+        """
+        clear : Drops the frame waiting for decoding, if any.
+        """
+        with self._condition:
+            self._pendingFrame = None
+
+    def isStale(self, sequence: int) -> bool:
+        """
+        isStale : Returns True if a newer frame than the given one was decoded,
+        meaning the GUI fell behind and the given frame can be skipped.
+
+        Args:
+            sequence (int): Sequence number emitted with the decoded frame
+
+        Returns:
+            bool: True if the frame is outdated
+        """
+        return sequence < self.latestSequence
+
+    def stop(self) -> None:
+        """
+        stop : Stops the decoder thread and waits for it to finish.
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self.wait()
+
+    def run(self) -> None:
+        logger.debug("Preview decoder started")
+        while True:
+            with self._condition:
+                while self._pendingFrame is None and self._running:
+                    self._condition.wait()
+                if not self._running:
+                    break
+                frame, timestamp = self._pendingFrame
+                self._pendingFrame = None
+
+            decodeStart = time.perf_counter()
+            image = self._decode(frame)
+            if image.isNull():
+                logger.warning("Failed to decode preview frame (%u bytes)", len(frame))
+                continue
+            self.metrics.addDecodeTime(time.perf_counter() - decodeStart)
+
+            self.latestSequence += 1
+            self.frameDecoded.emit(image, self.latestSequence, timestamp)
+        logger.debug("Preview decoder stopped")
+
+    def _decode(self, frame: bytes) -> QImage:
+        """
+        _decode : Decodes a frame, scaled to the target size if one is set.
+
+        Args:
+            frame (bytes): Encoded frame
+
+        Returns:
+            QImage: Decoded frame, null image if decoding failed
+        """
+        buffer = QBuffer()
+        buffer.setData(QByteArray(frame))
+        buffer.open(QIODevice.ReadOnly)
+
+        reader = QImageReader(buffer)
+        targetSize = self._targetSize
+        if targetSize is not None:
+            sourceSize = reader.size()
+            if sourceSize.isValid():
+                reader.setScaledSize(self._getScaledSize(sourceSize, targetSize))
+
+        return reader.read()
+
+    def _getScaledSize(self, sourceSize: QSize, targetSize: tuple[int, int]) -> QSize:
+        """
+        _getScaledSize : Returns the decoding size for a frame of the given size,
+        computed once per source size for the current target size, the sizes of a
+        previous target size are dropped. Frames are scaled down to fit the target
+        size keeping their aspect ratio, and never upscaled.
+
+        Args:
+            sourceSize (QSize): Encoded frame size
+            targetSize (tuple[int, int]): Target width and height
+
+        Returns:
+            QSize: Decoding size
+        """
+        if targetSize != self._scaledTarget:
+            self._scaledTarget = targetSize
+            self._scaledSizes.clear()
+
+        key = (sourceSize.width(), sourceSize.height())
+        scaledSize = self._scaledSizes.get(key)
+        if scaledSize is None:
+            scaledSize = sourceSize
+            if sourceSize.width() > targetSize[0] or sourceSize.height() > targetSize[1]:
+                scaledSize = sourceSize.scaled(QSize(*targetSize), Qt.KeepAspectRatio)
+            self._scaledSizes[key] = scaledSize
+            logger.debug(
+                "Decoding %ux%u frames at %ux%u", sourceSize.width(),
+                sourceSize.height(), scaledSize.width(), scaledSize.height()
+            )
+        return scaledSize
@@ -0,0 +1,211 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module containing the preview widget, compositing the displayed frame with the
+decor and text overlays
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+
+from PyQt5.QtCore import QPoint, QRect, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QPainter, QPaintEvent, QRegion, QResizeEvent
+from PyQt5.QtWidgets import QSizePolicy, QWidget
+
+from .decorcache import DecorCache
+from .textcache import TextCache
+
+# ---------- LOGGER SETUP ----------
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+
+# ----------------------------------
+
+
+class PreviewWidget(QWidget):
+    """
+    PreviewWidget : Widget displaying a frame with the decor and a text on top,
+    each layer kept separately and only composited in paintEvent, so that
+    overlays never accumulate on the frame. The frame is letterboxed, scaled
+    to fit the widget while keeping its aspect ratio, and only the regions
+    changed by a new frame or a new text are repainted.
+    """
+
+    framePainted = pyqtSignal(float)
+
+    def __init__(self, decor: DecorCache, textCache: TextCache, parent=None) -> None:
+        """
+        Args:
+            decor (DecorCache): Decor drawn over the frame, scaled to the frame
+            display size
+            textCache (TextCache): Cache rendering the text
+            parent (QWidget, optional): Parent widget. Defaults to None.
+        """
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
+
+        self.decor = decor
+        self.textCache = textCache
+
+        self.frame = QImage()
+        self.decorVisible = False
+        self.text = ""
+        self.targetRect = QRect()
+        self.framePending = False
+
+    def getFrame(self) -> QImage:
+        """
+        getFrame : Returns the displayed frame, without overlays
+
+        Returns:
+            QImage: Displayed frame
+        """
+        return self.frame
+
+    def isDecorVisible(self) -> bool:
+        """
+        isDecorVisible : Returns whether the decor is drawn over the frame
+
+        Returns:
+            bool: Decor drawn
+        """
+        return self.decorVisible
+
+    def getTargetSize(self) -> QSize:
+        """
+        getTargetSize : Returns the size the frame is displayed at
+
+        Returns:
+            QSize: Letterboxed frame size in pixels
+        """
+        return self.targetRect.size()
+
+    def setFrame(self, frame: QImage, decorVisible: bool = True) -> None:
+        """
+        setFrame : Displays another frame. Only the frame area is repainted if the
+        frame size didn't change.
+
+        Args:
+            frame (QImage): Frame
+            decorVisible (bool, optional): Draws the decor over the frame. Defaults
+            to True.
+        """
+        sizeChanged = frame.size() != self.frame.size()
+        self.frame = frame
+        self.decorVisible = decorVisible
+        self.framePending = True
+
+        if sizeChanged:
+            self._updateTargetRect()
+            self.update()
+        else:
+            self.update(self.targetRect)
+
+    def setText(self, text: str) -> None:
+        """
+        setText : Displays another text over the frame, repainting only the areas
+        of the previous and new texts.
+
+        Args:
+            text (str): Text, nothing is displayed if empty
+        """
+        if text == self.text:
+            return
+        previousRect = self._getTextRect()
+        self.text = text
+        self.update(previousRect.united(self._getTextRect()))
+
+    def updateDecor(self) -> None:
+        """
+        updateDecor : Repaints the frame area once the decor changed
+        """
+        self.update(self.targetRect)
+
+    def resizeEvent(self, event: QResizeEvent) -> None:
+        """
+        resizeEvent : Qt resize callback, recomputes the letterboxed frame area.
+        This function is called by Qt and shouldn't be called directly
+
+        Args:
+            event (QResizeEvent): Event
+        """
+        self._updateTargetRect()
+        super().resizeEvent(event)
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        """
+        paintEvent : Qt paint callback, draws the letterbox borders, the frame, the
+        decor and the text, clipped to the region to repaint.
+        This function is called by Qt and shouldn't be called directly
+
+        Args:
+            event (QPaintEvent): Event
+        """
+        paintStart = time.perf_counter()
+        painter = QPainter(self)
+
+        # Letterbox borders
+        borders = event.region().subtracted(QRegion(self.targetRect))
+        for rect in borders.rects():
+            painter.fillRect(rect, Qt.black)
+
+        if not self.frame.isNull() and event.region().intersects(self.targetRect):
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            painter.drawImage(self.targetRect, self.frame)
+            self._drawOverlays(painter, self.targetRect)
+        painter.end()
+
+        if self.framePending:
+            self.framePending = False
+            self.framePainted.emit(time.perf_counter() - paintStart)
+
+    def _drawOverlays(self, painter: QPainter, rect: QRect) -> None:
+        """
+        _drawOverlays : Draws the decor and text over the frame drawn in the given
+        rectangle
+
+        Args:
+            painter (QPainter): Active painter
+            rect (QRect): Frame rectangle
+        """
+        if self.decorVisible:
+            decor = self.decor.get(rect.width(), rect.height())
+            if not decor.isNull():
+                painter.drawImage(rect.topLeft(), decor)
+
+        textPosition, text = self.textCache.get(self.text, rect.width(), rect.height())
+        if not text.isNull():
+            painter.drawImage(rect.topLeft() + textPosition, text)
+
+    def _getTextRect(self) -> QRect:
+        """
+        _getTextRect : Returns the area covered by the text on the widget
+
+        Returns:
+            QRect: Text area, empty if there is no text
+        """
+        if not self.text or self.targetRect.isEmpty():
+            return QRect()
+        textPosition, text = self.textCache.get(
+            self.text, self.targetRect.width(), self.targetRect.height()
+        )
+        return QRect(self.targetRect.topLeft() + textPosition, text.size())
+
+    def _updateTargetRect(self) -> None:
+        if self.frame.isNull():
+            self.targetRect = QRect()
+            return
+        size = self.frame.size().scaled(self.size(), Qt.KeepAspectRatio)
+        self.targetRect = QRect(
+            QPoint(
+                (self.width() - size.width()) // 2,
+                (self.height() - size.height()) // 2
+            ),
+            size
+        )
@@ -0,0 +1,120 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module containing the text cache, keeping the texts overlayed on screen rendered
+"""
+
+from __future__ import annotations
+
+import collections
+import logging
+
+from PyQt5.QtCore import QPoint, QRect, Qt
+from PyQt5.QtGui import QFont, QFontMetrics, QImage, QPainter
+
+from ..utilities.constants import TEXT_CACHE_SIZE, TEXT_POINT_SIZE
+
+# ---------- LOGGER SETUP ----------
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+
+# ----------------------------------
+
+
+class TextCache:
+    """
+    TextCache : Texts rendered once per screen size, in white on a transparent
+    premultiplied ARGB image, and kept in a least recently used cache of
+    TEXT_CACHE_SIZE entries. Images only cover the text bounding box, along with
+    their position centering the text on screen, so that displaying a countdown
+    step only blends the text pixels instead of laying the text out again.
+    """
+
+    def __init__(
+        self, pointSize: int = TEXT_POINT_SIZE, maxSize: int = TEXT_CACHE_SIZE
+    ) -> None:
+        """
+        Args:
+            pointSize (int, optional): Font size in points. Defaults to
+            TEXT_POINT_SIZE.
+            maxSize (int, optional): Number of rendered texts kept. Defaults to
+            TEXT_CACHE_SIZE.
+        """
+        self.pointSize = pointSize
+        self.maxSize = maxSize
+        self._rendered: collections.OrderedDict[
+            tuple[str, int, int], tuple[QPoint, QImage]
+        ] = collections.OrderedDict()
+
+    def get(self, text: str, width: int, height: int) -> tuple[QPoint, QImage]:
+        """
+        get : Returns the text rendered for the given screen size, rendering it
+        only if it isn't cached yet
+
+        Args:
+            text (str): Text
+            width (int): Screen width in pixels
+            height (int): Screen height in pixels
+
+        Returns:
+            tuple[QPoint, QImage]: Position centering the text on screen and
+            transparent image of the text, null for empty texts
+        """
+        if not text:
+            return QPoint(), QImage()
+
+        key = (text, width, height)
+        rendered = self._rendered.get(key)
+        if rendered is not None:
+            self._rendered.move_to_end(key)
+            return rendered
+
+        rendered = self._render(text, width, height)
+        self._rendered[key] = rendered
+        if len(self._rendered) > self.maxSize:
+            self._rendered.popitem(last=False)
+        return rendered
+
+    def prerender(self, texts: list[str], width: int, height: int) -> None:
+        """
+        prerender : Renders texts ahead of their display, such as the countdown
+        steps
+
+        Args:
+            texts (list[str]): Texts
+            width (int): Width in pixels
+            height (int): Height in pixels
+        """
+        for text in texts:
+            self.get(text, width, height)
+
+    def clear(self) -> None:
+        """
+        clear : Drops every rendered text
+        """
+        self._rendered.clear()
+
+    def _render(self, text: str, width: int, height: int) -> tuple[QPoint, QImage]:
+        font = QFont()
+        font.setPointSize(self.pointSize)
+        screenRect = QRect(0, 0, width, height)
+        textRect = QFontMetrics(font).boundingRect(screenRect, Qt.AlignCenter, text)
+        textRect = textRect.intersected(screenRect)
+
+        image = QImage(textRect.size(), QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        painter.setFont(font)
+        painter.setPen(Qt.white)
+        # Laid out on the whole screen, then shifted to the image
+        painter.translate(-textRect.topLeft())
+        painter.drawText(screenRect, Qt.AlignCenter, text)
+        painter.end()
+
+        logger.debug("Text '%s' rendered for %ux%u", text, width, height)
+        return textRect.topLeft(), image
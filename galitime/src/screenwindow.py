@@ -10,16 +10,25 @@ from __future__ import annotations
 
 import atexit
 import logging
-import os
+import time
 
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QPainter, QPixmap
-from PyQt5.QtWidgets import QLabel, QMainWindow
+from PyQt5.QtCore import QEvent, QObject, Qt, QTimer
+from PyQt5.QtGui import QGuiApplication, QImage
+from PyQt5.QtWidgets import QMainWindow
 from PyQt5.QtWidgets import QShortcut
 
+from .managers.eventmanager import EventManager
 from .peripherals.camera import CameraWrapper
-from .utilities.constants import DEFAULT_CAM_VIEW, DEFAULT_DECOR
-from .utilities.constants import FPS, RESTART_INTERVAL
+from .peripherals.previewwatchdog import PreviewWatchdog
+from .rendering.decorcache import DecorCache
+from .rendering.exportworker import ExportWorker
+from .rendering.layout import Layout, LayoutError, LayoutRenderer, listLayouts
+from .rendering.photo import renderPhoto
+from .rendering.previewdecoder import PreviewDecoder
+from .rendering.previewwidget import PreviewWidget
+from .rendering.textcache import TextCache
+from .utilities.constants import DEFAULT_CAM_VIEW, DEFAULT_DECOR, DEFAULT_LAYOUT
+from .utilities.constants import FPS
 
 # ---------- LOGGER SETUP ----------
 logger = logging.getLogger(__name__)
@@ -44,12 +53,26 @@ class ScreenWindow(QMainWindow):
 
         self.cam = CameraWrapper.getCamera()
         self.decorFile = DEFAULT_DECOR
+        self.sheetLayout = self._loadDefaultLayout()
+        self.layoutRenderer: LayoutRenderer = None
 
         self.text = ""
+        self.textCache = TextCache()
 
-        self.defaultImage = QPixmap(DEFAULT_CAM_VIEW)
-        self.decorImage = QPixmap(self.decorFile)
-        self.screenImage = QPixmap()
+        self.defaultImage = QImage(DEFAULT_CAM_VIEW)
+        self.decor = DecorCache(self.decorFile)
+        # Full resolution decor of the exports, kept apart from the screen sizes
+        self.exportDecor = DecorCache(self.decorFile, maxSize=1)
+        self.pendingImage: QImage = None
+        self.pendingTimestamp = 0
+        # Timestamp of the frame given to the screen, the pending one may be newer
+        self.presentedTimestamp = 0
+        self.lastPresentTime = 0
+
+        self._setupPreviewDecoder()
+
+        self.exporter = ExportWorker()
+        self.exporter.start()
 
         self.screenPage()
         self.show()
@@ -73,13 +96,56 @@ class ScreenWindow(QMainWindow):
 
     def setDecorFile(self, decorFile: str) -> None:
         """
-        setDecorFile : Set decor file and update image into memory.
+        setDecorFile : Set decor file and update image into memory, the decor
+        scaled to the previous sizes is dropped.
 
         Args:
             decorFile (str): filepath to image file
         """
         self.decorFile = decorFile
-        self.decorImage.load(decorFile)
+        self.decor.setFile(decorFile)
+        self.exportDecor.setFile(decorFile)
+        self.Screen.updateDecor()
+
+    @staticmethod
+    def _loadDefaultLayout() -> Layout:
+        """
+        _loadDefaultLayout : Loads the DEFAULT_LAYOUT template, or the first valid
+        template of LAYOUT_FOLDER if it's missing or invalid
+
+        Raises:
+            LayoutError: No valid layout template
+
+        Returns:
+            Layout: Default layout
+        """
+        try:
+            return Layout(DEFAULT_LAYOUT)
+        except LayoutError as err:
+            logger.error("Default layout unavailable: %s", err)
+        layouts = listLayouts()
+        if not layouts:
+            raise LayoutError("No valid layout template available")
+        logger.info("Using layout %s by default", layouts[0].id)
+        return layouts[0]
+
+    def setSheetLayout(self, layout: Layout) -> None:
+        """
+        setSheetLayout : Sets the layout of the multi-photo sheets
+
+        Args:
+            layout (Layout): Layout
+        """
+        self.sheetLayout = layout
+
+    def getSheetLayout(self) -> Layout:
+        """
+        getSheetLayout : Returns the layout of the multi-photo sheets
+
+        Returns:
+            Layout: Layout
+        """
+        return self.sheetLayout
 
     def getDecorFile(self) -> str:
         """
@@ -99,12 +165,24 @@ class ScreenWindow(QMainWindow):
         """
         return self.cam.isPreviewing
 
+    def _setupPreviewDecoder(self):
+        self.decoder = PreviewDecoder(self.cam.metrics)
+        self.decoder.frameDecoded.connect(self._displayFrame, Qt.QueuedConnection)
+        self.decoder.start()
+
+        self.cam.setFrameCallback(self.decoder.submit)
+
     def _setupPreviewTimers(self):
         self.updateTimer = QTimer()
+        self.updateTimer.setTimerType(Qt.PreciseTimer)
         self.updateTimer.timeout.connect(self._updatePreview)
 
-        self.restartTimer = QTimer()
-        self.restartTimer.timeout.connect(self.restartPreview)
+        self.presentTimer = QTimer()
+        self.presentTimer.setSingleShot(True)
+        self.presentTimer.setTimerType(Qt.PreciseTimer)
+        self.presentTimer.timeout.connect(self._presentFrame)
+
+        self.watchdog = PreviewWatchdog(self.cam)
 
     def _shortcutSetup(self):
         self.FullScreenSC = QShortcut("F11", self)
@@ -123,27 +201,57 @@ class ScreenWindow(QMainWindow):
         """
         screenPage : Loads the screen page widgets and sets it as page.
         """
-        self.Screen = QLabel("")
-        self.Screen.setAlignment(Qt.AlignCenter)
+        self.Screen = PreviewWidget(self.decor, self.textCache)
         self.Screen.setMaximumSize(1920, 1080)
-
-        self.Screen.setPixmap(self.defaultImage)
-
-        self.Screen.setScaledContents(True)
+        self.Screen.framePainted.connect(self._onFramePainted)
+        self.Screen.installEventFilter(self)
 
         self.setCentralWidget(self.Screen)
         self.reset()
 
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        """
+        eventFilter : Forwards the screen widget size to the preview decoder each
+        time it is resized, so frames are decoded at the displayed size.
+        This function is called by Qt and shouldn't be called directly
+
+        Args:
+            watched (QObject): Object receiving the event
+            event (QEvent): Event
+
+        Returns:
+            bool: False, the event is never filtered out
+        """
+        if watched is self.Screen and event.type() == QEvent.Resize:
+            ratio = self.Screen.devicePixelRatioF()
+            self.decoder.setTargetSize(self.Screen.contentsRect().size() * ratio)
+        return super().eventFilter(watched, event)
+
     def showText(self, text: str) -> None:
         """
-        showText : Displays text to display on image and displays it.
+        showText : Displays text over the displayed image, replacing the previous
+        one.
 
         Args:
             text (str): Text to display
         """
         self.text = str(text)
-        if not self.isPreviewing():
-            self.updateScreen()
+        self.Screen.setText(self.text)
+
+    def prerenderTexts(self, texts: list) -> None:
+        """
+        prerenderTexts : Renders texts at the current screen size ahead of their
+        display, see TextCache.
+
+        Args:
+            texts (list): Texts to display soon, such as countdown steps
+        """
+        targetSize = self.Screen.getTargetSize()
+        if targetSize.isEmpty():
+            return
+        self.textCache.prerender(
+            [str(text) for text in texts], targetSize.width(), targetSize.height()
+        )
 
     def displayImage(self, imagepath: str) -> None:
         """
@@ -152,85 +260,177 @@ class ScreenWindow(QMainWindow):
         Args:
             imagepath (str): Path to the image (absolute or relative)
         """
-        self.screenImage.load(imagepath)
-        # if not self.isPreviewing():
-        self.updateScreen()
+        self.setScreenImage(QImage(imagepath))
+
+    def setScreenImage(self, image: QImage) -> None:
+        """
+        setScreenImage : Displays an already decoded image.
+
+        Args:
+            image (QImage): Image to display
+        """
+        self.Screen.setFrame(image)
 
-    def exportImage(self, filepath: str) -> str:
+    def exportImage(self, filepath: str) -> int:
         """
-        saveImage : Saves the image currently displayed on screen
-        (including decor and text) at the filepath.
+        exportImage : Renders the image currently displayed on screen (including
+        decor and text) at its full resolution and saves it in the background at
+        the filepath, see ExportWorker.
 
         Args:
             filepath (str): Filepath with filename to save the image
 
         Returns:
-            str: Filepath where the image was saved (should correpond to suppied
-            filename)
+            int: Export job id, emitted back by the exporter signals
+        """
+        frame = self.Screen.getFrame()
+        decor = self.exportDecor if self.Screen.isDecorVisible() else None
+        text = self.text
+        return self.exporter.export(
+            lambda: renderPhoto(frame, decor, text), filepath
+        )
+
+    def exportLayout(self, photoPaths: list[str], filepath: str) -> int:
         """
-        if os.path.exists(filepath):
-            os.remove(filepath)
-        self.screenImage.save(filepath)
+        exportLayout : Composes a sheet of the current layout, such as a photo
+        strip, from the given photos and saves it in the background, see
+        ExportWorker. The static parts of the layout are only rendered for the
+        first sheet of the event, see LayoutRenderer.
+
+        Args:
+            photoPaths (list[str]): Photos filepaths, in the layout slots order
+            filepath (str): Filepath with filename to save the sheet
 
-        return filepath
+        Returns:
+            int: Export job id, emitted back by the exporter signals
+        """
+        fields = {
+            "eventName": EventManager.getEventName(),
+            "eventDate": EventManager.getEventDate(),
+        }
+        renderer = self.layoutRenderer
+        if (
+            renderer is None or renderer.layout is not self.sheetLayout
+            or renderer.decorFile != self.decorFile or renderer.fields != fields
+        ):
+            renderer = LayoutRenderer(self.sheetLayout, self.decorFile, fields)
+            self.layoutRenderer = renderer
+
+        return self.exporter.export(lambda: renderer.render(photoPaths), filepath)
 
     def reset(self) -> None:
         """
-        reset : Resets screen to default image and clears text.
+        reset : Resets screen to default image, without decor, and clears text.
         """
-        self.Screen.setPixmap(self.defaultImage)
-        self.Screen.setText("")
-        self.Screen.adjustSize()
+        self.Screen.setFrame(self.defaultImage, decorVisible=False)
+        self.showText("")
 
     def startPreview(self) -> None:
         """
-        startPreview : Starts the preview process, setting it to 30 fps ideally,
-        being limited by the camera throughput. A preview restart will occur every
-        30 seconds (defined in constants.py) to keep the camera output stream file
-        size limited.
+        startPreview : Starts the preview process. The screen is repainted each time
+        the camera delivers a new frame, at most once per screen refresh. Frames are
+        only polled at 30 fps (defined in constants.py) if the camera can't push
+        them. The preview process is watched and only restarted if it stalled, see
+        PreviewWatchdog.
         """
         self.reset()
 
         # Launching capture command
-        logger.info("Preview started with %u fps", FPS)
         self.cam.startPreview()
 
-        self.updateTimer.start(round(1000 / FPS))
-        self.restartTimer.start(RESTART_INTERVAL * 1000)
+        if self.cam.needsPolling():
+            logger.info("Preview started, polling frames at %u fps", FPS)
+            self.updateTimer.start(round(1000 / FPS))
+        else:
+            logger.info("Preview started, frame driven")
+        self.watchdog.start()
 
     def _updatePreview(self) -> None:
         """
         _updatePreview : internal update timer callback.
-        Updating the screen with last frame available from the camera.
+        Polls the camera for a new frame, which is then sent to the decoder thread
+        through the camera frame callback.
         """
-        self.screenImage.loadFromData(self.cam.readPreview())
-        self.updateScreen()
+        self.cam.pollPreview()
 
-    def updateScreen(self) -> None:
+    def _displayFrame(self, image: QImage, sequence: int, timestamp: float) -> None:
+        """
+        _displayFrame : decoder callback, runs in the GUI thread.
+        Updates the screen with the decoded frame, unless a newer frame is already
+        decoded or the preview was stopped in the meantime.
+
+        Args:
+            image (QImage): Decoded frame
+            sequence (int): Decoded frame sequence number
+            timestamp (float): time.monotonic() reception timestamp of the frame
+        """
+        if not self.isPreviewing():
+            return
+        if self.decoder.isStale(sequence):
+            self.cam.metrics.count("dropped")
+            return
+        if self.pendingImage is not None:
+            # Replacing a frame that was never presented
+            self.cam.metrics.count("dropped")
+
+        self.pendingImage = image
+        self.pendingTimestamp = timestamp
+        if self.presentTimer.isActive():
+            return
+
+        remaining = self._getFrameInterval() - (time.monotonic() - self.lastPresentTime)
+        if remaining <= 0:
+            self._presentFrame()
+        else:
+            self.presentTimer.start(max(1, round(remaining * 1000)))
+
+    def _presentFrame(self) -> None:
         """
-        updateScreen : Updates the screen with the base image,
-        in addition to decorfile and text overlayed in that order.
+        _presentFrame : Displays the last decoded frame waiting to be presented.
         """
-        if self.screenImage.isNull():
-            # logger.error("Screen Image is NULL, returning from updateScreen")
+        if self.pendingImage is None or not self.isPreviewing():
             return
 
-        painter = QPainter(self.screenImage)
-        font = painter.font()
-        font.setPointSize(100)
-        painter.setFont(font)
+        self.presentedTimestamp = self.pendingTimestamp
+        self.Screen.setFrame(self.pendingImage)
+        self.pendingImage = None
+        self.lastPresentTime = time.monotonic()
+
+    def _onFramePainted(self, paintTime: float) -> None:
+        """
+        _onFramePainted : Screen widget callback, records the display of a preview
+        frame once painted.
 
-        width, height = self.screenImage.width(), self.screenImage.height()
+        Args:
+            paintTime (float): Paint duration in seconds
+        """
+        if self.isPreviewing():
+            self.cam.metrics.addDisplay(paintTime, self.presentedTimestamp)
 
-        painter.drawPixmap(0, 0, width, height, self.decorImage)
+    def _getFrameInterval(self) -> float:
+        """
+        _getFrameInterval : Returns the refresh period of the screen the window is
+        displayed on.
 
-        currentPen = painter.pen()
-        currentPen.setColor(Qt.white)
-        painter.setPen(currentPen)
+        Returns:
+            float: Minimum time between two frames in seconds
+        """
+        window = self.windowHandle()
+        screen = window.screen() if window is not None else None
+        if screen is None:
+            screen = QGuiApplication.primaryScreen()
 
-        painter.drawText(0, 0, width, height, Qt.AlignCenter, str(self.text))
+        refreshRate = screen.refreshRate() if screen is not None else 0
+        if refreshRate <= 0:
+            refreshRate = 60
+        return 1 / refreshRate
 
-        self.Screen.setPixmap(self.screenImage)
+    def updateScreen(self) -> None:
+        """
+        updateScreen : Repaints the screen, the base image, decor and text layers
+        being composited by the screen widget, see PreviewWidget.
+        """
+        self.Screen.update()
 
     def stopPreview(self) -> None:
         """
@@ -238,19 +438,22 @@ class ScreenWindow(QMainWindow):
         """
         self.cam.stopPreview()
         self.updateTimer.stop()
-        self.restartTimer.stop()
+        self.presentTimer.stop()
+        self.watchdog.stop()
+        self.decoder.clear()
+        self.pendingImage = None
 
-        self.cam.connect()
+        if not self.cam.isConnected():
+            self.cam.connect()
         self.reset()
 
     def restartPreview(self) -> None:
         """
-        restartPreview : Stops and restarts the preview process.
-        See startPreview and stopPreview for more information.
+        restartPreview : Restarts the preview process without disconnecting the
+        camera, the last frame stays displayed in the meantime.
         """
         logger.info("Restarting Preview")
-        self.stopPreview()
-        self.startPreview()
+        self.cam.restartPreview()
 
     def _cleanUp(self):
         try:
@@ -258,6 +461,18 @@ class ScreenWindow(QMainWindow):
         finally:
             pass
         try:
-            self.restartTimer.stop()
+            self.presentTimer.stop()
+        finally:
+            pass
+        try:
+            self.decoder.stop()
+        finally:
+            pass
+        try:
+            self.exporter.stop()
+        finally:
+            pass
+        try:
+            self.watchdog.stop()
         finally:
             pass
@@ -14,6 +14,9 @@ LOGGER_FORMAT = "%(asctime)s [%(levelname)7s] (%(module)13s) %(lineno)3d : %(mes
 # Files
 LOG_FOLDER = "galitime/logs/"
 EVENT_SAVE_FILE = "event.json"
+EVENT_INDEX_FILE = "event.db"  # SQLite index of the photos, emails and prints
+STATE_WRITE_DELAY = 0.5  # seconds state file updates are coalesced before writing
+STATE_RETRY_DELAY = 5  # seconds before writing again a state file that failed
 EMAIL_INFO_FILE = "email.json"
 TEMP_PHOTO = "last_photo.jpg"
 
@@ -24,13 +27,66 @@ EMAIL_CONFIG_FILE = "./email_config/email.cfg"
 
 # Screen
 FPS = 30
-RESTART_INTERVAL = 30
+PREVIEW_CHECK_INTERVAL = 1  # seconds
+DECOR_CACHE_SIZE = 4  # scaled decor images kept in memory, one per size
+TEXT_POINT_SIZE = 100  # points, countdown and messages overlayed on screen
+TEXT_CACHE_SIZE = 16  # rendered texts kept in memory
+
+# Photo strips and other multi-photo layouts, see rendering/layout.py
+BURST_INTERVAL = 3  # seconds of countdown between two shots
+
+# Exports
+EXPORT_JPEG_QUALITY = 95  # 0 to 100
+EXPORT_PROGRESSIVE = True  # progressive jpeg, smaller files for emails
+COMPOSITE_TILE_SIZE = 256  # pixels, side of the tiles blended at once
 
 # Camera
+# "gphoto" (gphoto2 library and command line tool) or "simulated" (no camera)
+CAMERA_BACKEND = "gphoto"
+# Ports of the cameras triggered together, as listed by gphoto2 --auto-detect
+# (e.g. "usb:001,004"), None for the first camera detected. The first camera is
+# the main one, used for the preview.
+CAMERA_PORTS = (None,)
+CAPTURE_SYNC_TIMEOUT = 5  # seconds waited for every camera to be ready to shoot
+# "stream" (gphoto2 stdout pipe), "file" (MOVIE_PATH) or "gphoto" (capture_preview)
+PREVIEW_MODE = "stream"
 MOVIE_PATH = "galitime/ressources/movie.mjpg"
+MAX_MOVIE_SIZE = 50 * 1024 * 1024  # bytes, file mode only
+PREVIEW_STALL_TIMEOUT = 3  # seconds without new frame before a restart
+PREVIEW_RESTART_DELAY = 1  # seconds, doubled after each unsuccessful restart
+PREVIEW_RESTART_MAX_DELAY = 30  # seconds
+PREVIEW_KILL_TIMEOUT = 2  # seconds waited after SIGTERM before killing gphoto2
+LIVEVIEW_MAX_ERRORS = 5  # consecutive capture_preview errors, gphoto mode only
+LIVEVIEW_ERROR_DELAY = 0.1  # seconds
 CAMERA_LOG_FILE = LOG_FOLDER + "camera.log"
+CAMERA_INFO_TTL = 60  # seconds before the cached camera information is updated
+CONNECT_RETRY_DELAY = 1  # seconds, doubled after each failed connection
+CONNECT_RETRY_MAX_DELAY = 30  # seconds
+# "sdram" (photo downloaded after each capture) or "card" (photo saved on the
+# memory card and ingested in the background)
+CAPTURE_TARGET = "sdram"
+INGEST_MANIFEST = ".ingested.json"  # saved in the photo folder
+INGEST_BATCH_SIZE = 10  # files downloaded between two manifest saves
+INGEST_EVENT_TIMEOUT = 200  # milliseconds waited for a camera event
+INGEST_RETRY_DELAY = 2  # seconds between attempts while the camera is unavailable
+INGEST_MAX_ATTEMPTS = 3  # failed attempts before a card file is skipped
+INGEST_PREPARE_TIMEOUT = 2  # seconds a capture waits for the card manifest
 START_BYTES = b"\xFF\xD8\xFF"
 STOP_BYTES = b"\xFF\xD9"
+FRAME_BUFFER_SIZE = 3  # frames kept by the stream reader
+FRAME_INDEX_SIZE = 32  # frame boundaries kept by the file extractor
+STREAM_CHUNK_SIZE = 64 * 1024  # bytes
+MAX_PENDING_SIZE = 4 * 1024 * 1024  # bytes buffered without a frame end
+
+# Simulated camera backend
+SIMULATED_FPS = 30
+SIMULATED_CAMERAS = 1  # number of simulated cameras, on ports "sim:1", "sim:2"...
+SIMULATED_RESOLUTION = (960, 640)  # pixels, synthetic liveview frames
+SIMULATED_SOURCE = None  # recorded MJPEG file streamed instead of synthetic frames
+SIMULATED_PHOTO_FOLDER = None  # jpeg files returned by captures, synthetic if None
+SIMULATED_CAPTURE_LATENCY = 0.5  # seconds
+SIMULATED_DOWNLOAD_LATENCY = 0.3  # seconds
+SIMULATED_ERROR_RATE = 0.0  # probability for each camera call to fail
 
 # Printer settings
 PRINTER = "DP-QW410"
@@ -40,3 +96,5 @@ PRINT_TIME = 10e3  # milliseconds
 DEFAULT_CAM_VIEW = "galitime/ressources/default_cam_view.png"
 DEFAULT_DECOR = "galitime/ressources/default_decor.png"
 DEFAULT_PHOTO = "galitime/ressources/mire.png"
+LAYOUT_FOLDER = "galitime/ressources/layouts/"  # multi-photo layout templates
+DEFAULT_LAYOUT = LAYOUT_FOLDER + "strip.json"
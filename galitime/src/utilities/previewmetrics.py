@@ -0,0 +1,206 @@
+#!/bin/env python3
+# encoding:utf-8
+# coding:utf-8
+
+"""
+Module collecting liveview performance metrics
+"""
+
+import bisect
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+logger.propagate = True
+
+# Histograms upper bucket bounds, in milliseconds
+HISTOGRAM_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+RECOVERY_BOUNDS = (500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+
+class Histogram:
+    """
+    Histogram : Fixed buckets histogram of durations in milliseconds
+    """
+
+    def __init__(self, bounds: tuple = HISTOGRAM_BOUNDS) -> None:
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, value: float) -> None:
+        """
+        add : Adds a value to the histogram
+
+        Args:
+            value (float): Duration in milliseconds
+        """
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    def percentile(self, ratio: float) -> float:
+        """
+        percentile : Returns the upper bound of the bucket containing the requested
+        percentile, clamped to the maximum value so that it never exceeds it.
+
+        Args:
+            ratio (float): Percentile between 0 and 1
+
+        Returns:
+            float: Percentile upper bound in milliseconds, at most the maximum value,
+            0 if empty
+        """
+        if self.count == 0:
+            return 0.0
+
+        threshold = ratio * self.count
+        cumulated = 0
+        for bound, bucketCount in zip(self.bounds, self.buckets):
+            cumulated += bucketCount
+            if cumulated >= threshold:
+                return float(min(bound, self.maximum))
+        return self.maximum
+
+    def toDict(self) -> dict:
+        """
+        toDict : Returns the histogram content as a dictionnary
+
+        Returns:
+            dict: Count, mean, p50, p95, max and buckets
+        """
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50": round(self.percentile(0.5), 3),
+            "p95": round(self.percentile(0.95), 3),
+            "max": round(self.maximum, 3),
+            "buckets": dict(zip([*map(str, self.bounds), "inf"], self.buckets)),
+        }
+
+
+class PreviewMetrics:
+    """
+    PreviewMetrics : Thread safe liveview metrics for a single preview session.
+
+    Frames are counted at each step of the pipeline: produced by the camera,
+    decoded, displayed, dropped (replaced by a newer frame before being displayed)
+    and duplicated (identical to the previous camera frame). A low produced rate
+    points at the camera or USB link, a high produced rate with many dropped
+    frames and long decode or paint times points at the CPU. Preview restarts
+    and the time taken to recover from each stall are also recorded.
+    """
+
+    COUNTERS = ("produced", "decoded", "displayed", "dropped", "duplicated")
+    HISTOGRAMS = ("decodeTime", "paintTime", "latency", "recoveryTime")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        reset : Clears all metrics and starts a new session
+        """
+        with self._lock:
+            self.startTime = time.monotonic()
+            self.counters = dict.fromkeys(self.COUNTERS, 0)
+            self.decodeTime = Histogram()
+            self.paintTime = Histogram()
+            self.latency = Histogram()
+            self.recoveryTime = Histogram(RECOVERY_BOUNDS)
+
+    def count(self, counter: str, increment: int = 1) -> None:
+        """
+        count : Increments one of the frame counters
+
+        Args:
+            counter (str): Counter name, one of PreviewMetrics.COUNTERS
+            increment (int, optional): Increment value. Defaults to 1.
+        """
+        with self._lock:
+            self.counters[counter] += increment
+
+    def addDecodeTime(self, duration: float) -> None:
+        """
+        addDecodeTime : Records a successful frame decoding
+
+        Args:
+            duration (float): Decoding duration in seconds
+        """
+        with self._lock:
+            self.counters["decoded"] += 1
+            self.decodeTime.add(duration * 1000)
+
+    def addDisplay(self, paintDuration: float, frameTimestamp: float) -> None:
+        """
+        addDisplay : Records a frame display
+
+        Args:
+            paintDuration (float): Painting duration in seconds
+            frameTimestamp (float): time.monotonic() timestamp of the frame reception
+        """
+        with self._lock:
+            self.counters["displayed"] += 1
+            self.paintTime.add(paintDuration * 1000)
+            self.latency.add((time.monotonic() - frameTimestamp) * 1000)
+
+    def addRecovery(self, duration: float) -> None:
+        """
+        addRecovery : Records a preview recovery after a stall
+
+        Args:
+            duration (float): Time from the stall detection to the first new frame
+            in seconds
+        """
+        with self._lock:
+            self.recoveryTime.add(duration * 1000)
+
+    def getSnapshot(self) -> dict:
+        """
+        getSnapshot : Returns a copy of the current session metrics
+
+        Returns:
+            dict: Session duration, frame counters, frame rates and histograms
+        """
+        with self._lock:
+            duration = time.monotonic() - self.startTime
+            return {
+                "duration": round(duration, 3),
+                "counters": dict(self.counters),
+                "fps": {
+                    counter: round(value / duration, 2) if duration > 0 else 0.0
+                    for counter, value in self.counters.items()
+                },
+                "decodeTime": self.decodeTime.toDict(),
+                "paintTime": self.paintTime.toDict(),
+                "latency": self.latency.toDict(),
+                "recoveryTime": self.recoveryTime.toDict(),
+            }
+
+    def logSummary(self) -> None:
+        """
+        logSummary : Logs a summary of the current session metrics
+        """
+        snapshot = self.getSnapshot()
+        logger.info(
+            "Preview session %.1f s: %s",
+            snapshot["duration"],
+            ", ".join(f"{name} {value}" for name, value in snapshot["counters"].items())
+        )
+        logger.info(
+            "Preview FPS: produced %.2f, displayed %.2f",
+            snapshot["fps"]["produced"],
+            snapshot["fps"]["displayed"]
+        )
+        for name in self.HISTOGRAMS:
+            histogram = snapshot[name]
+            logger.info(
+                "Preview %s (ms): mean %.2f, p50 %s, p95 %s, max %s",
+                name, histogram["mean"], histogram["p50"], histogram["p95"],
+                histogram["max"]
+            )
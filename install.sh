@@ -34,6 +34,7 @@ echo "Installing python packages ..."
 python3 -m pip install gphoto2
 python3 -m pip install pyqt5 
 python3 -m pip install pycups
+python3 -m pip install numpy
 
 deactivate
 